@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live event stream at /api/events/ is only available when the project
+is served through this application (e.g. ``uvicorn FireMate.asgi:application``).
 """
 
 import os
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'firemateApp.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -124,6 +126,35 @@ STATICFILES_DIRS = [
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_MAX_UPLOAD_SIZE = 250 * 1024 * 1024  # Bytes per uploaded file
+MEDIA_UPLOAD_SPOOL = os.path.join(BASE_DIR, 'upload_spool')  # Local directory for originals arriving in chunks
+
+# Hand media downloads to the front-end server instead of streaming them from a
+# worker: None, 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'  # nginx internal location aliased to MEDIA_ROOT
+
+# Voice stress features clients compute themselves, scored without decoding the recording
+VOICE_FEATURES_SPOT_CHECK_RATE = 0.05  # Fraction of submissions recomputed from the recording
+VOICE_FEATURES_TOLERANCE = 0.25  # Relative difference per feature beyond which the server's are used
+
+# Uploads are streamed to temporary files and hashed as they arrive, never held in memory
+FILE_UPLOAD_HANDLERS = ['firemateApp.media_ingest.HashingFileUploadHandler']
+
+# Cache
+# Use a shared backend (Redis/Memcached) in production so cached read models
+# and their invalidations are shared between worker processes
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Locks and results worker processes coordinate through: these must be
+    # shared between processes, which the database already is
+    'coordination': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'firemate_coordination_cache',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -149,6 +180,12 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
+        'firemateApp.parsers.MessagePackParser',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'firemateApp.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
 
@@ -168,6 +205,10 @@ CORS_ALLOWED_METHODS = [
     'POST',
     'PUT',
 ]
+CORS_ALLOW_HEADERS = [
+    *default_headers,
+    'idempotency-key',
+]
 
 # JWT settings
 SIMPLE_JWT = {
@@ -182,3 +223,53 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
+
+# Telemetry settings
+TELEMETRY_MAX_BATCH_SIZE = 1000  # Points accepted per telemetry request
+
+# Latest-position store settings
+POSITION_STORE_FLUSH_INTERVAL = 5  # Seconds between write-behind flushes, 0 writes through
+POSITION_STORE_MAX_STALENESS = 30  # Seconds an in-memory position may be served without a newer ping
+
+# Event stream settings
+EVENT_STREAM_QUEUE_SIZE = 100  # Pending events per client before it is told to resync
+EVENT_STREAM_KEEPALIVE = 15  # Seconds between keepalive comments on idle streams
+
+# Incident analysis settings
+ANALYSIS_LOCK_TIMEOUT = 120  # Seconds one process may hold an analysis before others run their own
+ANALYSIS_FLIGHT_CACHE = 'coordination'  # Cache alias concurrent analyses are deduplicated through
+
+# Admission control for report surges: per-process analysis limits, and
+# token buckets as (burst capacity, seconds to refill it)
+ANALYSIS_FULL_LIMIT = 2  # Analyses in flight beyond which reporter-triggered ones skip model inference
+ANALYSIS_DEFER_LIMIT = 8  # Analyses in flight beyond which they are deferred to run_deferred_analyses
+DEFERRED_ANALYSIS_INTERVAL = 10  # Seconds between passes of the run_deferred_analyses loop
+REPORT_RATE_PER_REPORTER = (5, 60)  # Reports and uploads; more are refused with 429
+REPORT_RATE_PER_AREA = (30, 60)  # Reports per area cell; more are accepted with cheap analysis only
+REPORT_AREA_SIZE = 1000  # Meters per side of the area cells
+
+# Idempotency-Key settings for retried creates
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60  # Seconds a key's response is replayed to retries
+IDEMPOTENCY_WAIT = 5  # Seconds a retry waits for the first request with its key before getting 409
+IDEMPOTENCY_LOCK_TIMEOUT = 120  # Seconds after which a key left by a request that died may be taken over
+IDEMPOTENCY_SWEEP_INTERVAL = 60 * 60  # Seconds between passes of the sweep_idempotency_keys loop
+
+# Duplicate report clustering settings
+INCIDENT_CLUSTER_RADIUS = 300  # Meters from a cluster's centroid within which reports are the same event
+INCIDENT_CLUSTER_WINDOW = 30 * 60  # Seconds after a cluster's latest report that new ones may still join it
+
+# Read model settings
+READ_MODEL_TIMEOUT = 300  # Seconds a cached read model lives without being invalidated
+
+# Sync feed settings
+SYNC_PAGE_SIZE = 500  # Change log entries consumed per sync request
+SYNC_SETTLE_SECONDS = 60  # Longest transaction; a change log id missing for longer was rolled back
+
+# Firestore sync settings
+FIRESTORE_SYNC_INTERVAL = 5  # Seconds between passes of the sync_firestore loop
+FIRESTORE_SYNC_BATCH_SIZE = 500  # Rows or documents per batched write or query page, at most 500
+
+# Firebase token verification settings
+FIREBASE_TOKEN_CACHE_TTL = 300  # Seconds a verified token is trusted without re-checking, capped at its exp
+FIREBASE_TOKEN_CACHE_SIZE = 10000  # Verified tokens kept in memory per process
+FIREBASE_UID_CACHE_SIZE = 10000  # Firebase UID to user id mappings kept in memory per process
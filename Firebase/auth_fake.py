@@ -0,0 +1,101 @@
+"""
+In-memory stand-in for the batch user APIs of ``firebase_admin.auth``, for
+tests and benchmarks that must not touch a real project.
+"""
+from collections import namedtuple
+import threading
+import time
+
+from firebase_admin import exceptions
+
+# Admin SDK limits per batch call
+MAX_IMPORT_USERS = 1000
+MAX_DELETE_USERS = 1000
+MAX_GET_USERS = 100
+
+FakeUser = namedtuple('FakeUser', ['uid', 'email', 'display_name'])
+FakeErrorInfo = namedtuple('FakeErrorInfo', ['index', 'reason'])
+
+class FakeBatchResult:
+    """
+    Mirrors UserImportResult and DeleteUsersResult.
+    """
+
+    def __init__(self, total, errors):
+        self.errors = errors
+        self.failure_count = len(errors)
+        self.success_count = total - len(errors)
+
+class FakeGetUsersResult:
+    def __init__(self, users, not_found):
+        self.users = users
+        self.not_found = not_found
+
+class FakeAuth:
+    """
+    Stores users as ``users[uid] = FakeUser``.
+
+    Args:
+        latency (float): Seconds each call takes, to mimic a round trip
+        fail_calls (iterable): Call numbers (1-based) that raise a quota error instead of running
+    """
+
+    def __init__(self, latency=0.0, fail_calls=()):
+        self.latency = latency
+        self.fail_calls = set(fail_calls)
+        self.users = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def add_user(self, uid, email=None, display_name=None):
+        self.users[uid] = FakeUser(uid, email, display_name)
+
+    def import_users(self, users, hash_alg=None):
+        self._check(users, MAX_IMPORT_USERS)
+        errors = []
+        with self._lock:
+            emails = {user.email.lower() for user in self.users.values() if user.email}
+            for index, record in enumerate(users):
+                if record.password_hash is not None and hash_alg is None:
+                    errors.append(FakeErrorInfo(index, 'hash_alg is required to import password hashes'))
+                elif record.email and record.email.lower() in emails:
+                    errors.append(FakeErrorInfo(index, 'The user with the provided email already exists'))
+                else:
+                    self.add_user(record.uid, record.email, record.display_name)
+                    if record.email:
+                        emails.add(record.email.lower())
+        return FakeBatchResult(len(users), errors)
+
+    def delete_users(self, uids, force_delete=False):
+        self._check(uids, MAX_DELETE_USERS)
+        with self._lock:
+            for uid in uids:
+                self.users.pop(uid, None)
+        # Like the real API, unknown UIDs count as deleted
+        return FakeBatchResult(len(uids), [])
+
+    def get_users(self, identifiers):
+        self._check(identifiers, MAX_GET_USERS)
+        found, not_found = [], []
+        with self._lock:
+            by_email = {user.email.lower(): user for user in self.users.values() if user.email}
+            for identifier in identifiers:
+                if hasattr(identifier, 'email'):
+                    user = by_email.get(identifier.email.lower())
+                else:
+                    user = self.users.get(identifier.uid)
+                if user is None:
+                    not_found.append(identifier)
+                elif user not in found:
+                    found.append(user)
+        return FakeGetUsersResult(found, not_found)
+
+    def _check(self, items, limit):
+        if len(items) > limit:
+            raise ValueError(f'at most {limit} items allowed per call')
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self.calls in self.fail_calls:
+                raise exceptions.ResourceExhaustedError('QUOTA_EXCEEDED : Exceeded quota', None)
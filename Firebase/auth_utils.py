@@ -1,6 +1,11 @@
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import credentials, auth, exceptions
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import os
+import random
+import time
+import uuid
 
 # Path to the service account key JSON file
 SERVICE_ACCOUNT_PATH = os.path.join(os.path.dirname(__file__), 'serviceAccountKey.json')
@@ -87,3 +92,169 @@ def update_user(uid, email=None, password=None, display_name=None):
     except Exception as e:
         print(" Error updating user:", e)
         return None
+
+
+# Admin SDK limits per batch call
+MAX_IMPORT_USERS = 1000
+MAX_DELETE_USERS = 1000
+MAX_GET_USERS = 100
+
+# Errors worth retrying: quota exhaustion and transient outages
+RETRYABLE_ERRORS = (
+    exceptions.ResourceExhaustedError,
+    exceptions.UnavailableError,
+    exceptions.DeadlineExceededError,
+)
+
+# Outcome of one item of a bulk operation; record is set by bulk_get_users
+BulkResult = namedtuple('BulkResult', ['identifier', 'success', 'error', 'record'])
+
+def _call_with_retry(call, retries, backoff):
+    delay = backoff
+    for attempt in range(1, retries + 1):
+        try:
+            return call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries:
+                raise
+            wait = delay + random.uniform(0, delay)
+            print(f" Quota or availability error ({e}), retrying in {wait:.1f}s")
+            time.sleep(wait)
+            delay *= 2
+
+def _run_chunks(items, chunk_size, call, handle, max_workers, retries, backoff):
+    """
+    Run ``call(chunk)`` over ``items`` in chunks, at most ``max_workers`` at once.
+
+    ``handle(chunk, response)`` turns a response into per-item BulkResults.
+    A chunk that still fails after its retries marks all its items failed.
+    """
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    def run(chunk):
+        try:
+            response = _call_with_retry(lambda: call(chunk), retries, backoff)
+        except Exception as e:
+            return [BulkResult(identifier, False, str(e), None) for identifier, _ in chunk]
+        return handle(chunk, response)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return [result for results in pool.map(run, chunks) for result in results]
+
+#  Create many users at once
+def bulk_create_users(users, hash_alg=None, client=auth, max_workers=4, retries=5, backoff=1.0):
+    """
+    Creates users with the Admin SDK's import_users, up to 1000 per call.
+
+    Args:
+        users (list): Dicts of ImportUserRecord fields (email, display_name,
+            phone_number, password_hash, custom_claims, ...); a uid is
+            generated when missing.
+        hash_alg (UserImportHash): Required when users carry password hashes.
+        client: The auth module, or a fake exposing import_users.
+        max_workers (int): Import calls in flight at once.
+        retries (int): Attempts per call on quota or availability errors.
+        backoff (float): Seconds before the first retry, doubled after each.
+
+    Returns:
+        list: A BulkResult per user, in input order, identified by uid.
+    """
+    records = []
+    for user in users:
+        fields = dict(user)
+        fields['uid'] = fields.get('uid') or uuid.uuid4().hex[:28]
+        records.append((fields['uid'], auth.ImportUserRecord(**fields)))
+
+    def handle(chunk, response):
+        errors = {error.index: error.reason for error in response.errors}
+        return [
+            BulkResult(uid, index not in errors, errors.get(index), None)
+            for index, (uid, _) in enumerate(chunk)
+        ]
+
+    results = _run_chunks(
+        records, MAX_IMPORT_USERS,
+        lambda chunk: client.import_users([record for _, record in chunk], hash_alg=hash_alg),
+        handle, max_workers, retries, backoff,
+    )
+    _print_summary('Imported', results)
+    return results
+
+#  Look up many users at once
+def bulk_get_users(identifiers, client=auth, max_workers=4, retries=5, backoff=1.0):
+    """
+    Fetches users by UID or email with get_users, up to 100 per call.
+
+    Args:
+        identifiers (list): UIDs and/or email addresses.
+
+    Returns:
+        list: A BulkResult per identifier, in input order, with the
+            UserRecord as ``record`` when found.
+    """
+    items = [
+        (identifier, auth.EmailIdentifier(identifier) if '@' in identifier else auth.UidIdentifier(identifier))
+        for identifier in identifiers
+    ]
+
+    def handle(chunk, response):
+        by_uid = {user.uid: user for user in response.users}
+        by_email = {user.email.lower(): user for user in response.users if user.email}
+        results = []
+        for identifier, _ in chunk:
+            user = by_email.get(identifier.lower()) if '@' in identifier else by_uid.get(identifier)
+            results.append(BulkResult(identifier, user is not None, None if user else 'User not found', user))
+        return results
+
+    return _run_chunks(
+        items, MAX_GET_USERS,
+        lambda chunk: client.get_users([lookup for _, lookup in chunk]),
+        handle, max_workers, retries, backoff,
+    )
+
+#  Delete many users at once
+def bulk_delete_users(identifiers, client=auth, max_workers=1, retries=5, backoff=1.0):
+    """
+    Deletes users by UID or email with delete_users, up to 1000 per call.
+
+    Emails are first resolved to UIDs with bulk_get_users. Firebase rate
+    limits batch deletes per project, so calls run one at a time by default
+    and quota errors are retried with backoff.
+
+    Returns:
+        list: A BulkResult per identifier, in input order.
+    """
+    emails = [identifier for identifier in identifiers if '@' in identifier]
+    uids = {identifier: identifier for identifier in identifiers if '@' not in identifier}
+    results = {}
+    for result in bulk_get_users(emails, client=client, retries=retries, backoff=backoff):
+        if result.success:
+            uids[result.identifier] = result.record.uid
+        else:
+            results[result.identifier] = result
+
+    def handle(chunk, response):
+        errors = {error.index: error.reason for error in response.errors}
+        return [
+            BulkResult(identifier, index not in errors, errors.get(index), None)
+            for index, (identifier, _) in enumerate(chunk)
+        ]
+
+    for result in _run_chunks(
+        list(uids.items()), MAX_DELETE_USERS,
+        lambda chunk: client.delete_users([uid for _, uid in chunk]),
+        handle, max_workers, retries, backoff,
+    ):
+        results[result.identifier] = result
+
+    ordered = [results[identifier] for identifier in identifiers]
+    _print_summary('Deleted', ordered)
+    return ordered
+
+def _print_summary(verb, results):
+    failed = [result for result in results if not result.success]
+    print(f" {verb} {len(results) - len(failed)} users, {len(failed)} failed")
+    for result in failed[:10]:
+        print(f"   {result.identifier}: {result.error}")
+    if len(failed) > 10:
+        print(f"   ... and {len(failed) - 10} more")
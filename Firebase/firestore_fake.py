@@ -0,0 +1,161 @@
+"""
+In-memory stand-in for the parts of the Firestore client used by our
+scripts and the Django sync engine, for tests and benchmarks that must not
+touch a real project.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+import itertools
+import threading
+import time
+
+# Firestore rejects commits with more writes than this
+MAX_BATCH_WRITES = 500
+
+class _ServerTimestamp:
+    def __repr__(self):
+        return 'SERVER_TIMESTAMP'
+
+SERVER_TIMESTAMP = _ServerTimestamp()
+
+class FakeFirestore:
+    """
+    Stores documents as ``collections[name][doc_id] = dict``.
+
+    Args:
+        commit_latency (float): Seconds each batch commit takes, to mimic a round trip
+        fail_commits (iterable): Commit numbers (1-based) that raise ``error`` instead of writing
+        error (Exception): Exception raised by failing commits
+    """
+
+    def __init__(self, commit_latency=0.0, fail_commits=(), error=RuntimeError('commit failed')):
+        self.commit_latency = commit_latency
+        self.fail_commits = set(fail_commits)
+        self.error = error
+        self.collections = defaultdict(dict)
+        self.commits = 0
+        self.writes = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def get_all(self, refs):
+        for ref in refs:
+            yield ref.get()
+
+    def _write(self, ref, data, merge=False):
+        stamped = {key: datetime.now(timezone.utc) if value is SERVER_TIMESTAMP else value for key, value in data.items()}
+        if merge:
+            stamped = {**self.collections[ref.collection].get(ref.id, {}), **stamped}
+        self.collections[ref.collection][ref.id] = stamped
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            doc_id = f'auto-{next(self.db._ids)}'
+        return FakeDocumentReference(self.db, self.name, doc_id)
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+    def order_by(self, field):
+        return FakeQuery(self.db, self.name).order_by(field)
+
+class FakeQuery:
+    """
+    Ordered queries with ``start_after`` cursors; ``__name__`` orders by document id.
+    """
+
+    def __init__(self, db, collection, orders=(), cursor=None, count=None):
+        self.db = db
+        self.collection = collection
+        self.orders = orders
+        self.cursor = cursor
+        self.count = count
+
+    def order_by(self, field):
+        return FakeQuery(self.db, self.collection, self.orders + (field,), self.cursor, self.count)
+
+    def start_after(self, values):
+        return FakeQuery(self.db, self.collection, self.orders, values, self.count)
+
+    def limit(self, count):
+        return FakeQuery(self.db, self.collection, self.orders, self.cursor, count)
+
+    def stream(self):
+        with self.db._lock:
+            documents = list(self.db.collections[self.collection].items())
+
+        def key(doc_id, data):
+            return tuple(doc_id if field == '__name__' else data[field] for field in self.orders)
+
+        # Like Firestore, documents without an ordered field are left out
+        rows = sorted(
+            (key(doc_id, data), doc_id, data) for doc_id, data in documents
+            if all(field == '__name__' or data.get(field) is not None for field in self.orders)
+        )
+        if self.cursor is not None:
+            after = tuple(self.cursor[field] for field in self.orders)
+            rows = [row for row in rows if row[0] > after]
+        for _, doc_id, data in rows[:self.count]:
+            yield FakeDocumentSnapshot(FakeDocumentReference(self.db, self.collection, doc_id), dict(data))
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self.exists else None
+
+class FakeDocumentReference:
+    def __init__(self, db, collection, doc_id):
+        self.db = db
+        self.collection = collection
+        self.id = doc_id
+        self.path = f'{collection}/{doc_id}'
+
+    def set(self, data, merge=False):
+        with self.db._lock:
+            self.db._write(self, data, merge)
+            self.db.writes += 1
+
+    def get(self):
+        with self.db._lock:
+            data = self.db.collections[self.collection].get(self.id)
+        return FakeDocumentSnapshot(self, None if data is None else dict(data))
+
+class FakeWriteBatch:
+    def __init__(self, db):
+        self.db = db
+        self._writes = []
+
+    def set(self, ref, data, merge=False):
+        self._writes.append((ref, dict(data), merge))
+
+    def commit(self):
+        if len(self._writes) > MAX_BATCH_WRITES:
+            raise ValueError(f'maximum {MAX_BATCH_WRITES} writes allowed per request')
+        if self.db.commit_latency:
+            time.sleep(self.db.commit_latency)
+        with self.db._lock:
+            self.db.commits += 1
+            if self.db.commits in self.db.fail_commits:
+                raise self.db.error
+            for ref, data, merge in self._writes:
+                self.db._write(ref, data, merge)
+            self.db.writes += len(self._writes)
+        return []
@@ -1,48 +1,269 @@
-# 🔥 Firebase Admin SDK and JSON libraries
-import firebase_admin
-from firebase_admin import credentials, firestore
+"""
+Import users, emergencies and responses into Firestore.
+
+Inputs are streamed, so JSON arrays and NDJSON files of any size work, and
+written with batched writes of up to 500 documents, several batches in
+flight at once. Each document gets a stable ID derived from its position
+in the input, and progress is checkpointed after every batch, so an
+interrupted import can simply be re-run: committed batches are skipped and
+any batch that was in flight is rewritten in place instead of duplicated.
+
+Usage (from this directory):
+
+    python import_to_firestore.py                         # users, emergencies, responses
+    python import_to_firestore.py emergencies=big.ndjson  # one collection from another file
+    python import_to_firestore.py --emulator localhost:8080 --project firemate-dev
+"""
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import argparse
 import json
+import os
+import time
+
+# Firestore's limit on writes per batch
+MAX_BATCH_SIZE = 500
+
+# 👥 🚨 🚑 Collection -> (default input file, field stamped with the server time)
+COLLECTIONS = {
+    'users': ('users.json', 'created_at'),
+    'emergencies': ('emergencies.json', 'timestamp'),
+    'responses': ('responses.json', 'arrival_time'),
+}
+
+CHECKPOINT_FILE = '.import_checkpoint.json'
+
+def iter_documents(path, chunk_size=1 << 16):
+    """
+    Yield the objects of a JSON array or NDJSON file, reading it in chunks.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof, in_array = '', 0, False, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == '[' and not in_array:
+                in_array = True
+                pos += 1
+                continue
+            if pos < len(buffer) and buffer[pos] == ']' and in_array:
+                return
+            if pos < len(buffer):
+                try:
+                    doc, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    if not isinstance(doc, dict):
+                        raise ValueError(f'{path}: expected JSON objects, got {type(doc).__name__}')
+                    yield doc
+                    continue
+            elif eof:
+                return
+
+            # Need more input: drop what has been consumed and read the next chunk
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+class Checkpoint:
+    """
+    Number of leading documents of each input already committed, persisted
+    to a JSON file after every change.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                self.offsets = json.load(f)
+
+    def key(self, collection, source):
+        return f'{collection}:{os.path.abspath(source)}'
+
+    def get(self, collection, source):
+        return self.offsets.get(self.key(collection, source), 0)
+
+    def set(self, collection, source, offset):
+        self.offsets[self.key(collection, source)] = offset
+        if self.path:
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.offsets, f)
+            os.replace(tmp_path, self.path)
+
+class FirestoreImporter:
+    """
+    Streams documents into a Firestore collection with batched writes.
+
+    Args:
+        db: Firestore client, or a FakeFirestore
+        server_timestamp: Sentinel the client replaces with the commit time
+        checkpoint (Checkpoint): Where progress is recorded
+        batch_size (int): Documents per batch, at most 500
+        max_in_flight (int): Batches committing concurrently
+        retries (int): Attempts per batch before giving up
+        backoff (float): Seconds before the first retry, doubled after each
+    """
+
+    def __init__(self, db, server_timestamp, checkpoint, batch_size=MAX_BATCH_SIZE, max_in_flight=4,
+                 retries=5, backoff=0.5):
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f'batch_size must be between 1 and {MAX_BATCH_SIZE}')
+        self.db = db
+        self.server_timestamp = server_timestamp
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.backoff = backoff
+
+    def import_file(self, collection, source, timestamp_field=None):
+        """
+        Import one input file, resuming after its checkpointed offset.
+
+        Returns:
+            int: Documents written by this run
+        """
+        prefix = os.path.splitext(os.path.basename(source))[0]
+        start = self.checkpoint.get(collection, source)
+        written = 0
+        committed = start
+        done = {}
+        in_flight = set()
+
+        def settle(futures):
+            nonlocal committed, written
+            for future in futures:
+                batch_start, count = future.result()
+                done[batch_start] = count
+                written += count
+            # Only a contiguous prefix of batches may be checkpointed
+            advanced = False
+            while committed in done:
+                committed += done.pop(committed)
+                advanced = True
+            if advanced:
+                self.checkpoint.set(collection, source, committed)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            try:
+                for batch_start, docs in self._batches(source, start):
+                    if len(in_flight) >= self.max_in_flight:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        settle(finished)
+                    refs = [
+                        self.db.collection(collection).document(f'{prefix}-{batch_start + i:09d}')
+                        for i in range(len(docs))
+                    ]
+                    for doc in docs:
+                        if timestamp_field:
+                            doc[timestamp_field] = self.server_timestamp
+                    in_flight.add(pool.submit(self._commit, batch_start, refs, docs))
+                settle(in_flight)
+            except BaseException:
+                # Record whatever finished before failing, so a re-run resumes there
+                finished, _ = wait(in_flight)
+                for future in finished:
+                    if future.exception() is None:
+                        batch_start, count = future.result()
+                        done[batch_start] = count
+                settle([])
+                raise
+        return written
+
+    def _batches(self, source, start):
+        docs = []
+        batch_start = start
+        for index, doc in enumerate(iter_documents(source)):
+            if index < start:
+                continue
+            docs.append(doc)
+            if len(docs) == self.batch_size:
+                yield batch_start, docs
+                batch_start += len(docs)
+                docs = []
+        if docs:
+            yield batch_start, docs
+
+    def _commit(self, batch_start, refs, docs):
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            batch = self.db.batch()
+            for ref, doc in zip(refs, docs):
+                batch.set(ref, doc)
+            try:
+                batch.commit()
+                return batch_start, len(docs)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                print(f"⚠️  Batch at {batch_start} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+def connect(project=None, emulator=None):
+    """
+    Return a Firestore client and its server timestamp sentinel.
+    """
+    from google.cloud import firestore
+
+    if emulator:
+        # The client talks to the emulator without credentials
+        os.environ['FIRESTORE_EMULATOR_HOST'] = emulator
+        return firestore.Client(project=project or 'demo-firemate'), firestore.SERVER_TIMESTAMP
+
+    # 🔐 Initialize Firebase using the service account key
+    import firebase_admin
+    from firebase_admin import credentials
+    from firebase_admin import firestore as admin_firestore
+    if not firebase_admin._apps:
+        cred = credentials.Certificate('serviceAccountKey.json')
+        firebase_admin.initialize_app(cred, {'projectId': project} if project else None)
+    return admin_firestore.client(), firestore.SERVER_TIMESTAMP
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import JSON/NDJSON files into Firestore collections.')
+    parser.add_argument('sources', nargs='*', metavar='collection[=file]',
+                        help=f"Collections to import (default: {', '.join(COLLECTIONS)})")
+    parser.add_argument('--project', help='Firebase project id')
+    parser.add_argument('--emulator', metavar='HOST:PORT', help='Write to a Firestore emulator instead')
+    parser.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=4, help='Batches committing at once')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and import everything again')
+    args = parser.parse_args(argv)
+
+    sources = []
+    for source in args.sources or list(COLLECTIONS):
+        collection, _, path = source.partition('=')
+        default_path, timestamp_field = COLLECTIONS.get(collection, (None, None))
+        if not (path or default_path):
+            parser.error(f'No input file for collection {collection}')
+        sources.append((collection, path or default_path, timestamp_field))
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    db, server_timestamp = connect(args.project, args.emulator)
+    importer = FirestoreImporter(
+        db, server_timestamp, Checkpoint(args.checkpoint),
+        batch_size=args.batch_size, max_in_flight=args.concurrency,
+    )
+
+    total = 0
+    started = time.perf_counter()
+    for collection, path, timestamp_field in sources:
+        collection_started = time.perf_counter()
+        written = importer.import_file(collection, path, timestamp_field)
+        elapsed = time.perf_counter() - collection_started
+        print(f"✅ {collection}: {written} documents from {path} ({written / elapsed if elapsed else 0:.0f} docs/s)")
+        total += written
+
+    elapsed = time.perf_counter() - started
+    print(f"\n🎉 Imported {total} documents in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} docs/s)")
 
-# 🔐 Initialize Firebase using the service account key
-cred = credentials.Certificate("serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
-
-# 🧠 Get a Firestore database client
-db = firestore.client()
-
-# 👥 Upload users
-def import_users():
-    with open("users.json", "r") as f:
-        users = json.load(f)
-    
-    for user in users:
-        user["created_at"] = firestore.SERVER_TIMESTAMP
-        db.collection("users").add(user)
-        print(f"✅ Uploaded user: {user['full_name']}")
-
-# 🚨 Upload emergency reports
-def import_emergencies():
-    with open("emergencies.json", "r") as f:
-        emergencies = json.load(f)
-    
-    for emergency in emergencies:
-        emergency["timestamp"] = firestore.SERVER_TIMESTAMP
-        db.collection("emergencies").add(emergency)
-        print(f"🔥 Emergency reported: {emergency['description']}")
-
-# 🚑 Upload operator responses
-def import_responses():
-    with open("responses.json", "r") as f:
-        responses = json.load(f)
-    
-    for response in responses:
-        response["arrival_time"] = firestore.SERVER_TIMESTAMP
-        db.collection("responses").add(response)
-        print(f"🚨 Response by operator: {response['operator_email']}")
-
-# 🚀 Run all import tasks
-import_users()
-import_emergencies()
-import_responses()
-
-print("\n🎉 All Firestore collections uploaded successfully!")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Tests for the bulk user helpers in auth_utils against the in-memory fake.
+
+Run from this directory: python -m unittest test_auth_utils_bulk
+"""
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import firebase_admin
+
+# auth_utils initializes an app from the service account key unless one exists
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(options={'projectId': 'firemate-test'})
+
+from auth_fake import FakeAuth
+from auth_utils import bulk_create_users, bulk_delete_users, bulk_get_users
+
+def quietly(call, *args, **kwargs):
+    with redirect_stdout(io.StringIO()):
+        return call(*args, **kwargs)
+
+class BulkUserTests(unittest.TestCase):
+    def test_create_in_chunks(self):
+        """Test imports are split at the 1000-user limit with per-user results"""
+        client = FakeAuth()
+        users = [{'email': f'user{i}@firemate.test'} for i in range(2500)]
+        results = quietly(bulk_create_users, users, client=client, backoff=0)
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(len(client.users), 2500)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(len({result.identifier for result in results}), 2500)
+
+    def test_create_reports_failed_items(self):
+        """Test rejected users are reported against their own uid"""
+        client = FakeAuth()
+        client.add_user('existing', 'taken@firemate.test')
+        users = [
+            {'uid': 'a', 'email': 'a@firemate.test'},
+            {'uid': 'b', 'email': 'taken@firemate.test'},
+            {'uid': 'c', 'email': 'c@firemate.test'},
+        ]
+        results = quietly(bulk_create_users, users, client=client, backoff=0)
+        self.assertEqual([result.success for result in results], [True, False, True])
+        self.assertEqual(results[1].identifier, 'b')
+        self.assertIn('already exists', results[1].error)
+
+    def test_quota_errors_retried(self):
+        """Test a quota error is retried and the batch completes"""
+        client = FakeAuth(fail_calls={1, 2})
+        results = quietly(bulk_create_users, [{'uid': 'x'}], client=client, backoff=0)
+        self.assertTrue(results[0].success)
+        self.assertEqual(client.calls, 3)
+
+    def test_exhausted_retries_fail_chunk_items(self):
+        """Test a chunk that keeps failing marks its items failed without aborting others"""
+        client = FakeAuth(fail_calls={1, 2})
+        users = [{'uid': f'u{i}'} for i in range(1500)]
+        results = quietly(bulk_create_users, users, client=client, max_workers=1, retries=2, backoff=0)
+        self.assertEqual(sum(not result.success for result in results), 1000)
+        self.assertIn('QUOTA_EXCEEDED', results[0].error)
+        self.assertTrue(results[-1].success)
+
+    def test_get_maps_uids_and_emails(self):
+        """Test lookups are batched by 100 and matched back to each identifier"""
+        client = FakeAuth()
+        for i in range(150):
+            client.add_user(f'uid-{i}', f'User{i}@firemate.test')
+        identifiers = [f'uid-{i}' for i in range(100)] + [f'user{i}@firemate.test' for i in range(100, 150)] + ['missing']
+        results = bulk_get_users(identifiers, client=client, backoff=0)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(results[120].record.uid, 'uid-120')
+        self.assertFalse(results[-1].success)
+
+    def test_delete_resolves_emails(self):
+        """Test emails are resolved to uids and unknown emails reported"""
+        client = FakeAuth()
+        client.add_user('uid-1', 'one@firemate.test')
+        client.add_user('uid-2', 'two@firemate.test')
+        results = quietly(bulk_delete_users, ['one@firemate.test', 'uid-2', 'nobody@firemate.test'], client=client, backoff=0)
+        self.assertEqual([result.success for result in results], [True, True, False])
+        self.assertEqual(client.users, {})
+
+if __name__ == '__main__':
+    unittest.main()
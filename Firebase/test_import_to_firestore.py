@@ -0,0 +1,76 @@
+"""
+Tests for the Firestore importer against the in-memory fake.
+
+Run from this directory: python -m unittest test_import_to_firestore
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from firestore_fake import FakeFirestore, SERVER_TIMESTAMP
+from import_to_firestore import Checkpoint, FirestoreImporter, iter_documents
+
+class ImportToFirestoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.checkpoint_path = os.path.join(self.tmp.name, 'checkpoint.json')
+
+    def write(self, name, docs, ndjson=False):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            if ndjson:
+                f.writelines(json.dumps(doc) + '\n' for doc in docs)
+            else:
+                json.dump(docs, f, indent=2)
+        return path
+
+    def importer(self, db, **kwargs):
+        kwargs.setdefault('backoff', 0)
+        return FirestoreImporter(db, SERVER_TIMESTAMP, Checkpoint(self.checkpoint_path), **kwargs)
+
+    def test_streams_json_and_ndjson(self):
+        """Test arrays and NDJSON yield the same documents even across chunk boundaries"""
+        docs = [{'id': i, 'description': 'Smoke, flames ] and {braces}' * (i % 3)} for i in range(50)]
+        for path in (self.write('a.json', docs), self.write('a.ndjson', docs, ndjson=True)):
+            self.assertEqual(list(iter_documents(path, chunk_size=7)), docs)
+
+    def test_batched_import(self):
+        """Test documents are written in full batches with server timestamps"""
+        path = self.write('emergencies.json', [{'description': f'Fire {i}'} for i in range(1200)])
+        db = FakeFirestore()
+        written = self.importer(db, batch_size=500).import_file('emergencies', path, 'timestamp')
+        self.assertEqual(written, 1200)
+        self.assertEqual(db.commits, 3)
+        stored = db.collections['emergencies']
+        self.assertEqual(len(stored), 1200)
+        self.assertIsNotNone(stored['emergencies-000000000']['timestamp'])
+
+    def test_resume_after_failure(self):
+        """Test a failed import resumes from its checkpoint without duplicating documents"""
+        path = self.write('users.json', [{'email': f'user{i}@firemate.test'} for i in range(1000)])
+        db = FakeFirestore(fail_commits={3, 4})
+        with self.assertRaises(RuntimeError):
+            self.importer(db, batch_size=100, max_in_flight=1, retries=2).import_file('users', path)
+        self.assertEqual(Checkpoint(self.checkpoint_path).get('users', path), 200)
+
+        written = self.importer(db, batch_size=100).import_file('users', path)
+        self.assertEqual(written, 800)
+        self.assertEqual(len(db.collections['users']), 1000)
+
+    def test_retries_transient_failures(self):
+        """Test a failing commit is retried and the import completes"""
+        path = self.write('responses.json', [{'notes': 'Controlled'} for _ in range(300)])
+        db = FakeFirestore(fail_commits={2})
+        written = self.importer(db, batch_size=100, max_in_flight=3).import_file('responses', path)
+        self.assertEqual(written, 300)
+        self.assertEqual(len(db.collections['responses']), 300)
+
+    def test_batch_size_limit(self):
+        """Test batches above Firestore's 500-write limit are refused"""
+        with self.assertRaises(ValueError):
+            self.importer(FakeFirestore(), batch_size=501)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Analysis coalescing: inference runs when several triggers (incident_create,
+media_create, incident_verify) analyze the same incident at once, each
+running its own analysis versus sharing the one in flight through
+views.analysis_flight.
+
+Inference is simulated with a fixed delay so only the coalescing is measured.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+from common import setup_django, report
+
+TRIGGERS = 8
+INFERENCE_SECONDS = 0.3  # Roughly one EfficientNet pass on a CPU worker
+
+
+def main():
+    setup_django()
+
+    from django.core.cache import cache
+    from django.db import connection
+    from firemateApp.views import _analyze_incident, _run_analysis
+    from firemateApp.models import FireIncident, IncidentMedia
+
+    incident = FireIncident.objects.create(latitude=6.69, longitude=-1.62, description='Bench')
+    IncidentMedia.objects.create(incident=incident, media_type='IMAGE', file='incident_media/fire.jpg')
+
+    def inference(analysis_input):
+        time.sleep(INFERENCE_SECONDS)
+        return 90.0, 'Success'
+
+    def run(analyze):
+        def trigger(_):
+            try:
+                analyze(FireIncident.objects.get(pk=incident.pk))
+            finally:
+                connection.close()
+
+        cache.clear()
+        with mock.patch('firemateApp.views.analyze_image', side_effect=inference) as analyze_image, \
+                mock.patch('firemateApp.views.load_analysis_input', return_value=np.zeros((224, 224, 3), np.uint8)), \
+                ThreadPoolExecutor(max_workers=TRIGGERS) as pool:
+            list(pool.map(trigger, range(TRIGGERS)))
+        return analyze_image.call_count
+
+    separate_runs = run(_run_analysis)
+    shared_runs = run(_analyze_incident)
+
+    report(f'Analysis coalescing ({TRIGGERS} concurrent triggers, {INFERENCE_SECONDS * 1000:.0f} ms inference)', [
+        ('inference runs, each trigger', separate_runs),
+        ('inference runs, single flight', shared_runs),
+        ('inference CPU saved s', f'{(separate_runs - shared_runs) * INFERENCE_SECONDS:.1f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
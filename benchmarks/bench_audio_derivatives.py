@@ -0,0 +1,100 @@
+"""
+Audio derivatives: decode time per incident analysis when voice stress and
+transcription each decode the compressed voice note (pydub/ffmpeg to WAV,
+then librosa), versus memory-mapping the mono 16 kHz PCM transcoded once at
+upload. Only decoding is timed; feature extraction and the speech API call
+are the same either way.
+
+Needs ffmpeg on PATH, as the app does for compressed audio.
+"""
+import io
+import shutil
+import tempfile
+
+import numpy as np
+
+from common import setup_django, timer, report
+
+SECONDS = 60
+RATE = 44100  # What phone recorders typically capture at
+ANALYSES = 5  # Re-analyses of one incident, e.g. on verify
+
+
+def voice_note():
+    """
+    A stereo AAC (m4a) recording of a rough, syllable-paced voice-like signal.
+    """
+    from pydub import AudioSegment
+
+    rng = np.random.default_rng(0)
+    t = np.arange(SECONDS * RATE) / RATE
+    pitch = 180 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / RATE) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > 0).astype(np.float32)
+    signal = voiced * syllables * 0.3 + rng.normal(0, 0.01, t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    audio = AudioSegment(np.repeat(pcm, 2).tobytes(), sample_width=2, frame_rate=RATE, channels=2)
+    buffer = io.BytesIO()
+    audio.export(buffer, format='ipod', codec='aac', bitrate='64k')
+    return buffer.getvalue()
+
+
+def decode_original(path):
+    """
+    The old per-analysis decoding: once for voice stress, once for transcription.
+    """
+    import librosa
+    from pydub import AudioSegment
+
+    for _ in range(2):
+        wav = io.BytesIO()
+        AudioSegment.from_file(path, format='m4a').export(wav, format='wav')
+    wav.seek(0)
+    return librosa.load(wav, sr=None)
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from firemateApp.media_derivatives import load_audio_input
+    from firemateApp.media_ingest import ingest
+    from firemateApp.models import FireIncident
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    try:
+        incident = FireIncident.objects.create(latitude=6.69, longitude=-1.62, description='Bench')
+        content = voice_note()
+        with timer() as upload:
+            media = ingest(SimpleUploadedFile('call.m4a', content), incident)
+
+        # librosa compiles its resampling and mixing code on first use
+        decode_original(media.file.path)
+        with timer() as from_original:
+            for _ in range(ANALYSES):
+                decode_original(media.file.path)
+        with timer() as from_derivative:
+            for _ in range(ANALYSES):
+                samples = load_audio_input(media)
+                samples.astype(np.float32) / 32768
+                samples.tobytes()
+        canonical_bytes = len(samples) * 2
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    saved = from_original['seconds'] - from_derivative['seconds'] - upload['seconds']
+    report(f'Audio derivatives ({SECONDS} s voice note, {ANALYSES} analyses)', [
+        ('transcode at upload ms', f"{upload['seconds'] * 1000:.1f}"),
+        ('decode per analysis, original ms', f"{from_original['seconds'] * 1000 / ANALYSES:.1f}"),
+        ('decode per analysis, derivative ms', f"{from_derivative['seconds'] * 1000 / ANALYSES:.2f}"),
+        ('decode time saved per incident ms', f'{saved * 1000:.1f}'),
+        ('original bytes', f'{len(content):,}'),
+        ('canonical PCM bytes', f'{canonical_bytes:,}'),
+        ('duration s', media.duration),
+    ])
+
+
+if __name__ == '__main__':
+    main()
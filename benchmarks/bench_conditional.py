@@ -0,0 +1,67 @@
+"""
+Conditional GET: bytes sent and server CPU for clients repeatedly polling
+incident_list, incident_detail and ambucycle_detail with and without
+If-None-Match.
+"""
+import random
+import time
+
+from common import setup_django, make_user, call_view, report
+
+INCIDENTS = 200
+POLLS = 200
+
+
+def poll(view, user, revalidate, **kwargs):
+    sent = 0
+    etag = None
+    start = time.process_time()
+    for _ in range(POLLS):
+        headers = {'If-None-Match': etag} if revalidate and etag else None
+        response = call_view(view, 'get', user, headers=headers, **kwargs)
+        etag = response.get('ETag', etag)
+        sent += len(response.content)
+    return sent, time.process_time() - start
+
+
+def main():
+    setup_django()
+
+    from firemateApp.models import Ambucycle, FireIncident
+    from firemateApp.views import incident_list, incident_detail, ambucycle_detail
+
+    admin = make_user('bench-admin', 'ADMIN')
+    operator = make_user('bench-operator', 'AMBUCYCLE_OPERATOR')
+    reporter = make_user('bench-reporter', 'REPORTER')
+    ambucycle = Ambucycle.objects.create(vehicle_number='AMB-0001', operator=operator)
+    incidents = [
+        FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Benchmark incident ' * 5,
+            status='IN_PROGRESS',
+            assigned_ambucycle=ambucycle,
+        )
+        for _ in range(INCIDENTS)
+    ]
+
+    rows = []
+    for name, view, kwargs in [
+        ('incident_list', incident_list, {}),
+        ('incident_detail', incident_detail, {'pk': incidents[0].pk}),
+        ('ambucycle_detail', ambucycle_detail, {'pk': ambucycle.pk}),
+    ]:
+        full_bytes, full_cpu = poll(view, admin, revalidate=False, **kwargs)
+        conditional_bytes, conditional_cpu = poll(view, admin, revalidate=True, **kwargs)
+        rows += [
+            (f'{name} bytes (full / conditional)', f'{full_bytes} / {conditional_bytes}'),
+            (f'{name} CPU ms per poll (full / conditional)',
+             f'{1000 * full_cpu / POLLS:.2f} / {1000 * conditional_cpu / POLLS:.2f}'),
+        ]
+
+    report(f'Conditional GET ({POLLS} polls, {INCIDENTS} incidents)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Event stream fan-out: concurrent subscribers per process and delivery
+latency from publish() in a request thread to the subscriber's queue.
+"""
+import asyncio
+import statistics
+import time
+
+from common import setup_django, report
+
+SUBSCRIBER_COUNTS = [100, 1000, 5000, 10000]
+EVENTS = 50
+EVENT_INTERVAL = 0.02
+
+
+async def run(subscriber_count):
+    from firemateApp.events import Event, EventHub
+
+    hub = EventHub(max_queue=EVENTS)
+    latencies = []
+
+    async def consume(subscriber):
+        for _ in range(EVENTS):
+            event = await subscriber.queue.get()
+            latencies.append(time.perf_counter() - event.data['sent'])
+
+    subscribers = [hub.subscribe(i, 'AMBUCYCLE_OPERATOR') for i in range(subscriber_count)]
+    consumers = [asyncio.create_task(consume(subscriber)) for subscriber in subscribers]
+
+    def produce():
+        # Publishing happens from worker threads in production
+        for _ in range(EVENTS):
+            hub.publish(Event('ambucycle.position', {'sent': time.perf_counter()}, roles={'AMBUCYCLE_OPERATOR'}))
+            time.sleep(EVENT_INTERVAL)
+
+    start = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(None, produce)
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+        'deliveries_per_sec': len(latencies) / elapsed,
+        'dropped': sum(subscriber.dropped for subscriber in subscribers),
+    }
+
+
+def main():
+    setup_django()
+
+    rows = []
+    for subscriber_count in SUBSCRIBER_COUNTS:
+        result = asyncio.run(run(subscriber_count))
+        rows.append((
+            f'{subscriber_count} subscribers',
+            f"p50 {result['p50']:.2f} ms, p99 {result['p99']:.2f} ms, "
+            f"{result['deliveries_per_sec']:.0f} deliveries/sec, {result['dropped']} dropped",
+        ))
+    report(f'Event fan-out ({EVENTS} events, one every {EVENT_INTERVAL * 1000:.0f} ms)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Sparse fieldsets and compression: payload bytes and server time of a
+map-view incident_list request against the full representation.
+"""
+import random
+import statistics
+
+from common import setup_django, make_user, call_view, timer, report
+
+INCIDENTS = 500
+REQUESTS = 50
+MAP_QUERY = '?fields=id,status,latitude,longitude'
+
+
+def measure(view, user, path):
+    samples = []
+    for _ in range(REQUESTS):
+        with timer() as elapsed:
+            response = call_view(view, 'get', user, path=path)
+        samples.append(elapsed['seconds'] * 1000)
+    return response, statistics.median(samples)
+
+
+def main():
+    setup_django()
+
+    from django.test import RequestFactory
+    from firemateApp.middleware import CompressionMiddleware, brotli
+    from firemateApp.models import Ambucycle, FireIncident, IncidentMedia
+    from firemateApp.views import incident_list
+
+    admin = make_user('bench-admin', 'ADMIN')
+    reporter = make_user('bench-reporter', 'REPORTER')
+    operator = make_user('bench-operator', 'AMBUCYCLE_OPERATOR')
+    ambucycle = Ambucycle.objects.create(vehicle_number='AMB-0001', operator=operator)
+    for i in range(INCIDENTS):
+        incident = FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Smoke and flames spotted at market square',
+            status=random.choice(['VERIFIED', 'IN_PROGRESS']),
+            voice_analysis_details={'stress_level': 'high', 'features': [random.random() for _ in range(16)]},
+            assigned_ambucycle=ambucycle,
+        )
+        IncidentMedia.objects.create(incident=incident, media_type='IMAGE', file_url=f'https://example.com/{i}.jpg')
+
+    factory = RequestFactory()
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+
+    rows = []
+    for name, path in [('full', '/'), ('map view', f'/{MAP_QUERY}')]:
+        response, median_ms = measure(incident_list, admin, path)
+        rows += [
+            (f'{name} server ms (median)', f'{median_ms:.1f}'),
+            (f'{name} bytes', len(response.content)),
+        ]
+        for encoding in encodings:
+            middleware = CompressionMiddleware(lambda request: response)
+            with timer() as elapsed:
+                compressed = middleware(factory.get(path, HTTP_ACCEPT_ENCODING=encoding))
+            rows += [
+                (f'{name} bytes ({encoding})', len(compressed.content)),
+                (f'{name} {encoding} ms', f"{elapsed['seconds'] * 1000:.1f}"),
+            ]
+            response = call_view(incident_list, 'get', admin, path=path)
+
+    report(f'Sparse fieldsets ({INCIDENTS} incidents, {MAP_QUERY})', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Firebase authentication: authenticated request throughput with and without
+the verified-token cache, signing tokens with a local key so no network or
+service account is needed.
+"""
+import time
+
+from common import setup_django, make_user, timer, report
+
+REQUESTS = 2000
+PROJECT_ID = 'firemate-bench'
+
+
+def main():
+    setup_django()
+
+    import firebase_admin
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from google.auth import crypt, jwt
+    from rest_framework.decorators import api_view, authentication_classes, permission_classes
+    from rest_framework.permissions import IsAuthenticated
+    from rest_framework.response import Response
+    from rest_framework.test import APIRequestFactory
+
+    # Stands in for the service account app so the module skips its own initialization
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(options={'projectId': PROJECT_ID})
+    from firemateApp import firebase_authentication
+    from firemateApp.firebase_tokens import StaticCertSource, TokenVerifier, VerifiedTokenCache
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    signer = crypt.RSASigner.from_string(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()),
+        key_id='bench',
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    make_user('bench-reporter', 'REPORTER')
+    now = int(time.time())
+    token = jwt.encode(signer, {
+        'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+        'aud': PROJECT_ID,
+        'sub': 'bench-uid',
+        'email': 'bench-reporter@firemate.test',
+        'iat': now,
+        'exp': now + 3600,
+    }).decode()
+
+    @api_view(['GET'])
+    @authentication_classes([firebase_authentication.FirebaseAuthentication])
+    @permission_classes([IsAuthenticated])
+    def whoami(request):
+        return Response({'id': request.user.id})
+
+    factory = APIRequestFactory()
+    certs = StaticCertSource({'bench': public_pem})
+    rows = []
+    for name, cache in [('uncached', None), ('cached', VerifiedTokenCache())]:
+        firebase_authentication.token_verifier = TokenVerifier(PROJECT_ID, certs, cache=cache)
+        with timer() as elapsed:
+            for _ in range(REQUESTS):
+                response = whoami(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+                assert response.status_code == 200, response.data
+        rows.append((f'{name} requests/s', f"{REQUESTS / elapsed['seconds']:,.0f}"))
+
+    report(f'Firebase authentication ({REQUESTS} requests, one token)', rows)
+
+
+if __name__ == '__main__':
+    main()
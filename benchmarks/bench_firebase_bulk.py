@@ -0,0 +1,58 @@
+"""
+Firebase bulk user management: users/sec of the batched auth_utils helpers
+against the in-memory auth fake with a simulated round trip, versus one
+Admin SDK call per user.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+from common import BASE_DIR, timer, report
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'Firebase'))
+
+import firebase_admin  # noqa: E402
+
+# auth_utils initializes an app from the service account key unless one exists
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(options={'projectId': 'firemate-bench'})
+
+from auth_fake import FakeAuth  # noqa: E402
+from auth_utils import bulk_create_users, bulk_delete_users, bulk_get_users  # noqa: E402
+
+USERS = 10000
+ROUND_TRIP = 0.05  # Seconds per Admin SDK request
+SEQUENTIAL_SAMPLE = 100
+
+
+def main():
+    users = [{'uid': f'uid-{i}', 'email': f'responder{i}@firemate.test'} for i in range(USERS)]
+
+    # One request per user, as create_user() / delete_user() do
+    with timer() as elapsed:
+        for _ in range(SEQUENTIAL_SAMPLE):
+            time.sleep(ROUND_TRIP)
+    rows = [('one call per user users/s', f"{SEQUENTIAL_SAMPLE / elapsed['seconds']:,.0f}")]
+
+    for workers in (1, 4):
+        client = FakeAuth(latency=ROUND_TRIP)
+        with contextlib.redirect_stdout(io.StringIO()), timer() as elapsed:
+            bulk_create_users(users, client=client, max_workers=workers)
+        rows.append((f'bulk_create_users, {workers} workers users/s', f"{USERS / elapsed['seconds']:,.0f}"))
+
+        with timer() as elapsed:
+            bulk_get_users([user['email'] for user in users], client=client, max_workers=workers)
+        rows.append((f'bulk_get_users, {workers} workers users/s', f"{USERS / elapsed['seconds']:,.0f}"))
+
+    # Deletes are rate limited per project, so they stay sequential
+    with contextlib.redirect_stdout(io.StringIO()), timer() as elapsed:
+        bulk_delete_users([user['uid'] for user in users], client=client)
+    rows.append(('bulk_delete_users users/s', f"{USERS / elapsed['seconds']:,.0f}"))
+
+    report(f'Firebase bulk users ({USERS} users, {ROUND_TRIP * 1000:.0f} ms round trip)', rows)
+
+
+if __name__ == '__main__':
+    main()
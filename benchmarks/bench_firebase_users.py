@@ -0,0 +1,53 @@
+"""
+Firebase user lookup: queries and time per authenticated request for the
+old get_or_create-by-email lookup versus the UID mapping with its LRU.
+"""
+import random
+
+from common import setup_django, timer, report
+
+USERS = 2000
+REQUESTS = 5000
+
+
+def main():
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from firemateApp.firebase_users import firebase_users
+
+    User = get_user_model()
+    tokens = [
+        {'uid': f'uid-{i}', 'sub': f'uid-{i}', 'email': f'user{i}@firemate.test', 'email_verified': True}
+        for i in range(USERS)
+    ]
+    User.objects.bulk_create([
+        User(username=f'user{i}', email=claims['email'], role='REPORTER') for i, claims in enumerate(tokens)
+    ])
+    # Link everyone up front so both paths measure steady state
+    for claims in tokens:
+        firebase_users.resolve(claims)
+    firebase_users.clear()
+
+    workload = [random.choice(tokens) for _ in range(REQUESTS)]
+    rows = []
+    for name, lookup in [
+        ('get_or_create by email', lambda claims: User.objects.get_or_create(email=claims['email'])[0]),
+        ('uid mapping (cold LRU)', firebase_users.resolve),
+        ('uid mapping (warm LRU)', firebase_users.resolve),
+    ]:
+        with CaptureQueriesContext(connection) as queries, timer() as elapsed:
+            for claims in workload:
+                lookup(claims)
+        rows += [
+            (f'{name} queries/request', f'{len(queries) / REQUESTS:.2f}'),
+            (f'{name} us/request', f"{elapsed['seconds'] / REQUESTS * 1e6:.0f}"),
+        ]
+
+    report(f'Firebase user lookup ({USERS} users, {REQUESTS} requests)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Firestore import: docs/sec of the batched importer against the in-memory
+fake with a simulated commit round trip, versus one add() per document.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import BASE_DIR, timer, report
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'Firebase'))
+
+from firestore_fake import FakeFirestore, SERVER_TIMESTAMP  # noqa: E402
+from import_to_firestore import Checkpoint, FirestoreImporter  # noqa: E402
+
+DOCUMENTS = 20000
+ROUND_TRIP = 0.02  # Seconds per write request
+SEQUENTIAL_SAMPLE = 200
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'emergencies.ndjson')
+        with open(source, 'w') as f:
+            for i in range(DOCUMENTS):
+                f.write(json.dumps({
+                    'description': 'Smoke and flames spotted at market square',
+                    'location': 'Kejetia Market, Kumasi',
+                    'reporter_email': f'reporter{i % 500}@firemate.test',
+                    'status': 'pending',
+                }) + '\n')
+
+        # The old script: one add() and one round trip per document
+        db = FakeFirestore()
+        with timer() as elapsed:
+            for _ in range(SEQUENTIAL_SAMPLE):
+                time.sleep(ROUND_TRIP)
+                db.collection('emergencies').add({'description': 'Smoke and flames spotted at market square'})
+        rows = [('add() per document docs/s', f"{SEQUENTIAL_SAMPLE / elapsed['seconds']:,.0f}")]
+
+        for concurrency in (1, 4, 8):
+            db = FakeFirestore(commit_latency=ROUND_TRIP)
+            importer = FirestoreImporter(
+                db, SERVER_TIMESTAMP, Checkpoint(os.path.join(tmp, f'checkpoint-{concurrency}.json')),
+                max_in_flight=concurrency,
+            )
+            with timer() as elapsed:
+                importer.import_file('emergencies', source, 'timestamp')
+            rows.append((f'batched, {concurrency} in flight docs/s', f"{DOCUMENTS / elapsed['seconds']:,.0f}"))
+
+    report(f'Firestore import ({DOCUMENTS} documents, {ROUND_TRIP * 1000:.0f} ms round trip)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Firestore sync: rows/sec and lag of the incremental sync engine against the
+in-memory Firestore fake with a simulated round trip, for a first full push,
+an incremental push after a handful of changes, and a pull of remote edits.
+"""
+import os
+import random
+import sys
+from datetime import timedelta
+
+from common import BASE_DIR, setup_django, make_user, timer, report
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'Firebase'))
+
+from firestore_fake import FakeFirestore  # noqa: E402
+
+INCIDENTS = 2000
+CHANGES = 20
+REMOTE_EDITS = 200
+ROUND_TRIP = 0.02  # Seconds per batch commit
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.utils import timezone
+    from firemateApp.firestore_sync import FirestoreSync
+    from firemateApp.models import FireIncident, FirestoreDocument
+
+    # Nothing else is writing, so entries can be read back immediately
+    settings.SYNC_SETTLE_SECONDS = 0
+
+    reporter = make_user('bench-reporter', 'REPORTER')
+    incidents = [
+        FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Smoke and flames spotted at market square',
+        )
+        for _ in range(INCIDENTS)
+    ]
+
+    db = FakeFirestore(commit_latency=ROUND_TRIP)
+    engine = FirestoreSync(db)
+    rows = []
+
+    with timer() as elapsed:
+        stats = engine.sync_once()['emergencies']
+    rows.append(('initial push rows/s', f"{stats['pushed'] / elapsed['seconds']:,.0f}"))
+
+    for incident in random.sample(incidents, CHANGES):
+        incident.status = 'VERIFIED'
+        incident.save()
+    commits = db.commits
+    with timer() as elapsed:
+        stats = engine.sync_once()['emergencies']
+    rows.append((f'incremental push ({CHANGES} changes) ms', f"{elapsed['seconds'] * 1000:.1f}"))
+    rows.append(('incremental push commits', db.commits - commits))
+
+    document_ids = dict(
+        FirestoreDocument.objects.filter(collection='emergencies').values_list('object_id', 'document_id')
+    )
+    edited_at = timezone.now()
+    for incident in random.sample(incidents, REMOTE_EDITS):
+        db.collection('emergencies').document(document_ids[incident.pk]).set(
+            {'description': 'Fire spreading to the north stalls', 'updated_at': edited_at + timedelta(seconds=1)},
+            merge=True,
+        )
+    with timer() as elapsed:
+        stats = engine.sync_once()['emergencies']
+    rows.append(('pull rows/s', f"{stats['pulled'] / elapsed['seconds']:,.0f}"))
+    rows.append(('push lag s', f"{stats['push_lag']:.1f}"))
+
+    report(f'Firestore sync ({INCIDENTS} incidents, {ROUND_TRIP * 1000:.0f} ms round trip)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Idempotent retries: rows created and analyses run when mobile clients on a
+flaky network retry incident_create and media_create, without an
+Idempotency-Key versus with one per logical request.
+
+Each client reports an incident, then uploads a photo to it. An attempt's
+response is lost with probability LOSS after the server did the work, and a
+client that hears nothing within TIMEOUT retries while the first attempt is
+still running, as mobile HTTP stacks do. Inference is simulated with a
+fixed delay. Rate limits are off so both runs see every attempt.
+
+Without keys, duplicate incidents mostly take their cluster's result
+rather than a full analysis, and duplicate media do not trigger one at
+all, so retries cost rows and analysis passes more than inference.
+"""
+import io
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from common import setup_django, make_user, report
+
+CLIENTS = 50
+CONCURRENT_CLIENTS = 4
+WORKER_THREADS = 1  # SQLite takes one writer at a time, so retries queue behind their first attempt
+LOSS = 0.3
+TIMEOUT = 0.25  # Seconds before a client gives up on an attempt and retries
+MAX_ATTEMPTS = 5
+INFERENCE_SECONDS = 0.3
+LATITUDES = (4.7, 11.2)  # Ghana's extent
+LONGITUDES = (-3.3, 1.2)
+
+
+def photo():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (200, 80, 20)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def main():
+    setup_django()
+
+    from django.core.cache import cache
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from firemateApp.admission import ReporterRateThrottle
+    from firemateApp.models import FireIncident, IncidentCluster, IncidentMedia
+    from firemateApp.views import incident_create, media_create, _analyze_incident, _run_analysis
+
+    image = photo()
+
+    def inference(analysis_input):
+        time.sleep(INFERENCE_SECONDS)
+        return 90.0, 'Success'
+
+    def send(view, user, data, key, format):
+        headers = {'Idempotency-Key': key} if key else {}
+        request = APIRequestFactory().post('/', data(), format=format, headers=headers)
+        force_authenticate(request, user=user)
+        try:
+            response = view(request)
+            response.render()
+            return response
+        finally:
+            connection.close()
+
+    def with_retries(pool, rng, view, user, data, use_keys, format='json'):
+        # One logical request: the same key on every attempt
+        key = str(uuid.uuid4()) if use_keys else None
+        pending = []
+        for _ in range(MAX_ATTEMPTS):
+            pending.append(pool.submit(send, view, user, data, key, format))
+            try:
+                response = pending[-1].result(timeout=TIMEOUT)
+            except TimeoutError:
+                continue
+            if rng.random() >= LOSS:
+                return response
+        # Out of attempts: settle for whichever attempt answers
+        return pending[0].result()
+
+    def run(use_keys):
+        cache.clear()
+        # Reports of the other run would otherwise cluster with this one's
+        FireIncident.objects.all().delete()
+        IncidentCluster.objects.all().delete()
+        prefix = 'keyed' if use_keys else 'plain'
+        clients = [make_user(f'{prefix}{i}', 'REPORTER') for i in range(CLIENTS)]
+        triggers = mock.Mock(wraps=_analyze_incident)
+        analyses = mock.Mock(wraps=_run_analysis)
+
+        def client(i):
+            # Same network luck and places in both runs
+            rng, user = random.Random(i), clients[i]
+            latitude, longitude = rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+            incident = with_retries(pool, rng, incident_create, user, lambda: {
+                'latitude': latitude, 'longitude': longitude, 'description': 'Fire at the market',
+            }, use_keys)
+            with_retries(pool, rng, media_create, user, lambda: {
+                'incident': incident.data['id'], 'media_type': 'IMAGE',
+                'file': SimpleUploadedFile('fire.jpg', image, content_type='image/jpeg'),
+            }, use_keys, format='multipart')
+
+        with mock.patch('firemateApp.views.analyze_image', side_effect=inference) as analyze_image, \
+                mock.patch('firemateApp.views._analyze_incident', triggers), \
+                mock.patch('firemateApp.views._run_analysis', analyses), \
+                mock.patch('firemateApp.views.load_analysis_input', return_value=np.zeros((224, 224, 3), np.uint8)), \
+                mock.patch.object(ReporterRateThrottle, 'allow_request', return_value=True), \
+                ThreadPoolExecutor(max_workers=WORKER_THREADS) as pool, \
+                ThreadPoolExecutor(max_workers=CONCURRENT_CLIENTS) as clients_pool:
+            list(clients_pool.map(client, range(CLIENTS)))
+        return {
+            'incidents': FireIncident.objects.count(),
+            'media': IncidentMedia.objects.count(),
+            'triggers': triggers.call_count,
+            'analyses': analyses.call_count,
+            'inference': analyze_image.call_count,
+        }
+
+    plain = run(use_keys=False)
+    keyed = run(use_keys=True)
+
+    report(f'Idempotent retries ({CLIENTS} clients, {LOSS:.0%} responses lost, {TIMEOUT * 1000:.0f} ms client timeout)', [
+        ('incidents created, no key', plain['incidents']),
+        ('incidents created, Idempotency-Key', keyed['incidents']),
+        ('media created, no key', plain['media']),
+        ('media created, Idempotency-Key', keyed['media']),
+        ('analyses triggered, no key', plain['triggers']),
+        ('analyses triggered, Idempotency-Key', keyed['triggers']),
+        ('full analyses run, no key', plain['analyses']),
+        ('full analyses run, Idempotency-Key', keyed['analyses']),
+        ('inference runs, no key', plain['inference']),
+        ('inference runs, Idempotency-Key', keyed['inference']),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Image preprocessing: decode+preprocess time and peak RSS for large phone
+JPEGs, comparing the reduced-resolution decode into a preallocated batch
+with the old full decode, resize and per-image array copies.
+
+The TensorFlow steps are left out on both sides (the old img_to_array and
+expand_dims are plain array copies, done here with NumPy), so the script
+runs without TensorFlow installed. Each variant runs in a fresh process so
+its peak RSS is its own.
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from common import BASE_DIR, timer, report
+
+PHOTOS = 16
+PHOTO_SIZE = (4032, 3024)  # A 12 MP phone camera
+WORKERS = 4
+
+
+def peak_rss_mb():
+    # VmHWM rather than ru_maxrss, which a child inherits from its parent across exec
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+
+def photo(seed):
+    from PIL import Image, ImageFilter
+
+    # Smoothed noise compresses like a photo rather than a flat test card
+    rng = np.random.default_rng(seed)
+    small = Image.fromarray(rng.integers(0, 255, (PHOTO_SIZE[1] // 16, PHOTO_SIZE[0] // 16, 3), dtype=np.uint8))
+    image = small.resize(PHOTO_SIZE).filter(ImageFilter.GaussianBlur(2))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Taken in portrait
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+def full_decode(content):
+    """
+    The old preprocess_image path, up to the model's own preprocessing.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(content))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image = image.resize((224, 224))
+    return np.asarray(image, dtype=np.float32)[np.newaxis]
+
+
+def measure(mode, paths):
+    """
+    Preprocess the photos at ``paths`` one way and print seconds and peak RSS growth.
+
+    Runs in its own process, since peak RSS never goes back down.
+    """
+    sys.path.insert(0, BASE_DIR)
+    from firemateApp.image_preprocessing import decode_batch
+
+    photos = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            photos.append(f.read())
+    baseline = peak_rss_mb()
+    with timer() as elapsed:
+        if mode == 'full':
+            for content in photos:
+                full_decode(content)
+        elif mode == 'reduced':
+            for content in photos:
+                decode_batch([content])
+        else:
+            decode_batch(photos, max_workers=WORKERS)
+    print(json.dumps({'seconds': elapsed['seconds'], 'rss': peak_rss_mb() - baseline}))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(PHOTOS):
+            paths.append(os.path.join(tmp, f'{i}.jpg'))
+            with open(paths[-1], 'wb') as f:
+                f.write(photo(i))
+        results = {}
+        for mode in ('full', 'reduced', 'batch'):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), mode, *paths],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(output)
+
+    report(f'Image preprocessing ({PHOTOS} JPEGs, {PHOTO_SIZE[0]}x{PHOTO_SIZE[1]})', [
+        ('full decode per image ms', f"{results['full']['seconds'] * 1000 / PHOTOS:.1f}"),
+        ('reduced decode per image ms', f"{results['reduced']['seconds'] * 1000 / PHOTOS:.1f}"),
+        (f'reduced decode batch, {WORKERS} threads, per image ms', f"{results['batch']['seconds'] * 1000 / PHOTOS:.1f}"),
+        ('peak RSS growth, full decode MB', f"{results['full']['rss']:,.1f}"),
+        ('peak RSS growth, reduced decode MB', f"{results['reduced']['rss']:,.1f}"),
+        (f'peak RSS growth, {PHOTOS}-image batch MB', f"{results['batch']['rss']:,.1f}"),
+        ('CPUs', os.cpu_count()),
+    ])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        measure(sys.argv[1], sys.argv[2:])
+    else:
+        main()
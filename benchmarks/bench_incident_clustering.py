@@ -0,0 +1,105 @@
+"""
+Duplicate report clustering: time to assign a new report to its event
+cluster with 1M historical incidents on record, through the grid index on
+(cell, last_reported_at), versus a bounding-box query over the clusters'
+coordinates, which no index serves.
+
+History is two years of events across Ghana, each reported one to five
+times. New reports are a mix of duplicates of events still within the
+window and reports of new events.
+"""
+import math
+import random
+import statistics
+from datetime import timedelta
+
+from common import setup_django, timer, report
+
+INCIDENTS = 1_000_000
+BATCH = 10_000
+NEW_REPORTS = 1000
+BASELINE_QUERIES = 20
+LATITUDES = (4.7, 11.2)  # Ghana's extent
+LONGITUDES = (-3.3, 1.2)
+HISTORY_DAYS = 730
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.utils import timezone
+    from firemateApp.clustering import METERS_PER_DEGREE, assign_cluster, cell_key, grid_cell
+    from firemateApp.models import FireIncident, IncidentCluster
+
+    rng = random.Random(0)
+    radius = settings.INCIDENT_CLUSTER_RADIUS
+    now = timezone.now()
+
+    with timer() as loading:
+        incidents = 0
+        while incidents < INCIDENTS:
+            clusters, sizes = [], []
+            for _ in range(BATCH // 3):
+                latitude, longitude = rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+                reported_at = now - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+                sizes.append(rng.randint(1, 5))
+                clusters.append(IncidentCluster(
+                    cell=cell_key(*grid_cell(latitude, longitude, radius)), latitude=latitude, longitude=longitude,
+                    size=sizes[-1], first_reported_at=reported_at, last_reported_at=reported_at,
+                ))
+            clusters = IncidentCluster.objects.bulk_create(clusters)
+            members = [
+                FireIncident(latitude=cluster.latitude, longitude=cluster.longitude, description='History',
+                             status='RESOLVED', cluster=cluster)
+                for cluster, size in zip(clusters, sizes) for _ in range(size)
+            ][:INCIDENTS - incidents]
+            FireIncident.objects.bulk_create(members, batch_size=BATCH)
+            incidents += len(members)
+    cluster_count = IncidentCluster.objects.count()
+
+    # Events reported within the window, which some new reports duplicate
+    recent = list(IncidentCluster.objects.order_by('-last_reported_at')[:50])
+    for cluster in recent:
+        cluster.last_reported_at = now - timedelta(minutes=rng.uniform(0, 20))
+    IncidentCluster.objects.bulk_update(recent, ['last_reported_at'])
+
+    durations, joined = [], 0
+    for i in range(NEW_REPORTS):
+        if i % 3 == 0:
+            event = rng.choice(recent)
+            bearing, meters = rng.uniform(0, 2 * math.pi), rng.uniform(0, radius * 0.8)
+            latitude = event.latitude + meters * math.cos(bearing) / METERS_PER_DEGREE
+            longitude = event.longitude + meters * math.sin(bearing) / (
+                METERS_PER_DEGREE * math.cos(math.radians(event.latitude)))
+        else:
+            latitude, longitude = rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+        incident = FireIncident.objects.create(latitude=latitude, longitude=longitude, description='New')
+        with timer() as elapsed:
+            cluster = assign_cluster(incident)
+        durations.append(elapsed['seconds'])
+        joined += cluster.size > 1
+
+    window = timedelta(seconds=settings.INCIDENT_CLUSTER_WINDOW)
+    degrees = radius / METERS_PER_DEGREE
+    with timer() as baseline:
+        for _ in range(BASELINE_QUERIES):
+            latitude, longitude = rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+            list(IncidentCluster.objects.filter(
+                latitude__range=(latitude - degrees, latitude + degrees),
+                longitude__range=(longitude - 2 * degrees, longitude + 2 * degrees),
+                last_reported_at__gte=now - window,
+            ))
+
+    durations.sort()
+    report(f'Incident clustering ({INCIDENTS:,} historical incidents, {cluster_count:,} clusters)', [
+        ('history load s', f"{loading['seconds']:.1f}"),
+        ('grid index assignment, mean ms', f'{statistics.mean(durations) * 1000:.2f}'),
+        ('grid index assignment, p99 ms', f'{durations[int(len(durations) * 0.99)] * 1000:.2f}'),
+        ('bounding-box scan per lookup ms', f"{baseline['seconds'] * 1000 / BASELINE_QUERIES:.1f}"),
+        ('new reports joining a cluster', f'{joined} / {NEW_REPORTS}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
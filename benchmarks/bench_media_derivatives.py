@@ -0,0 +1,79 @@
+"""
+Media derivatives: time to prepare the image model input from the stored
+224x224 derivative versus decoding the full-resolution original, and bytes
+a map view downloads for its photos as originals versus thumbnails.
+"""
+import io
+import shutil
+import tempfile
+
+import numpy as np
+
+from common import setup_django, timer, report
+
+PHOTOS = 20
+PHOTO_SIZE = (4032, 3024)  # A 12 MP phone camera
+ANALYSES = 5
+
+
+def photo(seed):
+    from PIL import Image, ImageFilter
+
+    # Smoothed noise compresses like a photo rather than a flat test card
+    rng = np.random.default_rng(seed)
+    small = Image.fromarray(rng.integers(0, 255, (PHOTO_SIZE[1] // 16, PHOTO_SIZE[0] // 16, 3), dtype=np.uint8))
+    image = small.resize(PHOTO_SIZE).filter(ImageFilter.GaussianBlur(2))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files.storage import default_storage
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from firemateApp.ai_analysis import preprocess_image
+    from firemateApp.media_derivatives import load_analysis_input
+    from firemateApp.media_ingest import ingest
+    from firemateApp.models import FireIncident
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    try:
+        incident = FireIncident.objects.create(latitude=6.69, longitude=-1.62, description='Bench')
+        photos = [photo(i) for i in range(PHOTOS)]
+        with timer() as ingest_time:
+            media = [ingest(SimpleUploadedFile(f'{i}.jpg', content), incident) for i, content in enumerate(photos)]
+
+        with timer() as from_original:
+            for item in media[:ANALYSES]:
+                with item.file.open('rb') as original:
+                    preprocess_image(original)
+        with timer() as from_derivative:
+            for item in media[:ANALYSES]:
+                preprocess_image(load_analysis_input(item))
+
+        original_bytes = sum(item.size for item in media)
+        thumbnail_bytes = {
+            (size, extension): sum(
+                default_storage.size(item.analysis_input.replace('analysis.npy', f'{size}.{extension}')) for item in media
+            )
+            for size in ('small', 'medium') for extension in ('webp', 'jpg')
+        }
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    rows = [
+        ('ingest with derivatives per upload ms', f"{ingest_time['seconds'] * 1000 / PHOTOS:.1f}"),
+        ('preprocess from original ms', f"{from_original['seconds'] * 1000 / ANALYSES:.1f}"),
+        ('preprocess from derivative ms', f"{from_derivative['seconds'] * 1000 / ANALYSES:.1f}"),
+        ('map view bytes, originals', f'{original_bytes:,}'),
+    ]
+    rows += [(f'map view bytes, {size} {extension}', f'{total:,}') for (size, extension), total in thumbnail_bytes.items()]
+    report(f'Media derivatives ({PHOTOS} photos, {PHOTO_SIZE[0]}x{PHOTO_SIZE[1]})', rows)
+
+
+if __name__ == '__main__':
+    main()
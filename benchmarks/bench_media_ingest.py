@@ -0,0 +1,98 @@
+"""
+Media ingestion: peak RSS and throughput of a 200 MB video uploaded to
+media_create as a streamed multipart body, versus reading the same file
+into memory whole as the old analysis path did.
+"""
+import hashlib
+import os
+import resource
+import shutil
+import tempfile
+
+from common import setup_django, make_user, timer, report
+
+VIDEO_MB = 200
+CHUNK = 1024 * 1024
+BOUNDARY = 'firemate-bench-boundary'
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_body(path, incident_id):
+    """
+    Write a multipart body with a fake MP4 of VIDEO_MB megabytes, chunk by chunk.
+    """
+    with open(path, 'wb') as f:
+        f.write((
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="incident"\r\n\r\n{incident_id}\r\n'
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="media_type"\r\n\r\nVIDEO\r\n'
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="incident.mp4"\r\n'
+            f'Content-Type: video/mp4\r\n\r\n'
+        ).encode())
+        f.write(b'\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2')
+        chunk = os.urandom(CHUNK)
+        for _ in range(VIDEO_MB):
+            f.write(chunk)
+        f.write(f'\r\n--{BOUNDARY}--\r\n'.encode())
+    return os.path.getsize(path)
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIRequest
+    from rest_framework.test import force_authenticate
+    from firemateApp.models import FireIncident
+    from firemateApp.views import media_create
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    reporter = make_user('bench-reporter', 'REPORTER')
+    incident = FireIncident.objects.create(reporter=reporter, latitude=6.69, longitude=-1.62, description='Bench')
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            body_path = os.path.join(tmp, 'body')
+            length = write_body(body_path, incident.pk)
+            baseline = peak_rss_mb()
+
+            with open(body_path, 'rb') as body, timer() as elapsed:
+                request = WSGIRequest({
+                    'REQUEST_METHOD': 'POST',
+                    'PATH_INFO': '/',
+                    'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+                    'CONTENT_LENGTH': str(length),
+                    'wsgi.input': body,
+                    'SERVER_NAME': 'testserver',
+                    'SERVER_PORT': '80',
+                })
+                force_authenticate(request, user=reporter)
+                response = media_create(request)
+            streamed_peak = peak_rss_mb()
+            assert response.status_code == 201, response.data
+
+            # The old path: the whole file in memory at once
+            with open(body_path, 'rb') as body:
+                hashlib.sha256(body.read()).hexdigest()
+            whole_peak = peak_rss_mb()
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    report(f'Media ingestion ({VIDEO_MB} MB video)', [
+        ('peak RSS before upload MB', f'{baseline:,.0f}'),
+        ('peak RSS growth, streamed upload MB', f'{streamed_peak - baseline:,.0f}'),
+        ('peak RSS growth, read whole MB', f'{whole_peak - streamed_peak:,.0f}'),
+        ('streamed upload MB/s', f"{length / CHUNK / elapsed['seconds']:,.0f}"),
+        ('stored size bytes', response.data['size']),
+    ])
+
+
+if __name__ == '__main__':
+    main()
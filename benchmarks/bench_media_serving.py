@@ -0,0 +1,78 @@
+"""
+Media serving: how many concurrent video downloads one worker's threads
+get through when Django streams the bytes to slow clients, versus handing
+the transfer to the front-end server with X-Accel-Redirect, plus the time
+to answer a seek (Range request) near the end of the file.
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import setup_django, make_user, call_view, timer, report
+
+VIDEO_MB = 8
+THREADS = 4  # e.g. gunicorn --threads 4
+CLIENTS = 16
+CLIENT_MB_PER_SECOND = 4  # A decent mobile connection
+
+
+def download(view, user, pk, headers=None):
+    """
+    Fetch the file as a client on a CLIENT_MB_PER_SECOND link would, holding the worker thread throughout.
+    """
+    response = call_view(view, 'get', user, headers=headers, pk=pk)
+    received = 0
+    if response.streaming:
+        for chunk in response.streaming_content:
+            received += len(chunk)
+            time.sleep(len(chunk) / (CLIENT_MB_PER_SECOND * 1024 * 1024))
+    response.close()
+    return response.status_code, received
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from firemateApp.media_ingest import ingest
+    from firemateApp.models import FireIncident
+    from firemateApp.views import media_file
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    try:
+        reporter = make_user('bench-reporter', 'REPORTER')
+        incident = FireIncident.objects.create(reporter=reporter, latitude=6.69, longitude=-1.62, description='Bench')
+        content = b'\x00\x00\x00\x18ftypisom' + os.urandom(VIDEO_MB * 1024 * 1024)
+        media = ingest(SimpleUploadedFile('clip.mp4', content), incident)
+
+        results = {}
+        for mode in (None, 'x-accel-redirect'):
+            settings.MEDIA_SENDFILE = mode
+            with ThreadPoolExecutor(max_workers=THREADS) as pool, timer() as elapsed:
+                statuses = list(pool.map(lambda _: download(media_file, reporter, media.pk), range(CLIENTS)))
+            assert all(code == 200 for code, _ in statuses), statuses
+            results[mode] = elapsed['seconds']
+
+        settings.MEDIA_SENDFILE = None
+        tail = f'bytes={len(content) - 65536}-'
+        with timer() as seek:
+            code, received = download(media_file, reporter, media.pk, headers={'Range': tail})
+        assert code == 206 and received == 65536, (code, received)
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    report(f'Media serving ({CLIENTS} clients, {VIDEO_MB} MB video, {THREADS} threads, {CLIENT_MB_PER_SECOND} MB/s links)', [
+        ('streamed by Django, wall s', f'{results[None]:.2f}'),
+        ('streamed by Django, downloads/s per worker', f'{CLIENTS / results[None]:.1f}'),
+        ('X-Accel-Redirect, wall s', f"{results['x-accel-redirect']:.3f}"),
+        ('X-Accel-Redirect, downloads/s per worker', f"{CLIENTS / results['x-accel-redirect']:,.0f}"),
+        ('seek to last 64 KB, incl. transfer ms', f"{seek['seconds'] * 1000:.1f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Two-phase media upload: time from the reporter pressing send to the incident
+having a confidence score, over a throttled mobile link, when the full
+original is uploaded first versus a small analysis proxy (a downscaled
+photo, a low-rate voice excerpt) with the original following in chunks.
+
+Link time is simulated as bytes / bandwidth plus a round trip per request;
+server time (ingest, derivatives and _analyze_incident) is measured.
+"""
+import io
+import shutil
+import tempfile
+import wave
+
+import numpy as np
+
+from common import setup_django, make_user, timer, report
+from bench_media_derivatives import photo
+
+LINK_KBPS = 384  # A congested 3G link
+RTT_SECONDS = 0.3
+CHUNK_BYTES = 256 * 1024  # Per PATCH of the original
+VOICE_SECONDS = 60
+PROXY_SECONDS = 15
+PROXY_EDGE = 448  # Twice the model input, enough for a clean downscale
+
+
+def link_seconds(size, requests=1):
+    return size * 8 / (LINK_KBPS * 1000) + requests * RTT_SECONDS
+
+
+def voice(seconds, rate):
+    """
+    A rough voice-like signal as a mono 16-bit WAV.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * rate) / rate
+    signal = np.sin(2 * np.pi * 200 * t) * (np.sin(2 * np.pi * 4 * t) > 0) * 8000 + rng.normal(0, 300, t.size)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(signal.astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+def image_proxy(content):
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(content))
+    image.draft('RGB', (PROXY_EDGE, PROXY_EDGE))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((PROXY_EDGE, PROXY_EDGE))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=80)
+    return buffer.getvalue()
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from firemateApp.models import FireIncident
+    from firemateApp.views import media_create, media_original
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    factory = APIRequestFactory()
+    reporter = make_user('bench-reporter', 'REPORTER')
+
+    def create(name, field, content, **data):
+        incident = FireIncident.objects.create(reporter=reporter, latitude=6.69, longitude=-1.62, description='Bench')
+        request = factory.post('/', {'incident': incident.pk, field: SimpleUploadedFile(name, content), **data},
+                               format='multipart')
+        force_authenticate(request, user=reporter)
+        with timer() as elapsed:
+            response = media_create(request)
+        assert response.status_code == 201, response.data
+        return response.data['id'], elapsed['seconds']
+
+    def attach(pk, content):
+        seconds = 0
+        for offset in range(0, len(content), CHUNK_BYTES):
+            chunk = content[offset:offset + CHUNK_BYTES]
+            request = factory.patch('/', chunk, content_type='application/offset+octet-stream',
+                                    HTTP_UPLOAD_OFFSET=str(offset))
+            force_authenticate(request, user=reporter)
+            with timer() as elapsed:
+                response = media_original(request, pk=pk)
+            assert response.status_code in (200, 204), response.data
+            seconds += elapsed['seconds']
+        return seconds
+
+    rows = []
+    try:
+        original_photo = photo(0)
+        for label, name, original, proxy in (
+            ('photo', 'fire.jpg', original_photo, image_proxy(original_photo)),
+            # As a phone recorder saves it, and the first seconds at telephone rate
+            ('voice note', 'call.wav', voice(VOICE_SECONDS, 44100), voice(PROXY_SECONDS, 8000)),
+        ):
+            _, whole_server = create(name, 'file', original)
+            pk, proxy_server = create(name, 'proxy', proxy, original_size=len(original))
+            attach_server = attach(pk, original)
+            chunks = -(-len(original) // CHUNK_BYTES)
+
+            rows += [
+                (f'{label}: original / proxy bytes', f'{len(original):,} / {len(proxy):,}'),
+                (f'{label}: first score, whole original s', f'{link_seconds(len(original)) + whole_server:.1f}'),
+                (f'{label}: first score, proxy first s', f'{link_seconds(len(proxy)) + proxy_server:.1f}'),
+                (f'{label}: original stored, proxy first s',
+                 f'{link_seconds(len(proxy) + len(original), 1 + chunks) + proxy_server + attach_server:.1f}'),
+            ]
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    report(f'Two-phase media upload ({LINK_KBPS} kbit/s link, {RTT_SECONDS * 1000:.0f} ms RTT)', rows)
+
+
+if __name__ == '__main__':
+    main()
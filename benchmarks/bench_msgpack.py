@@ -0,0 +1,80 @@
+"""
+MessagePack vs JSON: encode/decode time and bytes on the wire for typical
+incident and response payloads, as rendered and parsed by the API.
+"""
+import io
+import random
+
+from common import setup_django, make_user, timer, report
+
+ROWS = 200
+ROUNDS = 20
+
+
+def best_of(func):
+    best = None
+    for _ in range(ROUNDS):
+        with timer() as elapsed:
+            func()
+        best = elapsed['seconds'] if best is None else min(best, elapsed['seconds'])
+    return best * 1000
+
+
+def main():
+    setup_django()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from firemateApp.models import Ambucycle, FireIncident, IncidentResponse
+    from firemateApp.parsers import MessagePackParser
+    from firemateApp.renderers import FastJSONRenderer, MessagePackRenderer
+    from firemateApp.serializers import fast_incident_serializer, fast_response_serializer
+
+    reporter = make_user('bench-reporter', 'REPORTER')
+    operator = make_user('bench-operator', 'AMBUCYCLE_OPERATOR')
+    ambucycle = Ambucycle.objects.create(vehicle_number='AMB-0001', operator=operator)
+    for _ in range(ROWS):
+        incident = FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Smoke and flames spotted at market square',
+            status='IN_PROGRESS',
+            voice_analysis_details={
+                'stress_level': 'high',
+                'mfcc': [[random.uniform(-50, 50) for _ in range(13)] for _ in range(8)],
+                'pitch': [random.uniform(80, 300) for _ in range(32)],
+            },
+            assigned_ambucycle=ambucycle,
+        )
+        IncidentResponse.objects.create(
+            incident=incident,
+            ambucycle=ambucycle,
+            route_data={'points': [[6.69 + random.random() / 100, -1.62 + random.random() / 100] for _ in range(100)]},
+        )
+
+    payloads = {
+        'incidents': fast_incident_serializer.serialize(FireIncident.objects.all()),
+        'responses': fast_response_serializer.serialize(IncidentResponse.objects.all()),
+    }
+    codecs = [
+        ('json', JSONRenderer(), JSONParser()),
+        ('orjson', FastJSONRenderer(), JSONParser()),
+        ('msgpack', MessagePackRenderer(), MessagePackParser()),
+    ]
+
+    rows = []
+    for name, data in payloads.items():
+        for codec, renderer, parser in codecs:
+            body = renderer.render(data)
+            rows += [
+                (f'{name} {codec} bytes', len(body)),
+                (f'{name} {codec} encode ms', f'{best_of(lambda: renderer.render(data)):.2f}'),
+                (f'{name} {codec} decode ms', f'{best_of(lambda: parser.parse(io.BytesIO(body))):.2f}'),
+            ]
+
+    report(f'Wire formats ({ROWS} rows)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Latest-position store: database writes saved and read latency for a
+simulated fleet sending location pings through ambucycle_update_location.
+"""
+import random
+import statistics
+
+from common import setup_django, make_user, call_view, timer, report
+
+FLEET_SIZE = 100
+PINGS_PER_VEHICLE = 30
+READS = 300
+
+
+def count_writes(queries):
+    return sum(1 for query in queries if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE')))
+
+
+def simulate(admin, fleet, store, flush_interval):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from firemateApp.views import ambucycle_update_location
+
+    store.clear()
+    store.flush_interval = flush_interval
+    with CaptureQueriesContext(connection) as queries, timer() as elapsed:
+        for _ in range(PINGS_PER_VEHICLE):
+            for ambucycle in fleet:
+                call_view(
+                    ambucycle_update_location, 'post', admin,
+                    data={'latitude': 6.69 + random.uniform(-0.05, 0.05), 'longitude': -1.62 + random.uniform(-0.05, 0.05)},
+                    pk=ambucycle.id,
+                )
+        # One flush stands in for the background flusher firing during the run
+        store.flush()
+    return count_writes(queries.captured_queries), elapsed['seconds']
+
+
+def read_latency(admin, view, **kwargs):
+    samples = []
+    for _ in range(READS):
+        with timer() as elapsed:
+            call_view(view, 'get', admin, **kwargs)
+        samples.append(elapsed['seconds'] * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    setup_django()
+
+    from firemateApp.models import Ambucycle
+    from firemateApp.positions import position_store
+    from firemateApp.views import ambucycle_available, ambucycle_detail
+
+    admin = make_user('bench-admin', 'ADMIN')
+    fleet = [Ambucycle.objects.create(vehicle_number=f'AMB-{i:04d}') for i in range(FLEET_SIZE)]
+    pings = FLEET_SIZE * PINGS_PER_VEHICLE
+
+    through_writes, through_seconds = simulate(admin, fleet, position_store, flush_interval=0)
+    behind_writes, behind_seconds = simulate(admin, fleet, position_store, flush_interval=3600)
+
+    available_p50, available_p95 = read_latency(admin, ambucycle_available)
+    detail_p50, detail_p95 = read_latency(admin, ambucycle_detail, pk=fleet[0].id)
+
+    report('Latest-position store', [
+        ('pings', pings),
+        ('write-through DB writes', through_writes),
+        ('write-behind DB writes', behind_writes),
+        ('writes saved', f"{100 * (1 - behind_writes / through_writes):.1f}%"),
+        ('write-through pings/sec', f"{pings / through_seconds:.0f}"),
+        ('write-behind pings/sec', f"{pings / behind_seconds:.0f}"),
+        ('ambucycle_available p50/p95 ms', f"{available_p50:.2f} / {available_p95:.2f}"),
+        ('ambucycle_detail p50/p95 ms', f"{detail_p50:.2f} / {detail_p95:.2f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main()
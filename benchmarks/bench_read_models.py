@@ -0,0 +1,88 @@
+"""
+Cached read models: hit rate and response time of incident_active and
+ambucycle_available under a read-heavy workload with occasional writes.
+"""
+import random
+import statistics
+
+from common import setup_django, make_user, call_view, timer, report
+
+INCIDENTS = 300
+FLEET_SIZE = 60
+REQUESTS = 2000
+WRITE_EVERY = 100
+
+
+def latencies(view, users, requests, write=None):
+    samples = []
+    for i in range(requests):
+        if write is not None and i and i % WRITE_EVERY == 0:
+            write()
+        with timer() as elapsed:
+            call_view(view, 'get', random.choice(users))
+        samples.append(elapsed['seconds'] * 1000)
+    return statistics.median(samples), statistics.mean(samples)
+
+
+def main():
+    setup_django()
+
+    from firemateApp.models import Ambucycle, FireIncident
+    from firemateApp.read_models import active_incidents, available_ambucycles
+    from firemateApp.views import (
+        incident_active, ambucycle_available, _build_active_incidents, _build_available_ambucycles,
+    )
+
+    users = [make_user('bench-admin', 'ADMIN')] + [make_user(f'bench-op-{i}', 'AMBUCYCLE_OPERATOR') for i in range(5)]
+    reporter = make_user('bench-reporter', 'REPORTER')
+    fleet = [
+        Ambucycle.objects.create(vehicle_number=f'AMB-{i:04d}', operator=users[1 + i % 5], is_available=i % 3 != 0)
+        for i in range(FLEET_SIZE)
+    ]
+    incidents = [
+        FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Benchmark incident',
+            status=random.choice(['VERIFIED', 'IN_PROGRESS', 'PENDING']),
+            assigned_ambucycle=random.choice(fleet),
+        )
+        for _ in range(INCIDENTS)
+    ]
+
+    def touch_incident():
+        incident = random.choice(incidents)
+        incident.status = 'IN_PROGRESS' if incident.status == 'VERIFIED' else 'VERIFIED'
+        incident.save()
+
+    def touch_ambucycle():
+        ambucycle = random.choice(fleet)
+        ambucycle.is_available = not ambucycle.is_available
+        ambucycle.save()
+
+    rows = []
+    for name, view, build, read_model, write in [
+        ('incident_active', incident_active, _build_active_incidents, active_incidents, touch_incident),
+        ('ambucycle_available', ambucycle_available, _build_available_ambucycles, available_ambucycles, touch_ambucycle),
+    ]:
+        uncached = []
+        for _ in range(50):
+            with timer() as elapsed:
+                build()
+            uncached.append(elapsed['seconds'] * 1000)
+
+        read_model.stats.update(hits=0, misses=0, waits=0)
+        p50, mean = latencies(view, users, REQUESTS, write=write)
+        rows += [
+            (f'{name} uncached median ms', f'{statistics.median(uncached):.2f}'),
+            (f'{name} cached median ms', f'{p50:.2f}'),
+            (f'{name} cached mean ms', f'{mean:.2f}'),
+            (f'{name} hit rate', f'{100 * read_model.hit_rate():.1f}% (1 write per {WRITE_EVERY} reads)'),
+        ]
+
+    report('Cached read models', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Report surge: latency of a dispatcher's triage requests while a crowd
+reports one fire, with every report analyzed in full on the request thread
+versus under admission control (views.analysis_admission and the reporter
+and area rate limits).
+
+Reports and triage requests share one worker's request threads, as they
+would under a threaded WSGI server. Each report uploads a photo; inference
+is simulated with a fixed delay so only the scheduling is measured.
+"""
+import io
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from common import setup_django, make_user, call_view, timer, report
+
+WORKER_THREADS = 8
+REPORTERS = 40
+REPORTS_EACH = 8  # Three over the per-reporter limit
+SURGE_SECONDS = 8
+PROBE_INTERVAL = 0.1
+INFERENCE_SECONDS = 0.5  # EfficientNet on a busy CPU worker
+LATITUDE, LONGITUDE = 6.6885, -1.6244  # Kejetia market, Kumasi
+
+
+def photo():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (200, 80, 20)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def main():
+    setup_django()
+
+    from django.core.cache import cache
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from firemateApp.admission import ReporterRateThrottle
+    from firemateApp.clustering import METERS_PER_DEGREE
+    from firemateApp.models import FireIncident
+    from firemateApp.views import analysis_admission, cluster_list, media_create
+
+    rng = random.Random(0)
+    image = photo()
+    dispatcher = make_user('dispatcher', 'ADMIN')
+    reporters = [make_user(f'reporter{i}', 'REPORTER') for i in range(REPORTERS)]
+
+    def new_reports():
+        reports = []
+        for reporter in reporters:
+            for _ in range(REPORTS_EACH):
+                bearing, meters = rng.uniform(0, 2 * math.pi), rng.uniform(0, 400)
+                reports.append(FireIncident.objects.create(
+                    reporter=reporter, description='Market fire',
+                    latitude=LATITUDE + meters * math.cos(bearing) / METERS_PER_DEGREE,
+                    longitude=LONGITUDE + meters * math.sin(bearing) / METERS_PER_DEGREE,
+                ))
+        rng.shuffle(reports)
+        return reports
+
+    def upload(incident):
+        request = APIRequestFactory().post('/', {
+            'incident': incident.pk, 'media_type': 'IMAGE',
+            'file': SimpleUploadedFile('fire.jpg', image, content_type='image/jpeg'),
+        }, format='multipart')
+        force_authenticate(request, user=incident.reporter)
+        try:
+            return media_create(request).status_code
+        finally:
+            connection.close()
+
+    def probe(submitted):
+        try:
+            call_view(cluster_list, 'get', dispatcher)
+            return time.perf_counter() - submitted
+        finally:
+            connection.close()
+
+    def inference(analysis_input):
+        time.sleep(INFERENCE_SECONDS)
+        return 90.0, 'Success'
+
+    def surge():
+        cache.clear()
+        reports = new_reports()
+        levels = dict(analysis_admission.stats)
+        report_futures, probe_futures = [], []
+        with mock.patch('firemateApp.views.analyze_image', side_effect=inference) as analyze_image, \
+                mock.patch('firemateApp.views.load_analysis_input', return_value=np.zeros((224, 224, 3), np.uint8)), \
+                ThreadPoolExecutor(max_workers=WORKER_THREADS) as pool, timer() as elapsed:
+            start = time.perf_counter()
+            report_gap = SURGE_SECONDS / len(reports)
+            next_probe = start
+            for i, incident in enumerate(reports):
+                now = time.perf_counter()
+                while next_probe <= now:
+                    probe_futures.append(pool.submit(probe, time.perf_counter()))
+                    next_probe += PROBE_INTERVAL
+                report_futures.append(pool.submit(upload, incident))
+                time.sleep(max(0.0, start + (i + 1) * report_gap - time.perf_counter()))
+            statuses = [future.result() for future in report_futures]
+            latencies = sorted(future.result() for future in probe_futures)
+        return {
+            'latencies': latencies,
+            'accepted': statuses.count(201),
+            'throttled': statuses.count(429),
+            'inference': analyze_image.call_count,
+            'levels': {level: count - levels[level] for level, count in analysis_admission.stats.items()},
+            'pending': FireIncident.objects.filter(pk__in=[r.pk for r in reports], analysis_pending=True).count(),
+            'seconds': elapsed['seconds'],
+        }
+
+    # Without admission control every report is analyzed in full on its request thread
+    with mock.patch.object(analysis_admission, 'full_limit', 10 ** 9), \
+            mock.patch.object(analysis_admission, 'defer_limit', 10 ** 9), \
+            mock.patch('firemateApp.views.area_crowded', return_value=False), \
+            mock.patch.object(ReporterRateThrottle, 'allow_request', return_value=True):
+        unlimited = surge()
+    admitted = surge()
+
+    def percentile(latencies, p):
+        return f'{latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000:.0f}'
+
+    reports = REPORTERS * REPORTS_EACH
+    report(f'Report surge ({reports} photo reports in {SURGE_SECONDS} s, {WORKER_THREADS} request threads, '
+           f'{INFERENCE_SECONDS * 1000:.0f} ms inference)', [
+        ('triage p50 ms, no admission control', percentile(unlimited['latencies'], 0.5)),
+        ('triage p99 ms, no admission control', percentile(unlimited['latencies'], 0.99)),
+        ('triage p50 ms, admission control', percentile(admitted['latencies'], 0.5)),
+        ('triage p99 ms, admission control', percentile(admitted['latencies'], 0.99)),
+        ('surge drained s, no admission control', f"{unlimited['seconds']:.1f}"),
+        ('surge drained s, admission control', f"{admitted['seconds']:.1f}"),
+        ('reports accepted / throttled', f"{admitted['accepted']} / {admitted['throttled']}"),
+        ('analyses full / cheap / deferred', ' / '.join(
+            str(admitted['levels'][level]) for level in ('FULL', 'CHEAP', 'DEFER'))),
+        ('inference runs, no admission control', unlimited['inference']),
+        ('inference runs, admission control', admitted['inference']),
+        ('left for run_deferred_analyses', admitted['pending']),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+List serialization: rows/sec of the values()-backed fast path versus the
+nested ModelSerializers, for incidents and responses, serializer plus render.
+"""
+import random
+
+from common import setup_django, make_user, timer, report
+
+INCIDENTS = 1000
+MEDIA_PER_INCIDENT = 2
+ROUNDS = 5
+
+
+def rows_per_second(serialize, render, queryset, rows):
+    best = None
+    for _ in range(ROUNDS):
+        with timer() as elapsed:
+            render(serialize(queryset))
+        best = elapsed['seconds'] if best is None else min(best, elapsed['seconds'])
+    return rows / best
+
+
+def main():
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from firemateApp.models import Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+    from firemateApp.renderers import FastJSONRenderer
+    from firemateApp.serializers import (
+        FireIncidentSerializer, IncidentResponseSerializer,
+        fast_incident_serializer, fast_response_serializer,
+    )
+
+    reporter = make_user('bench-reporter', 'REPORTER')
+    operators = [make_user(f'bench-op-{i}', 'AMBUCYCLE_OPERATOR') for i in range(10)]
+    fleet = [Ambucycle.objects.create(vehicle_number=f'AMB-{i:04d}', operator=operators[i % 10]) for i in range(50)]
+    for i in range(INCIDENTS):
+        incident = FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Smoke and flames spotted at market square',
+            status='IN_PROGRESS',
+            voice_analysis_details={'stress_level': 'high', 'features': [random.random() for _ in range(16)]},
+            assigned_ambucycle=random.choice(fleet),
+        )
+        for j in range(MEDIA_PER_INCIDENT):
+            IncidentMedia.objects.create(incident=incident, media_type='IMAGE', file_url=f'https://example.com/{i}-{j}.jpg')
+        IncidentResponse.objects.create(
+            incident=incident,
+            ambucycle=incident.assigned_ambucycle,
+            route_data={'points': [[6.69, -1.62]] * 50},
+        )
+
+    drf_render = JSONRenderer().render
+    fast_render = FastJSONRenderer().render
+
+    rows = []
+    # select_related/prefetch_related keeps the baseline from being all N+1 queries
+    for name, serializer_class, fast_serializer, queryset, optimized in [
+        ('incident_list', FireIncidentSerializer, fast_incident_serializer, FireIncident.objects.all(),
+         FireIncident.objects.select_related('reporter', 'assigned_ambucycle__operator').prefetch_related('media')),
+        ('response_list', IncidentResponseSerializer, fast_response_serializer, IncidentResponse.objects.all(),
+         IncidentResponse.objects.select_related(
+             'incident__reporter', 'incident__assigned_ambucycle__operator', 'ambucycle__operator',
+         ).prefetch_related('incident__media')),
+    ]:
+        count = queryset.count()
+        slow = rows_per_second(
+            lambda qs: serializer_class(qs.all(), many=True).data, drf_render, optimized, count,
+        )
+        fast = rows_per_second(fast_serializer.serialize, fast_render, queryset, count)
+        rows += [
+            (f'{name} ModelSerializer rows/s', f'{slow:,.0f}'),
+            (f'{name} values() rows/s', f'{fast:,.0f}'),
+            (f'{name} speedup', f'{fast / slow:.1f}x'),
+        ]
+
+    report(f'List serialization ({INCIDENTS} incidents)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Delta sync: payload size and latency of the changes feed versus refetching
+incident_list, media_list and response_list after a handful of changes.
+"""
+import random
+
+from common import setup_django, make_user, call_view, timer, report
+
+INCIDENTS = 500
+CHANGES = 10
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from firemateApp.models import Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+    from firemateApp.views import incident_list, media_list, response_list, sync_changes
+
+    # Nothing else is writing, so entries can be read back immediately
+    settings.SYNC_SETTLE_SECONDS = 0
+
+    admin = make_user('bench-admin', 'ADMIN')
+    operator = make_user('bench-operator', 'AMBUCYCLE_OPERATOR')
+    reporter = make_user('bench-reporter', 'REPORTER')
+    ambucycle = Ambucycle.objects.create(vehicle_number='AMB-0001', operator=operator)
+    incidents = []
+    for i in range(INCIDENTS):
+        incident = FireIncident.objects.create(
+            reporter=reporter,
+            latitude=6.69 + random.uniform(-0.1, 0.1),
+            longitude=-1.62 + random.uniform(-0.1, 0.1),
+            description='Smoke and flames spotted at market square',
+            status='IN_PROGRESS',
+            assigned_ambucycle=ambucycle,
+        )
+        IncidentMedia.objects.create(incident=incident, media_type='IMAGE', file_url=f'https://example.com/{i}.jpg')
+        IncidentResponse.objects.create(incident=incident, ambucycle=ambucycle, route_data={'points': [[6.69, -1.62]] * 20})
+        incidents.append(incident)
+
+    token = call_view(sync_changes, 'get', admin).data['next']
+
+    for incident in random.sample(incidents, CHANGES // 2):
+        incident.status = 'RESOLVED'
+        incident.save()
+    for incident in random.sample(incidents, CHANGES - CHANGES // 2):
+        incident.media.first().delete()
+
+    with timer() as full:
+        full_bytes = sum(len(call_view(view, 'get', admin).content) for view in (incident_list, media_list, response_list))
+    with timer() as delta:
+        response = call_view(sync_changes, 'get', admin, path=f'/?since={token}')
+        delta_bytes = len(response.content)
+
+    report(f'Delta sync ({INCIDENTS} incidents, {CHANGES} changes)', [
+        ('full refetch bytes', full_bytes),
+        ('changes feed bytes', delta_bytes),
+        ('full refetch ms', f"{full['seconds'] * 1000:.1f}"),
+        ('changes feed ms', f"{delta['seconds'] * 1000:.1f}"),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Telemetry ingestion throughput: points/sec through the batched endpoint
+versus one ambucycle_update_location call per GPS ping.
+"""
+import random
+from datetime import timedelta
+
+from common import setup_django, make_user, call_view, timer, report
+
+FLEET_SIZE = 200
+PINGS_PER_VEHICLE = 50
+BATCH_SIZE = 500
+
+
+def main():
+    setup_django()
+
+    from django.utils import timezone
+    from firemateApp.models import Ambucycle, AmbucycleLocation
+    from firemateApp.views import ambucycle_update_location, ambucycle_telemetry
+
+    admin = make_user('bench-admin', 'ADMIN')
+    fleet = [
+        Ambucycle.objects.create(vehicle_number=f'AMB-{i:04d}', current_latitude=6.69, current_longitude=-1.62)
+        for i in range(FLEET_SIZE)
+    ]
+
+    start = timezone.now()
+    points = [
+        {
+            'ambucycle': ambucycle.id,
+            'latitude': 6.69 + random.uniform(-0.05, 0.05),
+            'longitude': -1.62 + random.uniform(-0.05, 0.05),
+            'recorded_at': (start + timedelta(seconds=5 * n)).isoformat(),
+        }
+        for n in range(PINGS_PER_VEHICLE)
+        for ambucycle in fleet
+    ]
+
+    # Baseline: one request per GPS ping
+    single_points = points[:2000]
+    with timer() as single:
+        for point in single_points:
+            call_view(
+                ambucycle_update_location, 'post', admin,
+                data={'latitude': point['latitude'], 'longitude': point['longitude']},
+                pk=point['ambucycle'],
+            )
+
+    AmbucycleLocation.objects.all().delete()
+
+    with timer() as batched:
+        for offset in range(0, len(points), BATCH_SIZE):
+            response = call_view(
+                ambucycle_telemetry, 'post', admin,
+                data={'points': points[offset:offset + BATCH_SIZE]},
+            )
+            assert response.status_code == 201, response.content
+
+    report('Telemetry ingestion', [
+        ('fleet size', FLEET_SIZE),
+        ('points ingested', len(points)),
+        ('single-ping points/sec', f"{len(single_points) / single['seconds']:.0f}"),
+        (f'batched ({BATCH_SIZE}) points/sec', f"{len(points) / batched['seconds']:.0f}"),
+        ('track rows stored', AmbucycleLocation.objects.count()),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Client-computed voice features: server CPU per incident when voice stress
+features are extracted from the recording (canonical PCM, then pitch
+tracking, MFCCs and spectral features), versus validating and scoring the
+features the client sent, plus the expected cost of recomputing the
+VOICE_FEATURES_SPOT_CHECK_RATE sample that gets spot-checked.
+
+CPU time is process time, so work in librosa's and numpy's threads counts.
+"""
+import shutil
+import tempfile
+import time
+
+from common import setup_django, report
+from bench_media_upload import voice
+
+SECONDS = 60
+RATE = 44100
+ROUNDS = 5
+
+
+def cpu_seconds(work, rounds=ROUNDS):
+    start = time.process_time()
+    for _ in range(rounds):
+        result = work()
+    return (time.process_time() - start) / rounds, result
+
+
+def main():
+    setup_django()
+
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from firemateApp.media_derivatives import load_audio_input
+    from firemateApp.media_ingest import ingest
+    from firemateApp.models import FireIncident
+    from firemateApp.serializers import VoiceFeaturesSerializer
+    from firemateApp.views import voice_analyzer
+    from firemateApp.voice_features import FEATURES_VERSION, feature_mismatch
+
+    media_root = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = media_root
+    try:
+        incident = FireIncident.objects.create(latitude=6.69, longitude=-1.62, description='Bench')
+        media = ingest(SimpleUploadedFile('call.wav', voice(SECONDS, RATE)), incident)
+
+        def server():
+            features = voice_analyzer.extract_audio_features(*voice_analyzer.load_audio(load_audio_input(media)))
+            voice_analyzer.score_features(features)
+            return features
+
+        # librosa compiles its pitch tracking and filter code on first use
+        server()
+        extraction, computed = cpu_seconds(server)
+
+        # What an honest client running the same extraction submits
+        submitted = {field: float(value) for field, value in computed.items()}
+        submitted.update(version=FEATURES_VERSION, duration=media.duration)
+
+        def client():
+            serializer = VoiceFeaturesSerializer(data=submitted)
+            serializer.is_valid(raise_exception=True)
+            return voice_analyzer.score_features(serializer.validated_data)
+
+        scoring, _ = cpu_seconds(client, rounds=ROUNDS * 100)
+        assert not feature_mismatch(submitted, computed)
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    rate = settings.VOICE_FEATURES_SPOT_CHECK_RATE
+    expected = scoring + rate * extraction
+    report(f'Client-computed voice features ({SECONDS} s voice note, {rate:.0%} spot-checked)', [
+        ('server extraction and scoring, CPU ms', f'{extraction * 1000:.1f}'),
+        ('client features validated and scored, CPU ms', f'{scoring * 1000:.3f}'),
+        ('expected with spot checks, CPU ms', f'{expected * 1000:.1f}'),
+        ('server CPU saved per incident ms', f'{(extraction - expected) * 1000:.1f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
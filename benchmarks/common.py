@@ -0,0 +1,92 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each script is run from the project root, e.g. ``python benchmarks/bench_telemetry.py``,
+and works against a throwaway test database so it never touches db.sqlite3.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """
+    Configure Django and create a fresh test database for the benchmark.
+    """
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'FireMate.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def make_user(username, role):
+    """
+    Create a user with the given role.
+    """
+    from django.contrib.auth import get_user_model
+    return get_user_model().objects.create_user(
+        username=username,
+        email=f'{username}@firemate.test',
+        password='benchmark',
+        role=role,
+    )
+
+
+def call_view(view, method, user, path='/', data=None, headers=None, **kwargs):
+    """
+    Call a function view directly through DRF's request factory.
+
+    Args:
+        view: The @api_view decorated function
+        method (str): HTTP method, e.g. 'get' or 'post'
+        user: User to authenticate the request as
+        path (str): Request path, only relevant for views that inspect it
+        data: Request payload, encoded as JSON
+        headers (dict): Extra HTTP headers
+        **kwargs: URL keyword arguments passed to the view
+
+    Returns:
+        Response: The rendered response
+    """
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    factory = APIRequestFactory()
+    request = getattr(factory, method)(path, data, format='json', headers=headers)
+    force_authenticate(request, user=user)
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+@contextmanager
+def timer():
+    """
+    Context manager yielding a dict whose 'seconds' key is filled in on exit.
+    """
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+
+
+def report(title, rows):
+    """
+    Print a small aligned table of (label, value) rows.
+    """
+    print(f"\n{title}")
+    print('-' * len(title))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"{label.ljust(width)}  {value}")
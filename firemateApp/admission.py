@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from .clustering import cell_key, grid_cell
+from .idempotency import replayable
+import threading
+import time
+
+# How much of an incident analysis runs: everything, only the stages that
+# need no model inference, or nothing until run_deferred_analyses gets to it
+FULL, CHEAP, DEFER = 'FULL', 'CHEAP', 'DEFER'
+
+# Roles that triage and dispatch; their requests are never throttled or shed
+PRIORITY_ROLES = {'ADMIN', 'AMBUCYCLE_OPERATOR'}
+
+class TokenBucket:
+    """
+    Rate limits as token buckets kept in the cache, shared by every process.
+
+    Each key's bucket holds up to ``capacity`` tokens and refills at
+    ``capacity`` per ``period`` seconds, so bursts up to the capacity pass
+    and sustained traffic is held to the refill rate. A bucket is read and
+    written without a lock; processes racing on one key can let a request
+    or two extra through, which is fine for shedding load.
+    """
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    def take(self, key):
+        """
+        Take a token from a key's bucket.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is due
+        """
+        cache_key = f'bucket:{self.name}:{key}'
+        now = time.time()
+        tokens, updated = cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        # A bucket left alone for a period is full again, as if it had never been used
+        cache.set(cache_key, (tokens, now), self.period)
+        return wait
+
+reporter_buckets = TokenBucket('reporter', *settings.REPORT_RATE_PER_REPORTER)
+area_buckets = TokenBucket('area', *settings.REPORT_RATE_PER_AREA)
+
+def area_key(latitude, longitude):
+    return cell_key(*grid_cell(latitude, longitude, settings.REPORT_AREA_SIZE))
+
+def area_crowded(user, latitude, longitude):
+    """
+    Take a report's token from its area's bucket.
+
+    Returns:
+        bool: True if the area is over its rate, and the report's analysis
+            should run its cheap stages only. Reports are never refused for
+            their area: duplicates of one fire are cheap once clustered.
+    """
+    return user.role not in PRIORITY_ROLES and area_buckets.take(area_key(latitude, longitude)) > 0
+
+class ReporterRateThrottle(BaseThrottle):
+    """
+    Per-reporter token bucket for the report and upload endpoints.
+
+    Admins and ambucycle operators are not throttled, and neither are
+    retries answered from a stored Idempotency-Key response.
+    """
+
+    def allow_request(self, request, view):
+        if request.user.role in PRIORITY_ROLES or replayable(request):
+            return True
+        self.retry_after = reporter_buckets.take(request.user.pk)
+        return self.retry_after == 0
+
+    def wait(self):
+        return self.retry_after
+
+class AnalysisAdmission:
+    """
+    Tracks the incident analyses in flight in this process and decides how
+    much of each new one runs.
+
+    Below ``full_limit`` analyses run in full. Up to ``defer_limit`` they
+    run their cheap stages only: cluster results and client-computed voice
+    features, but no image or audio model. Beyond that they are deferred.
+    Either way the incident is flagged ``analysis_pending`` for
+    run_deferred_analyses to finish, so a surge of reports costs the worker
+    a bounded amount of inference and its threads stay free for triage and
+    dispatch requests.
+    """
+
+    def __init__(self, full_limit, defer_limit):
+        self.full_limit = full_limit
+        self.defer_limit = defer_limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {FULL: 0, CHEAP: 0, DEFER: 0}
+
+    @contextmanager
+    def admit(self, cheap_only=False):
+        """
+        Yield the level an analysis may run at, counting it in flight meanwhile.
+        """
+        with self._lock:
+            if self.in_flight >= self.defer_limit:
+                level = DEFER
+            elif cheap_only or self.in_flight >= self.full_limit:
+                level = CHEAP
+            else:
+                level = FULL
+            self.stats[level] += 1
+            if level != DEFER:
+                self.in_flight += 1
+        try:
+            yield level
+        finally:
+            if level != DEFER:
+                with self._lock:
+                    self.in_flight -= 1
@@ -1,9 +1,8 @@
 import tensorflow as tf
 import tensorflow_hub as hub
 from transformers import pipeline
-from PIL import Image
+from .image_preprocessing import decode_batch
 import numpy as np
-import io
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,33 +22,28 @@ except Exception as e:
 def preprocess_image(image_data):
     """
     Preprocess image for the EfficientNet model.
+
+    Accepts bytes, a file object, a PIL image or a stored analysis input
+    array. JPEGs are decoded at reduced resolution straight into the batch
+    buffer, see image_preprocessing.
     """
     try:
-        # Convert bytes to PIL Image if needed
-        if isinstance(image_data, bytes):
-            image = Image.open(io.BytesIO(image_data))
-        else:
-            image = Image.open(image_data)
-        
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Resize to model's expected input size
-        image = image.resize((224, 224))
-        
-        # Convert to numpy array and preprocess
-        img_array = tf.keras.preprocessing.image.img_to_array(image)
-        img_array = tf.expand_dims(img_array, 0)
-        
-        # Normalize pixel values
-        img_array = tf.keras.applications.efficientnet_v2.preprocess_input(img_array)
-        
-        return img_array
+        return preprocess_images([image_data], max_workers=1)
     except Exception as e:
         logger.error(f"Error preprocessing image: {str(e)}")
         return None
 
+def preprocess_images(images, max_workers=4):
+    """
+    Preprocess several images into one (n, 224, 224, 3) model batch, decoding them in parallel.
+
+    Raises:
+        OSError: If an image cannot be decoded
+    """
+    batch = decode_batch(images, max_workers=max_workers)
+    # Normalize pixel values; works on the NumPy batch in place of a tensor copy
+    return tf.keras.applications.efficientnet_v2.preprocess_input(batch)
+
 def analyze_image(image_data):
     """
     Analyze image to detect presence of fire/smoke and calculate confidence score.
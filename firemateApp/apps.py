@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FiremateappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'firemateApp'
+
+    def ready(self):
+        # Connect model signal receivers
+        from . import signals  # noqa: F401
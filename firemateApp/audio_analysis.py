@@ -5,6 +5,7 @@ import io
 import os
 import logging
 from .ai_analysis import analyze_text_sentiment
+from .media_derivatives import AUDIO_SAMPLE_RATE
 import librosa
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
@@ -34,7 +35,8 @@ def transcribe_audio(audio_data, source_format='mp3', language_code='en-US'):
     Transcribe audio to text using Google Cloud Speech-to-Text.
     
     Args:
-        audio_data (bytes): Raw audio data
+        audio_data (bytes or ndarray): Raw audio data, or canonical int16
+            samples from media_derivatives.load_audio_input
         source_format (str): Source audio format (e.g., 'mp3', 'm4a', 'ogg')
         language_code (str): Language code for transcription
     
@@ -42,8 +44,13 @@ def transcribe_audio(audio_data, source_format='mp3', language_code='en-US'):
         tuple: (transcription text, status message)
     """
     try:
+        sample_rate = None
+        if isinstance(audio_data, np.ndarray):
+            # Already LINEAR16; only the rate has to be given, there is no header
+            audio_data = audio_data.tobytes()
+            sample_rate = AUDIO_SAMPLE_RATE
         # Convert audio to WAV if it's not already
-        if source_format.lower() != 'wav':
+        elif source_format.lower() != 'wav':
             audio_data = convert_audio_to_wav(audio_data, source_format)
             if audio_data is None:
                 return None, "Error converting audio format"
@@ -57,6 +64,7 @@ def transcribe_audio(audio_data, source_format='mp3', language_code='en-US'):
         # Configure recognition
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
             language_code=language_code,
             enable_automatic_punctuation=True,
             model='default',  # Use 'phone_call' for low-quality audio
@@ -82,7 +90,7 @@ def analyze_voice_note(audio_data, source_format='mp3', language_code='en-US'):
     Analyze voice note for sentiment by first converting speech to text.
     
     Args:
-        audio_data (bytes): Raw audio data
+        audio_data (bytes or ndarray): Raw audio data, or canonical int16 samples
         source_format (str): Source audio format
         language_code (str): Language code for transcription
     
@@ -131,8 +139,10 @@ class VoiceStressAnalyzer:
         Convert audio data to WAV format for analysis.
         """
         try:
-            # Load audio from bytes
-            audio = AudioSegment.from_file(io.BytesIO(audio_data), format=source_format)
+            # Load audio from bytes or a file object
+            if isinstance(audio_data, bytes):
+                audio_data = io.BytesIO(audio_data)
+            audio = AudioSegment.from_file(audio_data, format=source_format)
             
             # Convert to WAV
             wav_io = io.BytesIO()
@@ -228,43 +238,72 @@ class VoiceStressAnalyzer:
         Analyze voice recording for stress and urgency indicators.
         
         Args:
-            audio_data (bytes): Raw audio data
+            audio_data (bytes, file or ndarray): Raw audio data, an open binary
+                file, or canonical int16 samples from media_derivatives.load_audio_input
             source_format (str): Source audio format (e.g., 'mp3', 'm4a', 'ogg')
         
         Returns:
             tuple: (stress_score, analysis_details, status)
         """
         try:
-            # Convert audio to WAV if needed
-            if source_format.lower() != 'wav':
-                audio_data = self.convert_audio_to_wav(audio_data, source_format)
-                if audio_data is None:
-                    return 0.0, None, "Error converting audio format"
+            loaded = self.load_audio(audio_data, source_format)
+            if loaded is None:
+                return 0.0, None, "Error converting audio format"
 
-            # Load audio file
-            y, sr = librosa.load(io.BytesIO(audio_data), sr=None)
-            
             # Extract features
-            features = self.extract_audio_features(y, sr)
+            features = self.extract_audio_features(*loaded)
             if features is None:
                 return 0.0, None, "Error extracting audio features"
-            
-            # Calculate stress score
-            stress_score = self.calculate_stress_score(features)
-            
-            # Prepare analysis details
-            analysis_details = {
-                'pitch_variation': features['pitch_std'] / features['pitch_mean'] if features['pitch_mean'] > 0 else 0,
-                'energy_level': features['energy'],
-                'speech_rate': features['speech_rate'],
-                'voice_quality': {
-                    'jitter': features['jitter'],
-                    'shimmer': features['shimmer']
-                }
-            }
-            
+
+            stress_score, analysis_details = self.score_features(features)
             return stress_score, analysis_details, "Success"
-            
+
         except Exception as e:
             logger.error(f"Error analyzing voice stress: {str(e)}")
-            return 0.0, None, f"Error: {str(e)}" 
\ No newline at end of file
+            return 0.0, None, f"Error: {str(e)}"
+
+    def load_audio(self, audio_data, source_format='mp3'):
+        """
+        Decode a voice recording to the float samples extract_audio_features takes.
+
+        Args:
+            audio_data (bytes, file or ndarray): As for analyze_voice_stress
+            source_format (str): Source audio format
+
+        Returns:
+            tuple: (samples, sample rate), or None if the audio could not be converted
+        """
+        if isinstance(audio_data, np.ndarray):
+            # Already decoded; scale to the [-1, 1) floats librosa.load returns
+            return audio_data.astype(np.float32) / 32768, AUDIO_SAMPLE_RATE
+
+        # Convert audio to WAV if needed
+        if source_format.lower() != 'wav':
+            audio_data = self.convert_audio_to_wav(audio_data, source_format)
+            if audio_data is None:
+                return None
+
+        # Load audio file
+        if isinstance(audio_data, bytes):
+            audio_data = io.BytesIO(audio_data)
+        return librosa.load(audio_data, sr=None)
+
+    def score_features(self, features):
+        """
+        Score features from extract_audio_features, or validated ones a client
+        computed the same way (serializers.VoiceFeaturesSerializer).
+
+        Returns:
+            tuple: (stress_score, analysis_details)
+        """
+        stress_score = self.calculate_stress_score(features)
+        analysis_details = {
+            'pitch_variation': features['pitch_std'] / features['pitch_mean'] if features['pitch_mean'] > 0 else 0,
+            'energy_level': features['energy'],
+            'speech_rate': features['speech_rate'],
+            'voice_quality': {
+                'jitter': features['jitter'],
+                'shimmer': features['shimmer']
+            }
+        }
+        return stress_score, analysis_details
\ No newline at end of file
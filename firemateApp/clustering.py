@@ -0,0 +1,184 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from .models import FireIncident, IncidentCluster
+import math
+
+EARTH_RADIUS = 6371000  # Meters
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+# FireIncident fields an analysis sets
+ANALYSIS_FIELDS = ['voice_stress_score', 'voice_analysis_details', 'ai_confidence_score', 'status', 'verified_at']
+
+# Statuses a shared analysis or verification may change; dispatched and
+# resolved reports keep theirs, as do reports an admin verified or rejected
+TRIAGE_STATUSES = {'PENDING', 'VERIFIED', 'REJECTED'}
+
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """
+    Great-circle distance between two points, in meters.
+    """
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(longitude2 - longitude1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+def grid_cell(latitude, longitude, size):
+    """
+    The grid cell a point falls in, as (row, column).
+
+    Rows are ``size`` meters of latitude. Each row is split into columns as
+    wide as ``size`` meters at its poleward edge, so no cell is narrower than
+    ``size`` anywhere, and every point within ``size`` of another lies in
+    one of the nine cells around it (see neighbouring_cells).
+    """
+    row = math.floor(latitude * METERS_PER_DEGREE / size)
+    return row, _column(row, longitude, size)
+
+def _column(row, longitude, size):
+    edge = min(max(abs(row), abs(row + 1)) * size / METERS_PER_DEGREE, 89.9)
+    width = size / (METERS_PER_DEGREE * math.cos(math.radians(edge)))
+    return math.floor(longitude / width)
+
+def cell_key(row, column):
+    return f'{row}:{column}'
+
+def neighbouring_cells(latitude, longitude, size):
+    """
+    Keys of the cells any point within ``size`` meters of this one can be in.
+    """
+    row, _ = grid_cell(latitude, longitude, size)
+    keys = []
+    for neighbour_row in (row - 1, row, row + 1):
+        # Columns differ in width between rows, so each row is placed on its own
+        column = _column(neighbour_row, longitude, size)
+        keys += [cell_key(neighbour_row, column + offset) for offset in (-1, 0, 1)]
+    return keys
+
+def assign_cluster(incident):
+    """
+    Put a new incident into the event cluster it reports, or start one.
+
+    A cluster takes reports within INCIDENT_CLUSTER_RADIUS meters of its
+    centroid made no more than INCIDENT_CLUSTER_WINDOW seconds after its
+    latest report; of several, the nearest. Candidates come from the nine
+    grid cells around the report, through the (cell, last_reported_at)
+    index, so assignment costs the same however many reports are on record.
+
+    The first report of a cluster is its lead until a later one is analyzed
+    with a higher confidence (share_analysis).
+
+    Returns:
+        IncidentCluster: The incident's cluster
+    """
+    radius = settings.INCIDENT_CLUSTER_RADIUS
+    window = timedelta(seconds=settings.INCIDENT_CLUSTER_WINDOW)
+    reported_at = incident.reported_at
+    with transaction.atomic():
+        candidates = IncidentCluster.objects.select_for_update().filter(
+            cell__in=neighbouring_cells(incident.latitude, incident.longitude, radius),
+            last_reported_at__gte=reported_at - window,
+        )
+        nearest, nearest_distance = None, radius
+        for candidate in candidates:
+            candidate_distance = distance(incident.latitude, incident.longitude, candidate.latitude, candidate.longitude)
+            if candidate_distance <= nearest_distance:
+                nearest, nearest_distance = candidate, candidate_distance
+
+        if nearest is None:
+            cluster = IncidentCluster.objects.create(
+                cell=cell_key(*grid_cell(incident.latitude, incident.longitude, radius)),
+                latitude=incident.latitude,
+                longitude=incident.longitude,
+                lead=incident,
+                first_reported_at=reported_at,
+                last_reported_at=reported_at,
+            )
+        else:
+            cluster = nearest
+            cluster.latitude = (cluster.latitude * cluster.size + incident.latitude) / (cluster.size + 1)
+            cluster.longitude = (cluster.longitude * cluster.size + incident.longitude) / (cluster.size + 1)
+            cluster.cell = cell_key(*grid_cell(cluster.latitude, cluster.longitude, radius))
+            cluster.size += 1
+            cluster.first_reported_at = min(cluster.first_reported_at, reported_at)
+            cluster.last_reported_at = max(cluster.last_reported_at, reported_at)
+            cluster.save()
+
+        incident.cluster = cluster
+        incident.save(update_fields=['cluster', 'updated_at'])
+    return cluster
+
+def cluster_result(incident):
+    """
+    The analyzed lead of an incident's cluster, when that is another report.
+
+    Returns:
+        FireIncident: The lead, or None if the incident is not clustered, is
+            its cluster's lead, or the lead has not been analyzed yet
+    """
+    if incident.cluster_id is None:
+        return None
+    lead_id = IncidentCluster.objects.filter(pk=incident.cluster_id).values_list('lead_id', flat=True).first()
+    if lead_id is None or lead_id == incident.pk:
+        return None
+    return FireIncident.objects.filter(pk=lead_id, ai_confidence_score__isnull=False).first()
+
+def share_analysis(incident):
+    """
+    Settle the analysis of an incident's cluster after the incident was analyzed.
+
+    The cluster's result is its most confident analysis: the incident
+    becomes the lead if it beats the current one, and every member, the
+    incident included, is given the lead's result, so the event is scored,
+    verified or rejected once however many duplicates were reported.
+    Members an admin triaged keep their status.
+
+    Returns:
+        FireIncident: The cluster's lead
+    """
+    with transaction.atomic():
+        cluster = IncidentCluster.objects.select_for_update().get(pk=incident.cluster_id)
+        lead = FireIncident.objects.filter(pk=cluster.lead_id).first() if cluster.lead_id != incident.pk else incident
+        if lead is None or lead.ai_confidence_score is None or (
+                incident.ai_confidence_score is not None and incident.ai_confidence_score >= lead.ai_confidence_score):
+            if cluster.lead_id != incident.pk:
+                cluster.lead = incident
+                cluster.save(update_fields=['lead'])
+            lead = incident
+        members = [member for member in cluster.incidents.exclude(pk=lead.pk) if member.pk != incident.pk]
+        if lead is not incident:
+            members.append(incident)
+        _copy(lead, members, ANALYSIS_FIELDS)
+    return lead
+
+def share_verification(incident):
+    """
+    Verify the other reports of a cluster an admin verified an incident of.
+
+    Members awaiting triage, or triaged by an analysis, take the admin's
+    decision; members an admin rejected stay rejected.
+
+    Returns:
+        list: The members that were verified
+    """
+    if incident.cluster_id is None:
+        return []
+    with transaction.atomic():
+        members = list(FireIncident.objects.select_for_update().filter(
+            cluster_id=incident.cluster_id, status__in=TRIAGE_STATUSES - {'VERIFIED'}, manually_triaged=False,
+        ))
+        _copy(incident, members, ['status', 'verified_at', 'manually_triaged'])
+    return members
+
+def _copy(source, members, fields):
+    # Saved one by one, so status events and the sync change log see each member
+    for member in members:
+        copied = fields
+        if source.status not in TRIAGE_STATUSES or member.status not in TRIAGE_STATUSES or member.manually_triaged:
+            copied = [field for field in fields if field not in ('status', 'verified_at', 'manually_triaged')]
+        changed = [field for field in copied if getattr(member, field) != getattr(source, field)]
+        if changed:
+            for field in changed:
+                setattr(member, field, getattr(source, field))
+            member.save(update_fields=changed + ['updated_at'])
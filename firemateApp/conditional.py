@@ -0,0 +1,114 @@
+from datetime import datetime
+from functools import wraps
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from .fieldsets import requested_fields
+from .models import Ambucycle, FireIncident
+from .positions import position_store
+from .read_models import active_incidents
+from .visibility import incidents_for, can_view_incident
+import hashlib
+
+def conditional(state_func, serializer_class=None):
+    """
+    Add ETag / Last-Modified handling to a function view.
+
+    ``state_func(request, *args, **kwargs)`` returns a tuple of cheap values
+    (ids, counts, timestamps) that changes whenever the view's response would,
+    or None to let the request through to the view, e.g. because it is about
+    to be refused. The ETag hashes the tuple and Last-Modified is its newest
+    timestamp, so a matching If-None-Match / If-Modified-Since returns 304
+    without loading or serializing the payload.
+
+    The ETag also covers the negotiated media type and, for views that take
+    ``?fields=`` / ``?expand=`` for ``serializer_class``, the selected fields:
+    each is a different representation of the same state.
+
+    Apply it below @api_view so DRF has authenticated the request and
+    negotiated the renderer first.
+    """
+    def get_state(request, *args, **kwargs):
+        # Computed once per request for both the ETag and Last-Modified
+        if not hasattr(request, '_conditional_state'):
+            request._conditional_state = state_func(request, *args, **kwargs)
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        if state is None:
+            return None
+        fields = requested_fields(request, serializer_class) if serializer_class else None
+        representation = (state, fields, request.accepted_renderer.media_type)
+        return hashlib.sha1(repr(representation).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        timestamps = [value for value in state or () if isinstance(value, datetime)]
+        return max(timestamps) if timestamps else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                # Per-user responses: clients may keep them but must revalidate
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ['Authorization', 'Accept', 'Accept-Encoding'])
+            return response
+        return wrapper
+    return decorator
+
+def incident_state(request, pk):
+    row = FireIncident.objects.filter(pk=pk).values_list(
+        'status',
+        'reporter_id',
+        'updated_at',
+        'reporter__updated_at',
+        'assigned_ambucycle__last_location_update',
+        'assigned_ambucycle__operator__updated_at',
+    ).first()
+    if row is None:
+        return None
+    status, reporter_id, *versions = row
+    if not can_view_incident(request.user, status, reporter_id):
+        return None
+    return (pk, *versions)
+
+def incident_list_state(request):
+    summary = incidents_for(request.user).aggregate(
+        count=Count('id'),
+        updated=Max('updated_at'),
+        reporters=Max('reporter__updated_at'),
+        ambucycles=Max('assigned_ambucycle__last_location_update'),
+        operators=Max('assigned_ambucycle__operator__updated_at'),
+    )
+    return (
+        request.user.role,
+        request.user.id,
+        summary['count'],
+        summary['updated'],
+        summary['reporters'],
+        summary['ambucycles'],
+        summary['operators'],
+        # Bumped by deletions of nested ambucycles and users, whose SET_NULL
+        # cascades and queryset updates move none of the timestamps above
+        active_incidents.version(),
+    )
+
+def ambucycle_state(request, pk):
+    row = Ambucycle.objects.filter(pk=pk).values_list(
+        'operator_id',
+        'last_location_update',
+        'operator__updated_at',
+    ).first()
+    if row is None:
+        return None
+    operator_id, *versions = row
+    if request.user.role != 'ADMIN' and request.user.id != operator_id:
+        return None
+    # ambucycle_detail overlays the in-memory position
+    position = position_store.get(int(pk))
+    return (pk, *versions, position.recorded_at if position else None)
@@ -0,0 +1,192 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+import asyncio
+import itertools
+import json
+import threading
+
+class Event:
+    """
+    A server-sent event together with the audience allowed to receive it.
+
+    The SSE frame is encoded once at construction so fanning out to many
+    subscribers costs a queue put each, not a JSON dump each.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, event_type, data, roles=(), user_ids=()):
+        self.id = next(self._ids)
+        self.type = event_type
+        self.data = data
+        self.roles = frozenset(roles)
+        self.user_ids = frozenset(user_id for user_id in user_ids if user_id is not None)
+        payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+        self.encoded = f"id: {self.id}\nevent: {event_type}\ndata: {payload}\n\n".encode()
+
+    def visible_to(self, subscriber):
+        return subscriber.role in self.roles or subscriber.user_id in self.user_ids
+
+class Subscriber:
+    """
+    One connected event stream client.
+
+    Events are delivered through a bounded queue owned by the event loop the
+    client is served from. When a slow client lets the queue fill up, its
+    backlog is discarded and replaced by a single ``resync`` event telling
+    it to refetch state, so one stalled connection never grows memory or
+    holds up the publishers.
+    """
+
+    def __init__(self, user_id, role, loop, max_queue):
+        self.user_id = user_id
+        self.role = role
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event):
+        # Always runs on self.loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event('resync', {'dropped': self.dropped}))
+
+class EventHub:
+    """
+    In-process fan-out of events to connected subscribers.
+
+    ``publish`` is thread-safe and never blocks: it is called from request
+    threads and signal handlers, and hands each event to the subscriber's
+    own event loop.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self, user_id, role):
+        """
+        Register a subscriber on the running event loop.
+        """
+        subscriber = Subscriber(user_id, role, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event):
+        """
+        Deliver an event to every subscriber allowed to see it.
+
+        Returns:
+            int: Number of subscribers the event was handed to
+        """
+        by_loop = {}
+        with self._lock:
+            for subscriber in self._subscribers:
+                if event.visible_to(subscriber):
+                    by_loop.setdefault(subscriber.loop, []).append(subscriber)
+        # One wakeup per event loop rather than one per subscriber
+        for loop, subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, subscribers, event)
+            except RuntimeError:
+                # The loop has shut down
+                for subscriber in subscribers:
+                    self.unsubscribe(subscriber)
+        return sum(len(subscribers) for subscribers in by_loop.values())
+
+def _deliver(subscribers, event):
+    for subscriber in subscribers:
+        subscriber.offer(event)
+
+async def stream_events(hub, user_id, role, keepalive=15):
+    """
+    Async iterator producing the SSE byte stream for one client.
+    """
+    subscriber = hub.subscribe(user_id, role)
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+                continue
+            yield event.encoded
+    finally:
+        hub.unsubscribe(subscriber)
+
+# Roles that see an incident in each status, mirroring incident_detail
+INCIDENT_ROLES = {
+    'PENDING': {'ADMIN'},
+    'VERIFIED': {'ADMIN', 'AMBUCYCLE_OPERATOR'},
+    'REJECTED': {'ADMIN'},
+    'IN_PROGRESS': {'ADMIN', 'AMBUCYCLE_OPERATOR'},
+    'RESOLVED': {'ADMIN'},
+}
+
+def incident_status_event(incident, previous_status):
+    """
+    Build the event for an incident changing status.
+
+    Operators are included when either the old or the new status is visible
+    to them, so they also learn when an incident leaves the active set.
+    """
+    roles = INCIDENT_ROLES.get(incident.status, {'ADMIN'}) | INCIDENT_ROLES.get(previous_status, set())
+    return Event(
+        'incident.status',
+        {
+            'id': incident.id,
+            'status': incident.status,
+            'previous_status': previous_status,
+            'ai_confidence_score': incident.ai_confidence_score,
+        },
+        roles=roles,
+        user_ids=[incident.reporter_id],
+    )
+
+def incident_assigned_event(response):
+    """
+    Build the event for an ambucycle being dispatched to an incident.
+    """
+    return Event(
+        'incident.assigned',
+        {
+            'id': response.id,
+            'incident': response.incident_id,
+            'ambucycle': response.ambucycle_id,
+            'dispatched_at': response.dispatched_at,
+        },
+        roles={'ADMIN'},
+        user_ids=[response.ambucycle.operator_id, response.incident.reporter_id],
+    )
+
+def ambucycle_position_event(ambucycle_id, position):
+    """
+    Build the event for an ambucycle position change.
+    """
+    return Event(
+        'ambucycle.position',
+        {
+            'id': ambucycle_id,
+            'latitude': position.latitude,
+            'longitude': position.longitude,
+            'recorded_at': position.recorded_at,
+        },
+        roles={'ADMIN', 'AMBUCYCLE_OPERATOR'},
+    )
+
+event_hub = EventHub(max_queue=settings.EVENT_STREAM_QUEUE_SIZE)
@@ -0,0 +1,146 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+# Fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+# Keeps IN (...) lists below SQLite's bound parameter limit
+ID_BATCH_SIZE = 500
+
+class _Plan:
+    """
+    How one (possibly nested) serializer maps onto ``values()`` columns.
+
+    Nested serializers on forward relations become joined columns under a
+    ``<relation>__`` prefix; ``many=True`` serializers on reverse relations
+    are fetched with one extra query per plan and grouped by parent id.
+    """
+
+    def __init__(self, serializer, prefix='', only=None):
+        model = serializer.Meta.model
+        self.model = model
+        self.prefix = prefix
+        self.pk_column = prefix + model._meta.pk.name
+        self.fields = []
+        self.many = []
+        for key, field in serializer.fields.items():
+            if field.write_only or (only is not None and key not in only):
+                continue
+            if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(
+                    f"{type(serializer).__name__}.{key} cannot be read from values()"
+                )
+            source = '__'.join(field.source_attrs)
+            if isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(source)
+                child = _Plan(field.child)
+                self.fields.append((key, 'many', (child, len(self.many))))
+                self.many.append((child, relation.field.attname))
+            elif isinstance(field, serializers.BaseSerializer):
+                self.fields.append((key, 'nested', (prefix + source, _Plan(field, prefix + source + '__'))))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                self.fields.append((key, 'column', (prefix + source, None)))
+            else:
+                self.fields.append((key, 'column', (prefix + source, field.to_representation)))
+
+    def columns(self):
+        columns = {self.pk_column}
+        for _, kind, payload in self.fields:
+            if kind == 'column':
+                columns.add(payload[0])
+            elif kind == 'nested':
+                columns.add(payload[0])
+                columns.update(payload[1].columns())
+        return columns
+
+    def many_plans(self):
+        """
+        Yield (plan, index) for every reverse relation reachable without a query.
+        """
+        for _, kind, payload in self.fields:
+            if kind == 'many':
+                yield self, payload[1]
+            elif kind == 'nested':
+                yield from payload[1].many_plans()
+
+    def build(self, row, related):
+        data = {}
+        for key, kind, payload in self.fields:
+            if kind == 'column':
+                column, to_representation = payload
+                value = row[column]
+                data[key] = value if to_representation is None or value is None else to_representation(value)
+            elif kind == 'nested':
+                column, plan = payload
+                data[key] = None if row[column] is None else plan.build(row, related)
+            else:
+                _, index = payload
+                data[key] = related[(id(self), index)].get(row[self.pk_column], [])
+        return data
+
+class ValuesSerializer:
+    """
+    Read-only serializer producing the same output as a DRF ModelSerializer
+    from ``values()`` rows instead of model instances.
+
+    The field layout is taken from the serializer class itself, so the two
+    cannot drift apart. Nested serializers on foreign keys are joined into
+    the same query and ``many=True`` nested serializers cost one query each,
+    avoiding both instance construction and per-row serializer overhead.
+
+    Only fields that map directly onto model columns are supported;
+    ``SerializerMethodField`` and ``source='*'`` raise ImproperlyConfigured.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._plans = {}
+
+    def plan(self, fields=None):
+        key = None if fields is None else tuple(fields)
+        if key not in self._plans:
+            self._plans[key] = _Plan(self.serializer_class(), only=None if key is None else set(key))
+        return self._plans[key]
+
+    def serialize(self, queryset, fields=None):
+        """
+        Serialize a queryset of the serializer's model.
+
+        Args:
+            queryset: Queryset to serialize
+            fields (list): Top-level fields to include, defaults to all.
+                Columns, joins and queries for other fields are skipped.
+
+        Returns:
+            list: One dict per row, matching ``serializer_class(queryset, many=True).data``
+        """
+        plan = self.plan(fields)
+        rows = list(queryset.values(*plan.columns()))
+        return self._build(plan, rows)
+
+    def _build(self, plan, rows):
+        related = {}
+        for parent, index in plan.many_plans():
+            child, fk_column = parent.many[index]
+            parent_ids = list({row[parent.pk_column] for row in rows if row[parent.pk_column] is not None})
+            related[(id(parent), index)] = self._children(child, fk_column, parent_ids)
+        return [plan.build(row, related) for row in rows]
+
+    def _children(self, plan, fk_column, parent_ids):
+        grouped = {}
+        for start in range(0, len(parent_ids), ID_BATCH_SIZE):
+            batch = parent_ids[start:start + ID_BATCH_SIZE]
+            queryset = plan.model.objects.filter(**{f'{fk_column}__in': batch}).order_by(plan.pk_column)
+            rows = list(queryset.values(fk_column, *plan.columns()))
+            for row, data in zip(rows, self._build(plan, rows)):
+                grouped.setdefault(row[fk_column], []).append(data)
+        return grouped
@@ -0,0 +1,51 @@
+from functools import lru_cache
+from rest_framework import serializers
+
+@lru_cache(maxsize=None)
+def _layout(serializer_class):
+    # (readable fields in declaration order, nested fields among them)
+    fields = {key: field for key, field in serializer_class().fields.items() if not field.write_only}
+    expandable = frozenset(key for key, field in fields.items() if isinstance(field, serializers.BaseSerializer))
+    return tuple(fields), expandable
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+def requested_fields(request, serializer_class):
+    """
+    Return the top-level fields a client asked for with ``?fields=`` and ``?expand=``.
+
+    ``fields`` lists the fields to return; without it every flat field is
+    returned. Nested representations (``reporter_details``, ``media``, ...)
+    are only included when listed in ``fields`` or ``expand``. When neither
+    parameter is present the full representation is returned, as before.
+
+    Returns:
+        list: Field names in serializer order, or None for the full representation
+
+    Raises:
+        ValidationError: If an unknown field is requested
+    """
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None
+
+    available, expandable = _layout(serializer_class)
+    fields = _split(params.get('fields')) or [key for key in available if key not in expandable]
+    expand = _split(params.get('expand'))
+    unknown = sorted((set(fields) | set(expand)) - set(available))
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+
+    requested = set(fields) | set(expand)
+    return [key for key in available if key in requested]
+
+def project(data, fields):
+    """
+    Restrict already serialized data (a dict or list of dicts) to ``fields``.
+    """
+    if fields is None:
+        return data
+    if isinstance(data, dict):
+        return {key: data[key] for key in fields if key in data}
+    return [{key: item[key] for key in fields if key in item} for item in data]
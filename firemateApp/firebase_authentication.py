@@ -1,9 +1,11 @@
 from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
 import firebase_admin
-from firebase_admin import auth, credentials
+from firebase_admin import credentials
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from .firebase_tokens import GoogleCertSource, TokenVerifier, VerifiedTokenCache
+from .firebase_users import firebase_users
 import os
 
 # Initialize Firebase App if it's not already initialized
@@ -13,6 +15,16 @@ if not firebase_admin._apps:
     cred = credentials.Certificate(cred_path)
     firebase_admin.initialize_app(cred)
 
+# Verifies ID tokens locally, caching recently verified ones
+token_verifier = TokenVerifier(
+    project_id=firebase_admin.get_app().project_id,
+    cert_source=GoogleCertSource(),
+    cache=VerifiedTokenCache(
+        max_entries=settings.FIREBASE_TOKEN_CACHE_SIZE,
+        ttl=settings.FIREBASE_TOKEN_CACHE_TTL,
+    ),
+)
+
 # Get the custom user model (AUTH_USER_MODEL)
 User = get_user_model()
 
@@ -30,16 +42,14 @@ class FirebaseAuthentication(BaseAuthentication):
         id_token = auth_header.split(' ')[1]
 
         try:
-            # Verify the token using Firebase Admin SDK
-            decoded_token = auth.verify_id_token(id_token)
-            email = decoded_token.get('email')  # Get user's email
-            uid = decoded_token.get('uid')      # Get user's Firebase UID
+            # Verify the token, skipping the signature check for recently verified ones
+            decoded_token = token_verifier.verify(id_token)
         except Exception as e:
             # If verification fails, deny authentication
             raise exceptions.AuthenticationFailed(f'Invalid Firebase token: {str(e)}')
 
-        # Get or create a Django user using the email from Firebase
-        user, created = User.objects.get_or_create(email=email)
+        # Find the Django user by Firebase UID, linking or creating it on first sight
+        user = firebase_users.resolve(decoded_token)
 
         # Return the authenticated user (2nd value is for auth token, which we don't need here)
         return (user, None)
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from google.auth import jwt
+from google.auth.transport import requests as google_requests
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Public certificates of the keys Firebase signs ID tokens with
+FIREBASE_CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+
+class StaticCertSource:
+    """
+    Cert source serving a fixed ``{key id: PEM}`` mapping, for tests and
+    offline use.
+    """
+
+    def __init__(self, certs):
+        self.certs = dict(certs)
+
+    def get_certs(self):
+        return self.certs
+
+    def refresh(self):
+        return self.certs
+
+class GoogleCertSource:
+    """
+    Firebase signing certificates fetched from Google and kept fresh in the
+    background.
+
+    Google publishes the certificates with a Cache-Control max-age of a few
+    hours. Once the first request has loaded them, a daemon thread refetches
+    them ``refresh_margin`` seconds before they expire, so requests never
+    wait on the fetch. A failed refresh keeps serving the previous
+    certificates and is retried after ``retry_interval`` seconds. Forced
+    refreshes are limited to one per ``retry_interval`` too, so tokens with
+    made-up key ids cannot turn into a stream of fetches.
+    """
+
+    def __init__(self, url=FIREBASE_CERTS_URL, refresh_margin=300, retry_interval=60, request=None):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._request = request or google_requests.Request()
+        self._lock = threading.Lock()
+        self._certs = None
+        self._expires_at = 0
+        self._fetched_at = 0
+        self._refresher = None
+
+    def get_certs(self):
+        """
+        Return the current certificates, fetching them on first use.
+        """
+        certs = self._certs
+        if certs is None:
+            with self._lock:
+                if self._certs is None:
+                    self._fetch()
+                certs = self._certs
+            self._ensure_refresher()
+        return certs
+
+    def refresh(self):
+        """
+        Refetch the certificates now, e.g. after seeing an unknown key id.
+        """
+        with self._lock:
+            if self._certs is None or time.monotonic() - self._fetched_at >= self.retry_interval:
+                self._fetch()
+        return self._certs
+
+    def _fetch(self):
+        response = self._request(self.url, method='GET')
+        if response.status != 200:
+            raise ValueError(f'Could not fetch certificates at {self.url}: HTTP {response.status}')
+        certs = json.loads(response.data.decode('utf-8'))
+        self._certs = certs
+        self._fetched_at = time.monotonic()
+        self._expires_at = time.time() + _max_age(response.headers)
+
+    def _ensure_refresher(self):
+        if self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._run, name='firebase-certs', daemon=True)
+                self._refresher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self._expires_at - time.time() - self.refresh_margin, 1))
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing Firebase certificates: {str(e)}")
+                time.sleep(self.retry_interval)
+
+def _max_age(headers):
+    match = re.search(r'max-age=(\d+)', headers.get('cache-control', ''))
+    return int(match.group(1)) if match else 3600
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified ID token claims.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never
+    kept in memory, and live for at most ``ttl`` seconds and never past the
+    token's own ``exp``.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        key = self.key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, token, claims):
+        expires_at = min(time.time() + self.ttl, claims.get('exp', 0))
+        if expires_at <= time.time():
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class TokenVerifier:
+    """
+    Verifies Firebase ID tokens the way ``firebase_admin.auth.verify_id_token``
+    does, against certificates from a pluggable source and with a cache of
+    recently verified tokens.
+
+    A cache hit skips the signature check entirely. Revocation is not
+    checked (nor is it by ``verify_id_token`` without ``check_revoked``), so
+    a revoked token keeps working for at most the cache TTL.
+    """
+
+    def __init__(self, project_id, cert_source, cache=None, clock_skew=0):
+        self.project_id = project_id
+        self.issuer = f'https://securetoken.google.com/{project_id}'
+        self.cert_source = cert_source
+        self.cache = cache
+        self.clock_skew = clock_skew
+
+    def verify(self, token):
+        """
+        Return the decoded claims of a valid ID token, with ``uid`` set.
+
+        Raises:
+            ValueError: If the token is malformed, expired or not signed by Firebase
+        """
+        if self.cache is not None:
+            claims = self.cache.get(token)
+            if claims is not None:
+                return claims
+
+        claims = self._decode(token)
+        if claims.get('iss') != self.issuer:
+            raise ValueError(f'Token has incorrect "iss" claim, expected {self.issuer}')
+        if not isinstance(claims.get('sub'), str) or not claims['sub'] or len(claims['sub']) > 128:
+            raise ValueError('Token has an invalid "sub" claim')
+        claims['uid'] = claims['sub']
+
+        if self.cache is not None:
+            self.cache.put(token, claims)
+        return claims
+
+    def _decode(self, token):
+        header = jwt.decode_header(token)
+        if header.get('alg') != 'RS256':
+            raise ValueError('Token has incorrect algorithm, expected RS256')
+        certs = self.cert_source.get_certs()
+        if header.get('kid') not in certs:
+            # Google rotated its keys ahead of the scheduled refresh
+            certs = self.cert_source.refresh()
+        return jwt.decode(token, certs=certs, audience=self.project_id, clock_skew_in_seconds=self.clock_skew)
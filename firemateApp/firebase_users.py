@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from .models import FirebaseIdentity
+import copy
+import threading
+
+User = get_user_model()
+
+class FirebaseUserResolver:
+    """
+    Maps verified Firebase tokens to Django users by their UID.
+
+    Known UIDs resolve through an in-process LRU of UID to user without a
+    query; saving or deleting a user or its identity drops its entry (see
+    signals), and every caller gets its own copy of the cached row. Unknown
+    UIDs are looked up in FirebaseIdentity, then linked to an existing
+    unlinked account with the same verified email (accounts created before
+    UIDs were stored), and only then get a new user. Concurrent first
+    requests for one UID are settled by the unique firebase_uid constraint:
+    the loser rolls back and reads the winner's row.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+        # user id -> UID, so a user's entry is dropped without a scan
+        self._uids = {}
+        self.stats = {'hits': 0, 'misses': 0, 'created': 0, 'linked': 0}
+
+    def resolve(self, claims):
+        """
+        Return the user for decoded token claims, creating or linking it on first sight.
+        """
+        uid = claims['uid']
+        user = self._get(uid)
+        if user is not None:
+            self.stats['hits'] += 1
+            return copy.copy(user)
+
+        self.stats['misses'] += 1
+        identity = FirebaseIdentity.objects.select_related('user').filter(firebase_uid=uid).first()
+        if identity is None:
+            identity = self._create(uid, claims)
+        self._put(uid, copy.copy(identity.user))
+        return identity.user
+
+    def forget(self, user_id):
+        """
+        Drop a user's cached entry, e.g. after it was saved or deleted.
+        """
+        with self._lock:
+            uid = self._uids.pop(user_id, None)
+            if uid is not None:
+                del self._users[uid]
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._uids.clear()
+
+    def _create(self, uid, claims):
+        email = claims.get('email') or ''
+        try:
+            with transaction.atomic():
+                user = None
+                # Only a verified email proves the token holder owns the account
+                if email and claims.get('email_verified'):
+                    user = (
+                        User.objects.select_for_update()
+                        .filter(email__iexact=email, firebase_identity__isnull=True)
+                        .order_by('id')
+                        .first()
+                    )
+                if user is None:
+                    user = User.objects.create_user(username=uid, email=email)
+                    self.stats['created'] += 1
+                else:
+                    self.stats['linked'] += 1
+                return FirebaseIdentity.objects.create(user=user, firebase_uid=uid)
+        except IntegrityError:
+            # A concurrent request registered this UID first
+            identity = FirebaseIdentity.objects.select_related('user').filter(firebase_uid=uid).first()
+            if identity is None:
+                raise
+            return identity
+
+    def _get(self, uid):
+        with self._lock:
+            user = self._users.get(uid)
+            if user is not None:
+                self._users.move_to_end(uid)
+            return user
+
+    def _put(self, uid, user):
+        with self._lock:
+            # A user whose identity changed leaves its old UID's entry behind
+            old_uid = self._uids.get(user.pk)
+            if old_uid is not None and old_uid != uid:
+                self._users.pop(old_uid, None)
+            previous = self._users.get(uid)
+            if previous is not None and previous.pk != user.pk:
+                self._uids.pop(previous.pk, None)
+            self._users[uid] = user
+            self._users.move_to_end(uid)
+            self._uids[user.pk] = uid
+            while len(self._users) > self.max_entries:
+                _, evicted = self._users.popitem(last=False)
+                del self._uids[evicted.pk]
+
+firebase_users = FirebaseUserResolver(max_entries=settings.FIREBASE_UID_CACHE_SIZE)
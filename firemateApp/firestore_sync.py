@@ -0,0 +1,404 @@
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from .models import Ambucycle, ChangeLogEntry, FireIncident, FirestoreDocument, FirestoreSyncState, IncidentResponse
+from .sync import committed_through
+
+User = get_user_model()
+
+# Firestore's limit on writes per batch
+MAX_BATCH_WRITES = 500
+
+def document_ids(collection, object_ids):
+    """
+    Return the id of the document mirroring each row, allocating one for rows not yet linked.
+    """
+    object_ids = set(object_ids)
+    links = _links(collection, object_ids)
+    missing = object_ids - set(links)
+    if missing:
+        FirestoreDocument.objects.bulk_create(
+            [
+                FirestoreDocument(collection=collection, object_id=object_id, document_id=uuid.uuid4().hex[:20])
+                for object_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        # Re-read, as a concurrent sync may have linked some of them first
+        links.update(_links(collection, missing))
+    return links
+
+def object_ids(collection, document_ids):
+    """
+    Return the row mirrored by each linked document.
+    """
+    return dict(
+        FirestoreDocument.objects.filter(collection=collection, document_id__in=list(document_ids))
+        .values_list('document_id', 'object_id')
+    )
+
+def _links(collection, object_ids):
+    return dict(
+        FirestoreDocument.objects.filter(collection=collection, object_id__in=list(object_ids))
+        .values_list('object_id', 'document_id')
+    )
+
+class DocumentRef:
+    """
+    A foreign key stored as the id of the document mirroring the related row.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def to_remote(self, ids):
+        return document_ids(self.collection, ids)
+
+    def to_local(self, values):
+        return object_ids(self.collection, values)
+
+class NaturalKey:
+    """
+    A foreign key stored as a unique field of the related row, e.g. an email.
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+
+    def to_remote(self, ids):
+        return dict(self.model.objects.filter(pk__in=list(ids)).values_list('pk', self.field))
+
+    def to_local(self, values):
+        return dict(self.model.objects.filter(**{f'{self.field}__in': list(values)}).values_list(self.field, 'pk'))
+
+class FirestoreMapping:
+    """
+    How one model is mirrored to a Firestore collection.
+
+    Args:
+        collection (str): Firestore collection name
+        label (str): Model label in the change log
+        model: Django model class with an auto_now ``updated_at``
+        fields (list): Columns read for to_document
+        to_document (callable): Returns document fields for a row of ``fields``
+        from_document (callable): Returns column values for a document, or
+            None to skip it
+        references (list): (column, document field, DocumentRef or NaturalKey,
+            required) for foreign keys, translated in bulk
+        create_defaults (callable): Extra column values for a row created
+            from the document with the given id
+        pull_deletes (bool): Whether remote tombstones delete rows
+    """
+
+    def __init__(self, collection, label, model, fields, to_document, from_document, references=(),
+                 create_defaults=None, pull_deletes=True):
+        self.collection = collection
+        self.label = label
+        self.model = model
+        self.fields = fields
+        self.to_document = to_document
+        self.from_document = from_document
+        self.references = references
+        self.create_defaults = create_defaults
+        self.pull_deletes = pull_deletes
+
+ROLES_TO_REMOTE = {'REPORTER': 'reporter', 'AMBUCYCLE_OPERATOR': 'operator', 'ADMIN': 'admin'}
+
+def _user_document(row):
+    return {
+        'email': row['email'],
+        'full_name': ' '.join(name for name in (row['first_name'], row['last_name']) if name),
+        'phone': row['phone_number'],
+        'role': ROLES_TO_REMOTE.get(row['role'], row['role'].lower()),
+        'is_active': row['is_active'],
+    }
+
+def _user_values(doc):
+    # Roles and account status are only pushed: a document can never grant access
+    first_name, _, last_name = (doc.get('full_name') or '').partition(' ')
+    return {
+        'email': doc.get('email') or '',
+        'first_name': first_name,
+        'last_name': last_name,
+        'phone_number': doc.get('phone') or '',
+    }
+
+def _incident_document(row):
+    return {
+        'description': row['description'],
+        'latitude': row['latitude'],
+        'longitude': row['longitude'],
+        'status': row['status'].lower(),
+        'ai_confidence_score': row['ai_confidence_score'],
+        'voice_stress_score': row['voice_stress_score'],
+        'reported_at': row['reported_at'],
+        'verified_at': row['verified_at'],
+        'resolved_at': row['resolved_at'],
+    }
+
+def _incident_values(doc):
+    # Status is only pushed: verifying, rejecting and resolving go through the
+    # admin views and the analysis pipeline, so pulled incidents start PENDING
+    if doc.get('latitude') is None or doc.get('longitude') is None:
+        return None
+    return {
+        'description': doc.get('description') or '',
+        'latitude': doc['latitude'],
+        'longitude': doc['longitude'],
+    }
+
+def _response_document(row):
+    return {
+        'dispatched_at': row['dispatched_at'],
+        'arrival_time': row['arrived_at'],
+        'estimated_arrival_time': row['estimated_arrival_time'],
+        'route_data': row['route_data'],
+    }
+
+def _response_values(doc):
+    return {
+        'arrived_at': doc.get('arrival_time'),
+        'estimated_arrival_time': doc.get('estimated_arrival_time'),
+        'route_data': doc.get('route_data'),
+    }
+
+# In dependency order, so references resolve within one pass
+FIRESTORE_MAPPINGS = [
+    FirestoreMapping(
+        'users', 'users', User,
+        ['email', 'first_name', 'last_name', 'phone_number', 'role', 'is_active'],
+        _user_document, _user_values,
+        # Documents are keyed by Firebase UID, which is also the username of users created on sign-in
+        create_defaults=lambda document_id: {'username': document_id, 'role': 'REPORTER', 'password': make_password(None)},
+        pull_deletes=False,
+    ),
+    FirestoreMapping(
+        'emergencies', 'incidents', FireIncident,
+        ['description', 'latitude', 'longitude', 'status', 'ai_confidence_score', 'voice_stress_score',
+         'reported_at', 'verified_at', 'resolved_at'],
+        _incident_document, _incident_values,
+        references=[
+            ('reporter_id', 'reporter_email', NaturalKey(User, 'email'), False),
+            ('assigned_ambucycle_id', 'vehicle_number', NaturalKey(Ambucycle, 'vehicle_number'), False),
+        ],
+    ),
+    FirestoreMapping(
+        'responses', 'responses', IncidentResponse,
+        ['dispatched_at', 'arrived_at', 'estimated_arrival_time', 'route_data'],
+        _response_document, _response_values,
+        references=[
+            ('incident_id', 'emergency_id', DocumentRef('emergencies'), True),
+            ('ambucycle_id', 'vehicle_number', NaturalKey(Ambucycle, 'vehicle_number'), True),
+        ],
+    ),
+]
+
+class FirestoreSync:
+    """
+    Incremental two-way sync between Django models and Firestore collections.
+
+    Pushes read the change log after a per-collection high-water mark and
+    write only the rows changed since, in batched writes. Pulls page through
+    each collection ordered by ``updated_at`` and document id, resuming after
+    the last document applied. Every document carries the ``updated_at`` of
+    its last change and conflicts go to whichever side changed last, so a
+    pulled change written back by the next push is recognised and skipped.
+    Deletions travel as ``deleted: true`` tombstones, since a query cannot
+    return a document that no longer exists; documents without
+    ``updated_at`` are invisible to pulls.
+
+    Args:
+        db: Firestore client, or a FakeFirestore
+        mappings (list): FirestoreMapping per collection, in dependency order
+        batch_size (int): Change log entries or documents per page, at most 500
+        clock (callable): Returns the current time
+    """
+
+    def __init__(self, db, mappings=None, batch_size=MAX_BATCH_WRITES, clock=timezone.now):
+        if not 0 < batch_size <= MAX_BATCH_WRITES:
+            raise ValueError(f'batch_size must be between 1 and {MAX_BATCH_WRITES}')
+        self.db = db
+        self.mappings = FIRESTORE_MAPPINGS if mappings is None else mappings
+        self.batch_size = batch_size
+        self.clock = clock
+
+    def sync_once(self, push=True, pull=True):
+        """
+        Pull then push every collection until caught up.
+
+        Returns:
+            dict: Per collection, rows ``pushed`` and ``pulled``, ``conflicts``
+                lost to the other side, ``skipped`` documents that could not
+                be mapped, ``seconds`` taken, ``push_lag`` (age of the oldest
+                unpushed change) and ``pull_lag`` (largest age of a remote
+                change when applied), both in seconds
+        """
+        stats = {}
+        for mapping in self.mappings:
+            result = {'pushed': 0, 'pulled': 0, 'conflicts': 0, 'skipped': 0, 'pull_lag': 0.0}
+            started = time.perf_counter()
+            if pull:
+                while self.pull_page(mapping, result):
+                    pass
+            if push:
+                while self.push_page(mapping, result):
+                    pass
+            result['seconds'] = time.perf_counter() - started
+            result['push_lag'] = self.push_lag(mapping)
+            stats[mapping.collection] = result
+        return stats
+
+    def push_page(self, mapping, result):
+        """
+        Push one page of change log entries; returns whether more may be pending.
+        """
+        state = self._state(mapping)
+        entries = list(
+            ChangeLogEntry.objects.filter(
+                model=mapping.label, id__gt=state.pushed_through, id__lte=committed_through(self.clock()),
+            )
+            .order_by('id')
+            .values_list('id', 'object_id', 'operation')[:self.batch_size]
+        )
+        if not entries:
+            return False
+
+        # Only the latest operation per row matters
+        operations = {object_id: operation for _, object_id, operation in entries}
+        columns = [column for column, _, _, _ in mapping.references]
+        rows = {
+            row['id']: row for row in mapping.model.objects.filter(
+                pk__in=[object_id for object_id, operation in operations.items() if operation == 'UPSERT']
+            ).values('id', 'updated_at', *mapping.fields, *columns)
+        }
+        deleted = [object_id for object_id, operation in operations.items() if operation == 'DELETE']
+        links = {**_links(mapping.collection, deleted), **document_ids(mapping.collection, rows)}
+        resolved = {
+            column: reference.to_remote({row[column] for row in rows.values() if row[column] is not None})
+            for column, _, reference, _ in mapping.references
+        }
+
+        collection = self.db.collection(mapping.collection)
+        refs = {object_id: collection.document(document_id) for object_id, document_id in links.items()}
+        remote = {
+            snapshot.id: snapshot.to_dict()
+            for snapshot in self.db.get_all(list(refs.values())) if snapshot.exists
+        }
+
+        batch = self.db.batch()
+        writes = 0
+        for object_id, ref in refs.items():
+            current = remote.get(ref.id)
+            row = rows.get(object_id)
+            if row is not None:
+                if current is not None and current.get('updated_at') is not None and current['updated_at'] >= row['updated_at']:
+                    # Already written, or changed remotely since; the pull settles it
+                    if current['updated_at'] > row['updated_at']:
+                        result['conflicts'] += 1
+                    continue
+                document = mapping.to_document(row)
+                for column, field, _, _ in mapping.references:
+                    document[field] = resolved[column].get(row[column])
+                document.update(updated_at=row['updated_at'], deleted=False)
+                batch.set(ref, document, merge=True)
+            elif object_id in deleted and current is not None and not current.get('deleted'):
+                batch.set(ref, {'deleted': True, 'updated_at': self.clock()}, merge=True)
+            else:
+                continue
+            writes += 1
+        if writes:
+            batch.commit()
+
+        state.pushed_through = entries[-1][0]
+        state.save(update_fields=['pushed_through', 'updated_at'])
+        result['pushed'] += writes
+        return len(entries) == self.batch_size
+
+    def pull_page(self, mapping, result):
+        """
+        Apply one page of remote documents; returns whether more may be pending.
+        """
+        state = self._state(mapping)
+        query = self.db.collection(mapping.collection).order_by('updated_at').order_by('__name__')
+        if state.pulled_through is not None:
+            query = query.start_after({'updated_at': state.pulled_through, '__name__': state.pulled_document})
+        documents = [(snapshot.id, snapshot.to_dict()) for snapshot in query.limit(self.batch_size).stream()]
+        if not documents:
+            return False
+
+        linked = object_ids(mapping.collection, [document_id for document_id, _ in documents])
+        instances = mapping.model.objects.in_bulk(list(linked.values()))
+        resolved = {
+            column: reference.to_local({doc[field] for _, doc in documents if doc.get(field) is not None})
+            for column, field, reference, _ in mapping.references
+        }
+
+        now = self.clock()
+        with transaction.atomic():
+            for document_id, doc in documents:
+                if self._apply(mapping, document_id, doc, linked, instances, resolved, result):
+                    result['pulled'] += 1
+                    result['pull_lag'] = max(result['pull_lag'], (now - doc['updated_at']).total_seconds())
+            state.pulled_through = documents[-1][1]['updated_at']
+            state.pulled_document = documents[-1][0]
+            state.save(update_fields=['pulled_through', 'pulled_document', 'updated_at'])
+        return len(documents) == self.batch_size
+
+    def push_lag(self, mapping):
+        """
+        Seconds since the oldest change not yet pushed was made, 0 when caught up.
+        """
+        pushed_through = self._state(mapping).pushed_through
+        oldest = (
+            ChangeLogEntry.objects.filter(model=mapping.label, id__gt=pushed_through)
+            .order_by('id').values_list('created_at', flat=True).first()
+        )
+        return (self.clock() - oldest).total_seconds() if oldest else 0.0
+
+    def _apply(self, mapping, document_id, doc, linked, instances, resolved, result):
+        remote_at = doc['updated_at']
+        object_id = linked.get(document_id)
+        instance = instances.get(object_id)
+        if instance is not None and remote_at <= instance.updated_at:
+            # Our own write coming back, or a newer local change the push will send
+            if remote_at < instance.updated_at:
+                result['conflicts'] += 1
+            return False
+        if object_id is not None and instance is None:
+            # Deleted locally; the pushed tombstone wins
+            return False
+        if doc.get('deleted'):
+            if instance is None or not mapping.pull_deletes:
+                return False
+            instance.delete()
+            return True
+
+        values = mapping.from_document(doc)
+        if values is None:
+            result['skipped'] += 1
+            return False
+        for column, field, _, required in mapping.references:
+            values[column] = resolved[column].get(doc.get(field))
+            if values[column] is None and required:
+                result['skipped'] += 1
+                return False
+
+        if instance is None:
+            defaults = mapping.create_defaults(document_id) if mapping.create_defaults else {}
+            instance = mapping.model(**defaults, **values)
+            instance.save()
+            FirestoreDocument.objects.create(collection=mapping.collection, document_id=document_id, object_id=instance.pk)
+        else:
+            for column, value in values.items():
+                setattr(instance, column, value)
+            instance.save()
+        # Carry the remote timestamp, so the next push sees the row as already written
+        mapping.model.objects.filter(pk=instance.pk).update(updated_at=remote_at)
+        return True
+
+    def _state(self, mapping):
+        return FirestoreSyncState.objects.get_or_create(collection=mapping.collection)[0]
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyKey
+import hashlib
+import json
+import time
+
+def request_fingerprint(request):
+    """
+    SHA-256 of a request's method, path and payload.
+
+    Uploaded files count by their content hash, which
+    HashingFileUploadHandler computed as they arrived.
+    """
+    if hasattr(request.data, 'lists'):
+        # A form or multipart body, whose fields may repeat
+        payload = sorted((field, [_digest(value) for value in values]) for field, values in request.data.lists())
+    else:
+        payload = request.data
+    body = json.dumps([request.method, request.path, payload], sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+def _digest(value):
+    if not hasattr(value, 'chunks'):
+        return value
+    if hasattr(value, 'sha256'):
+        return value.sha256
+    # Uploads that bypassed HashingFileUploadHandler are hashed chunk by chunk
+    sha256 = hashlib.sha256()
+    for chunk in value.chunks():
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+def replayable(request):
+    """
+    True if the request retries one whose response is stored, so it costs nothing to answer.
+    """
+    key = request.headers.get('Idempotency-Key')
+    return bool(key) and IdempotencyKey.objects.filter(
+        user=request.user, key=key, response_status__isnull=False,
+        created_at__gte=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    ).exists()
+
+def idempotent(view):
+    """
+    Make a POST view safe to retry with an ``Idempotency-Key`` header.
+
+    The first request with a key claims it by inserting an IdempotencyKey
+    row, unique per user and key, and runs the view; its response is stored
+    on the row. Retries within IDEMPOTENCY_KEY_TTL get that response back
+    with ``Idempotent-Replayed: true`` and never reach the view, so nothing
+    is created or analyzed twice. A retry arriving while the first request
+    is still running waits up to IDEMPOTENCY_WAIT seconds for its response,
+    then gets 409. Reusing a key for a different request is refused with 422.
+
+    Server errors store nothing, so a retry runs the view again; so does a
+    retry after the first request died holding the key for longer than
+    IDEMPOTENCY_LOCK_TIMEOUT. Requests without the header are not affected.
+
+    Apply it below @api_view so DRF has authenticated the request first.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': 'Idempotency-Key may be at most 255 characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        fingerprint = request_fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+        while True:
+            record, replay = _claim(request.user, key, fingerprint)
+            if record is not None:
+                break
+            if replay is not None:
+                return replay
+            if time.monotonic() >= deadline:
+                response = Response({'error': 'A request with this Idempotency-Key is still in progress'},
+                                    status=status.HTTP_409_CONFLICT)
+                response['Retry-After'] = '1'
+                return response
+            time.sleep(0.1)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['response_status', 'response_body'])
+        return response
+    return wrapper
+
+def _claim(user, key, fingerprint):
+    """
+    Claim a key for this request, or find the request that has it.
+
+    Returns:
+        tuple: (record, None) when the key is claimed, (None, response) when
+            the request should be answered with ``response``, or (None, None)
+            while another request holds the key
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), None
+    except IntegrityError:
+        pass
+    record = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if record is None:
+        # Swept or released since the insert failed
+        return None, None
+    if record.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL):
+        # An expired key is free to use again, as if the sweeper had got to it
+        IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+        return None, None
+    if record.fingerprint != fingerprint:
+        return None, Response({'error': 'Idempotency-Key was already used for a different request'},
+                              status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if record.response_status is not None:
+        response = Response(record.response_body, status=record.response_status)
+        response['Idempotent-Replayed'] = 'true'
+        return None, response
+    if record.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+        # The request holding it died; whichever retry moves created_at on takes it over
+        taken = IdempotencyKey.objects.filter(
+            pk=record.pk, created_at=record.created_at, response_status__isnull=True,
+        ).update(created_at=now)
+        if taken:
+            record.created_at = now
+            return record, None
+    return None, None
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+import io
+import numpy as np
+
+# Input size of the image model
+MODEL_INPUT_SIZE = (224, 224)
+
+def open_image(source, size):
+    """
+    Open an image upright and in RGB, decoding no more pixels than ``size`` needs.
+
+    JPEGs are decoded at the smallest DCT scale (1/2, 1/4 or 1/8) that still
+    covers ``size``, so a 12 MP photo wanted at 224x224 decodes about
+    560 KB of pixels instead of 36 MB. EXIF orientation is applied. An
+    already decoded PIL image is only converted to RGB.
+
+    Args:
+        source: Bytes, a path or a binary file object, or a PIL image
+        size (tuple): Smallest (width, height) the caller will scale down to
+    """
+    if isinstance(source, Image.Image):
+        image = source
+    else:
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        image = Image.open(source)
+        # Only JPEG implements draft; other formats decode in full
+        image.draft('RGB', size)
+        image = ImageOps.exif_transpose(image)
+    return image if image.mode == 'RGB' else image.convert('RGB')
+
+def model_input(source, out=None):
+    """
+    Decode an image into the 224x224x3 model input.
+
+    Pixels are written straight into ``out`` (e.g. one row of a float32
+    batch) when given, otherwise a new uint8 array is returned. Decoding
+    keeps no shared state and Pillow releases the GIL while decoding, so
+    calls can run in parallel threads.
+    """
+    image = open_image(source, MODEL_INPUT_SIZE)
+    resized = image.resize(MODEL_INPUT_SIZE, Image.BICUBIC, reducing_gap=3.0)
+    if out is None:
+        return np.array(resized, dtype=np.uint8)
+    out[...] = np.asarray(resized)
+    return out
+
+def decode_batch(sources, out=None, max_workers=4):
+    """
+    Decode several images into one (n, 224, 224, 3) float32 batch using a thread pool.
+
+    Sources may also be stored model inputs (uint8 arrays), which are copied in.
+    """
+    if out is None:
+        out = np.empty((len(sources), *MODEL_INPUT_SIZE[::-1], 3), dtype=np.float32)
+
+    def fill(index):
+        source = sources[index]
+        if isinstance(source, np.ndarray):
+            out[index] = source
+        else:
+            model_input(source, out=out[index])
+
+    if max_workers == 1 or len(sources) == 1:
+        for index in range(len(sources)):
+            fill(index)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(fill, range(len(sources))))
+    return out
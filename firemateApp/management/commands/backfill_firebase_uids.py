@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Lower
+from firebase_admin import auth
+from firemateApp.models import FirebaseIdentity
+
+class Command(BaseCommand):
+    help = 'Link existing users to their Firebase UIDs by verified email'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        # Initializes the Firebase app from the service account key
+        from firemateApp import firebase_authentication  # noqa: F401
+
+        User = get_user_model()
+        linked = 0
+        batch = {}
+        for firebase_user in auth.list_users().iterate_all():
+            if firebase_user.email and firebase_user.email_verified:
+                batch[firebase_user.email.lower()] = firebase_user.uid
+            if len(batch) >= options['batch_size']:
+                linked += self._link(User, batch, options['dry_run'])
+                batch = {}
+        if batch:
+            linked += self._link(User, batch, options['dry_run'])
+
+        verb = 'Would link' if options['dry_run'] else 'Linked'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {linked} users'))
+
+    def _link(self, User, uids_by_email, dry_run):
+        users = (
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(firebase_identity__isnull=True, email_lower__in=list(uids_by_email))
+            .order_by('id')
+        )
+        identities = {}
+        for user_id, email in users.values_list('id', 'email_lower'):
+            uid = uids_by_email[email]
+            # Several accounts may share an email; link the oldest
+            identities.setdefault(uid, FirebaseIdentity(user_id=user_id, firebase_uid=uid))
+        if not dry_run:
+            # UIDs linked concurrently by the authentication path are skipped
+            FirebaseIdentity.objects.bulk_create(identities.values(), ignore_conflicts=True)
+        return len(identities)
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from firemateApp.models import FireIncident
+from firemateApp.views import _analyze_incident
+
+class Command(BaseCommand):
+    help = 'Finish incident analyses that were deferred or cut to cheap stages during a report surge'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single pass instead of looping')
+        parser.add_argument('--interval', type=float, default=settings.DEFERRED_ANALYSIS_INTERVAL)
+        parser.add_argument('--batch-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        while True:
+            pending = FireIncident.objects.filter(analysis_pending=True).order_by('reported_at')
+            analyzed = failed = 0
+            for incident in pending[:options['batch_size']]:
+                _analyze_incident(incident)
+                if incident.analysis_pending:
+                    self.stderr.write(f'Analysis of incident {incident.pk} did not complete')
+                    failed += 1
+                analyzed += 1
+            if analyzed:
+                self.stdout.write(f'Analyzed {analyzed - failed} deferred incidents, {failed} failed')
+            if options['once']:
+                return
+            # A full batch means more are waiting, unless it failed and would only fail again
+            if failed or analyzed < options['batch_size']:
+                time.sleep(options['interval'])
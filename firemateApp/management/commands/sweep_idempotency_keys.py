@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from firemateApp.models import IdempotencyKey
+
+class Command(BaseCommand):
+    help = 'Delete Idempotency-Key records older than IDEMPOTENCY_KEY_TTL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single pass instead of looping')
+        parser.add_argument('--interval', type=float, default=settings.IDEMPOTENCY_SWEEP_INTERVAL)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        while True:
+            expired = IdempotencyKey.objects.filter(
+                created_at__lt=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+            swept = 0
+            while True:
+                # In batches, so no one delete holds locks on much of the table
+                batch = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+                if not batch:
+                    break
+                swept += IdempotencyKey.objects.filter(pk__in=batch).delete()[0]
+            if swept:
+                self.stdout.write(f'Swept {swept} expired idempotency keys')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,57 @@
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from firemateApp.firestore_sync import FirestoreSync
+
+class Command(BaseCommand):
+    help = 'Sync users, incidents and responses with their Firestore collections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single pass instead of looping')
+        parser.add_argument('--interval', type=float, default=settings.FIRESTORE_SYNC_INTERVAL)
+        parser.add_argument('--batch-size', type=int, default=settings.FIRESTORE_SYNC_BATCH_SIZE)
+        direction = parser.add_mutually_exclusive_group()
+        direction.add_argument('--push-only', action='store_true')
+        direction.add_argument('--pull-only', action='store_true')
+        parser.add_argument('--emulator', metavar='HOST:PORT', help='Sync with a Firestore emulator instead')
+        parser.add_argument('--project', help='Firebase project id for the emulator')
+
+    def handle(self, *args, **options):
+        engine = FirestoreSync(self._connect(options), batch_size=options['batch_size'])
+        while True:
+            try:
+                stats = engine.sync_once(push=not options['pull_only'], pull=not options['push_only'])
+            except Exception as e:
+                if options['once']:
+                    raise
+                # Marks only advance after a page is written, so the next pass retries it
+                self.stderr.write(f'Sync pass failed: {e}')
+            else:
+                self._report(stats)
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def _connect(self, options):
+        if options['emulator']:
+            from google.cloud import firestore
+
+            # The client talks to the emulator without credentials
+            os.environ['FIRESTORE_EMULATOR_HOST'] = options['emulator']
+            return firestore.Client(project=options['project'] or 'demo-firemate')
+
+        # Initializes the Firebase app from the service account key
+        from firemateApp import firebase_authentication  # noqa: F401
+        from firebase_admin import firestore
+        return firestore.client()
+
+    def _report(self, stats):
+        for collection, result in stats.items():
+            moved = result['pushed'] + result['pulled']
+            rate = moved / result['seconds'] if result['seconds'] else 0
+            self.stdout.write(
+                f"{collection}: pushed {result['pushed']}, pulled {result['pulled']}, "
+                f"conflicts {result['conflicts']}, skipped {result['skipped']} "
+                f"({rate:.0f} rows/s, push lag {result['push_lag']:.1f}s, pull lag {result['pull_lag']:.1f}s)"
+            )
@@ -0,0 +1,170 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+from .image_preprocessing import model_input, open_image
+from .media_serving import media_url
+import io
+import logging
+import numpy as np
+import wave
+
+logger = logging.getLogger(__name__)
+
+# Longest edge of each client thumbnail
+THUMBNAIL_SIZES = {'small': 160, 'medium': 640}
+
+# (Pillow format, extension, save options) of each thumbnail encoding
+THUMBNAIL_FORMATS = [
+    ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+
+# Content-Type each thumbnail extension is served with
+THUMBNAIL_CONTENT_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+# Canonical audio derivative: mono 16-bit PCM at the rate speech recognition expects
+AUDIO_SAMPLE_RATE = 16000
+
+# Header size of a PCM WAV written by the wave module; samples follow it
+WAV_HEADER_SIZE = 44
+
+def analysis_input_name(content_hash):
+    return f'derivatives/{content_hash[:2]}/{content_hash}/analysis.npy'
+
+def thumbnail_name(content_hash, size, extension):
+    return f'derivatives/{content_hash[:2]}/{content_hash}/{size}.{extension}'
+
+def audio_input_name(content_hash):
+    return f'derivatives/{content_hash[:2]}/{content_hash}/audio.wav'
+
+def generate_derivatives(media):
+    """
+    Create the derivatives of an uploaded image or audio file; other media has none.
+    """
+    if not media.file:
+        return
+    if media.media_type == 'IMAGE':
+        _generate_image_derivatives(media)
+    elif media.media_type == 'AUDIO':
+        _generate_audio_input(media)
+
+def _generate_image_derivatives(media):
+    """
+    Create the analysis input and thumbnails of an uploaded image.
+
+    The analysis input is made exactly as preprocess_image makes it from the
+    original, and thumbnails come from one decode at the reduced scale the
+    largest needs. Derivatives are named by content hash, so identical
+    uploads share them and an existing set is reused. Fills
+    ``analysis_input`` and ``thumbnails`` on the instance and saves them.
+    """
+    analysis_name = analysis_input_name(media.content_hash)
+    thumbnails = {
+        size: {extension: thumbnail_name(media.content_hash, size, extension) for _, extension, _ in THUMBNAIL_FORMATS}
+        for size in THUMBNAIL_SIZES
+    }
+
+    names = [analysis_name] + [name for formats in thumbnails.values() for name in formats.values()]
+    if not all(default_storage.exists(name) for name in names):
+        try:
+            with media.file.open('rb') as original:
+                analysis = model_input(original)
+                original.seek(0)
+                edge = max(THUMBNAIL_SIZES.values())
+                preview = open_image(original, (edge, edge))
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.error(f"Could not decode image media {media.pk}: {e}")
+            return
+        _save_array(analysis_name, analysis)
+
+        for size, edge in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+            # Each size is scaled down from the previous, larger one
+            preview.thumbnail((edge, edge))
+            for image_format, extension, options in THUMBNAIL_FORMATS:
+                _save_image(thumbnails[size][extension], preview, image_format, options)
+
+    media.analysis_input = analysis_name
+    media.thumbnails = {
+        size: {extension: media_url(media, f'{size}.{extension}') for extension in formats}
+        for size, formats in thumbnails.items()
+    }
+    media.save(update_fields=['analysis_input', 'thumbnails'])
+
+def _generate_audio_input(media):
+    """
+    Transcode an uploaded audio file to the canonical mono 16 kHz PCM WAV, once.
+
+    Voice analysis and transcription read these samples instead of decoding
+    the compressed original each time. Fills ``analysis_input`` and
+    ``duration`` on the instance and saves them.
+    """
+    name = audio_input_name(media.content_hash)
+    if default_storage.exists(name):
+        frames = (default_storage.size(name) - WAV_HEADER_SIZE) // 2
+    else:
+        try:
+            with media.file.open('rb') as original:
+                audio = AudioSegment.from_file(original, format=media.file.name.rsplit('.', 1)[-1])
+        except (CouldntDecodeError, OSError) as e:
+            logger.error(f"Could not decode audio media {media.pk}: {e}")
+            return
+        audio = audio.set_channels(1).set_frame_rate(AUDIO_SAMPLE_RATE).set_sample_width(2)
+        _save_wav(name, audio.raw_data)
+        frames = len(audio.raw_data) // 2
+
+    media.analysis_input = name
+    media.duration = frames / AUDIO_SAMPLE_RATE
+    media.save(update_fields=['analysis_input', 'duration'])
+
+def load_analysis_input(media):
+    """
+    Memory-map the stored analysis input of an image, or return None if it has none.
+    """
+    if media.media_type != 'IMAGE' or not media.analysis_input:
+        return None
+    try:
+        return np.load(default_storage.path(media.analysis_input), mmap_mode='r')
+    except (OSError, ValueError, NotImplementedError):
+        # Missing file, or a storage without local paths
+        return None
+
+def load_audio_input(media):
+    """
+    Memory-map the canonical samples of an audio file as int16 at AUDIO_SAMPLE_RATE.
+
+    Returns None if it has none.
+    """
+    if media.media_type != 'AUDIO' or not media.analysis_input:
+        return None
+    try:
+        return np.memmap(default_storage.path(media.analysis_input), dtype='<i2', mode='r', offset=WAV_HEADER_SIZE)
+    except (OSError, ValueError, NotImplementedError):
+        # Missing or empty file, or a storage without local paths
+        return None
+
+def _save_array(name, array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    _replace(name, buffer.getvalue())
+
+def _save_wav(name, pcm):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(pcm)
+    _replace(name, buffer.getvalue())
+
+def _save_image(name, image, image_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    _replace(name, buffer.getvalue())
+
+def _replace(name, content):
+    # Same name, same content: a previous partial run may have left it behind
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(content))
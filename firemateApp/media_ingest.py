@@ -0,0 +1,280 @@
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import serializers
+from .models import IncidentMedia
+from .media_derivatives import generate_derivatives
+from .media_serving import media_url
+import fcntl
+import hashlib
+import os
+import tempfile
+
+# Bytes kept from the start of each upload for sniffing its type
+HEADER_SIZE = 64
+
+# Bytes read per chunk from a resumable upload's request body
+CHUNK_SIZE = 64 * 1024
+
+# (magic bytes at offsets, media type, content type, extension), checked in order
+SIGNATURES = [
+    (((0, b'\xff\xd8\xff'),), 'IMAGE', 'image/jpeg', 'jpg'),
+    (((0, b'\x89PNG\r\n\x1a\n'),), 'IMAGE', 'image/png', 'png'),
+    (((0, b'GIF87a'),), 'IMAGE', 'image/gif', 'gif'),
+    (((0, b'GIF89a'),), 'IMAGE', 'image/gif', 'gif'),
+    (((0, b'RIFF'), (8, b'WEBP')), 'IMAGE', 'image/webp', 'webp'),
+    (((0, b'RIFF'), (8, b'WAVE')), 'AUDIO', 'audio/wav', 'wav'),
+    (((0, b'RIFF'), (8, b'AVI ')), 'VIDEO', 'video/x-msvideo', 'avi'),
+    (((0, b'OggS'),), 'AUDIO', 'audio/ogg', 'ogg'),
+    (((0, b'fLaC'),), 'AUDIO', 'audio/flac', 'flac'),
+    (((0, b'#!AMR'),), 'AUDIO', 'audio/amr', 'amr'),
+    (((0, b'ID3'),), 'AUDIO', 'audio/mpeg', 'mp3'),
+]
+
+# ISO base media brands (bytes 8-12 after "ftyp") that are not plain MP4 video
+FTYP_BRANDS = {
+    b'M4A ': ('AUDIO', 'audio/mp4', 'm4a'),
+    b'qt  ': ('VIDEO', 'video/quicktime', 'mov'),
+    b'3gp4': ('VIDEO', 'video/3gpp', '3gp'),
+    b'3gp5': ('VIDEO', 'video/3gpp', '3gp'),
+    b'3gp6': ('VIDEO', 'video/3gpp', '3gp'),
+    b'heic': ('IMAGE', 'image/heic', 'heic'),
+    b'heix': ('IMAGE', 'image/heic', 'heic'),
+    b'mif1': ('IMAGE', 'image/heif', 'heif'),
+}
+
+class UploadConflict(Exception):
+    pass
+
+def sniff(header):
+    """
+    Identify a file from its first bytes.
+
+    Returns:
+        tuple: (media type, content type, extension), or None if unsupported
+    """
+    for parts, media_type, content_type, extension in SIGNATURES:
+        if all(header[offset:offset + len(magic)] == magic for offset, magic in parts):
+            return media_type, content_type, extension
+    if header[4:8] == b'ftyp':
+        return FTYP_BRANDS.get(header[8:12], ('VIDEO', 'video/mp4', 'mp4'))
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        # Matroska; WebM declares its doctype in the EBML header
+        return ('VIDEO', 'video/webm', 'webm') if b'webm' in header else ('VIDEO', 'video/x-matroska', 'mkv')
+    if len(header) >= 2 and header[0] == 0xff and header[1] & 0xf6 == 0xf0:
+        return 'AUDIO', 'audio/aac', 'aac'
+    if len(header) >= 2 and header[0] == 0xff and header[1] & 0xe0 == 0xe0:
+        return 'AUDIO', 'audio/mpeg', 'mp3'
+    return None
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded files to a temporary file on disk, hashing them as they arrive.
+
+    Memory use per upload is one chunk, whatever the file size. The
+    resulting TemporaryUploadedFile carries ``sha256`` and ``header`` (its
+    first bytes), so ingest never has to read it again.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.header = b''
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MEDIA_MAX_UPLOAD_SIZE:
+            raise RequestDataTooBig(f'Uploaded files may be at most {settings.MEDIA_MAX_UPLOAD_SIZE} bytes.')
+        self.sha256.update(raw_data)
+        if len(self.header) < HEADER_SIZE:
+            self.header += raw_data[:HEADER_SIZE - len(self.header)]
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        upload.header = self.header
+        return upload
+
+def _fingerprint(upload):
+    if hasattr(upload, 'sha256'):
+        return upload.sha256, upload.header
+    # Uploads that bypassed HashingFileUploadHandler are hashed chunk by chunk
+    sha256 = hashlib.sha256()
+    header = b''
+    for chunk in upload.chunks():
+        sha256.update(chunk)
+        if len(header) < HEADER_SIZE:
+            header += chunk[:HEADER_SIZE - len(header)]
+    return sha256.hexdigest(), header
+
+def ingest(upload, incident, media_type=None, original_size=None, voice_features=None):
+    """
+    Store an uploaded file for an incident and return its IncidentMedia.
+
+    The media type is taken from the file's magic bytes, and a declared
+    ``media_type`` that disagrees is rejected. Files are stored under their
+    SHA-256, so the same content uploaded twice is kept once; a temporary
+    upload is moved into place rather than copied. Derivatives (an image's
+    analysis input and thumbnails, an audio file's canonical PCM) are made
+    here, once.
+
+    With ``original_size`` the upload is an analysis proxy (a downscaled
+    photo, a short voice excerpt): it stands in for the media until the
+    original of that many bytes arrives through receive_original.
+
+    ``voice_features``, validated by serializers.VoiceFeaturesSerializer,
+    are the client's own analysis of an audio upload, stored with it.
+
+    Raises:
+        serializers.ValidationError: For unsupported or mislabelled files
+    """
+    media = IncidentMedia.objects.create(
+        incident=incident, upload_length=original_size, voice_features=voice_features, **_store(upload, media_type)
+    )
+    # Served by the view that checks access, which needs the pk
+    media.file_url = media_url(media)
+    media.save(update_fields=['file_url'])
+    generate_derivatives(media)
+    return media
+
+def _store(upload, media_type=None):
+    # Returns the IncidentMedia fields describing the stored file
+    digest, header = _fingerprint(upload)
+    detected = sniff(header)
+    if detected is None:
+        raise serializers.ValidationError({'file': 'Unsupported file type.'})
+    detected_type, content_type, extension = detected
+    if media_type and media_type != detected_type:
+        raise serializers.ValidationError(
+            {'media_type': f'File content is {detected_type.lower()}, not {media_type.lower()}.'}
+        )
+
+    name = _save_once(f'incident_media/{digest[:2]}/{digest[2:4]}/{digest}.{extension}', upload)
+    return {
+        'media_type': detected_type,
+        'file': name,
+        'content_hash': digest,
+        'size': upload.size,
+        'content_type': content_type,
+    }
+
+def _save_once(name, upload):
+    # Returns the name the content is stored under. Checking exists() before
+    # save() races: two uploads of the same content would both save, and
+    # storage renames the second. os.link never overwrites, so whichever
+    # upload links first wins and the other finds the file already there.
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        # Remote storages write the same key with the same content either way
+        if not default_storage.exists(name):
+            name = default_storage.save(name, upload)
+        return name
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    if hasattr(upload, 'temporary_file_path'):
+        try:
+            os.link(upload.temporary_file_path(), path)
+            os.chmod(path, default_storage.file_permissions_mode or 0o644)
+            return name
+        except FileExistsError:
+            return name
+        except OSError:
+            # Spooled on another filesystem: copy it over instead
+            pass
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+    try:
+        with os.fdopen(descriptor, 'wb') as destination:
+            upload.seek(0)
+            for chunk in upload.chunks():
+                destination.write(chunk)
+        os.chmod(temporary, default_storage.file_permissions_mode or 0o644)
+        try:
+            os.link(temporary, path)
+        except FileExistsError:
+            pass
+    finally:
+        os.remove(temporary)
+    return name
+
+def partial_path(media):
+    # Spooled on local disk whatever default_storage is: remote storages offer no append
+    return os.path.join(settings.MEDIA_UPLOAD_SPOOL, f'{media.pk}.part')
+
+def receive_original(media, offset, stream, length):
+    """
+    Append a chunk of a proxied media's original, resumable from ``offset``.
+
+    Bytes are written straight from the request stream to a partial file
+    in MEDIA_UPLOAD_SPOOL, so a dropped connection loses only the chunk in flight: the client asks
+    for ``upload_offset`` and continues from there. When the last byte
+    arrives the original replaces the proxy, as if it had been uploaded
+    whole, and its derivatives are regenerated.
+
+    Args:
+        media (IncidentMedia): Media with an original still to come
+        offset (int): Where the client says the chunk starts
+        stream: Readable request body
+        length (int): Bytes in the chunk
+
+    Returns:
+        bool: True when this chunk completed the original
+
+    Raises:
+        UploadConflict: If ``offset`` is not where the upload stands, or
+            another request is writing to it
+        serializers.ValidationError: If the chunk overruns the declared size,
+            or the completed original does not match the proxy's type
+    """
+    path = partial_path(media)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as partial:
+        try:
+            fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict('Another request is uploading this original.') from None
+        # Checked under the lock, against the offset the last writer recorded
+        media.upload_offset = IncidentMedia.objects.values_list('upload_offset', flat=True).get(pk=media.pk)
+        if offset != media.upload_offset:
+            raise UploadConflict(f'Upload is at offset {media.upload_offset}.')
+        if offset + length > media.upload_length:
+            raise serializers.ValidationError(f'Original is {media.upload_length} bytes.')
+
+        # A chunk cut off earlier may have left bytes past the recorded offset
+        partial.truncate(offset)
+        received = 0
+        while received < length:
+            chunk = stream.read(min(CHUNK_SIZE, length - received))
+            if not chunk:
+                break
+            partial.write(chunk)
+            received += len(chunk)
+        partial.flush()
+        media.upload_offset = offset + received
+        IncidentMedia.objects.filter(pk=media.pk).update(upload_offset=media.upload_offset)
+
+        if media.upload_offset < media.upload_length:
+            return False
+        _complete_original(media, path)
+    return True
+
+def _complete_original(media, path):
+    try:
+        with open(path, 'rb') as original:
+            fields = _store(File(original), media.media_type)
+    except serializers.ValidationError:
+        # Not the original of this proxy: start over
+        IncidentMedia.objects.filter(pk=media.pk).update(upload_offset=0)
+        media.upload_offset = 0
+        raise
+    finally:
+        os.remove(path)
+    for field, value in fields.items():
+        setattr(media, field, value)
+    media.upload_length = None
+    media.save()
+    generate_derivatives(media)
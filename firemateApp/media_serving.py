@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from urllib.parse import quote, urlencode
+import re
+
+# Bytes read per chunk when Django streams a file itself
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+class UnsatisfiableRange(Exception):
+    pass
+
+def byte_range(header, size):
+    """
+    Parse a Range header into the inclusive (first, last) bytes to send.
+
+    Returns None when the whole file should be sent: no header, a header
+    this view does not handle (multiple ranges, other units) or one that is
+    malformed, all of which RFC 9110 lets a server ignore.
+
+    Raises:
+        UnsatisfiableRange: If the range starts beyond the end of the file
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise UnsatisfiableRange()
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first > last:
+        if first >= size:
+            raise UnsatisfiableRange()
+        return None
+    return first, last
+
+def media_url(media, thumbnail=None):
+    """
+    URL clients fetch a stored media file, or one of its thumbnails
+    (``'small.webp'``), from.
+
+    Both go through views.media_file, which checks the viewer may see the
+    incident, rather than straight to MEDIA_URL.
+    """
+    url = reverse('media-file', args=[media.pk])
+    if thumbnail:
+        url += '?' + urlencode({'thumbnail': thumbnail})
+    return url
+
+def serve_file(request, name, content_type, etag, last_modified):
+    """
+    Serve a stored media file with conditional and Range request support.
+
+    With ``MEDIA_SENDFILE`` set the response only names the file and the
+    front-end server (nginx X-Accel-Redirect, Apache/lighttpd X-Sendfile)
+    transfers it, Ranges included, without holding a worker. Otherwise
+    Django streams it: whole files through FileResponse, which uses the WSGI
+    server's sendfile where available, and single byte ranges in chunks.
+    Storages without local paths are redirected to their own URL.
+
+    Args:
+        request: The request, for its method and conditional/Range headers
+        name (str): Storage name of the file
+        content_type (str): Content-Type to send
+        etag (str): Strong validator; content-addressed files use their hash
+        last_modified (datetime): When the file was stored
+
+    Returns:
+        HttpResponse: 200, 206, 304, 412 or 416 response, or a redirect
+    """
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        return HttpResponseRedirect(default_storage.url(name))
+
+    etag = f'"{etag}"'
+    timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = _file_response(request, name, path, content_type, etag, timestamp)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timestamp)
+    # Access follows the incident's status, so caches must revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+def _file_response(request, name, path, content_type, etag, timestamp):
+    sendfile = settings.MEDIA_SENDFILE
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        else:
+            response['X-Sendfile'] = path
+        return response
+
+    size = default_storage.size(name)
+    requested = request.headers.get('Range')
+    if requested and request.headers.get('If-Range') not in (None, etag, http_date(timestamp)):
+        # The client's partial copy is stale: send it the whole new file
+        requested = None
+    try:
+        span = byte_range(requested, size)
+    except UnsatisfiableRange:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    elif span is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = CHUNK_SIZE
+    else:
+        response = StreamingHttpResponse(_read_span(path, *span), content_type=content_type)
+    if span is None:
+        response['Content-Length'] = str(size)
+    else:
+        first, last = span
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = str(last - first + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+def _read_span(path, first, last):
+    with open(path, 'rb') as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,53 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+import re
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Dynamic responses favour speed over ratio; 4-5 is brotli's sweet spot
+BROTLI_QUALITY = 5
+
+# Already compressed, or must reach the client unbuffered
+SKIP_CONTENT_TYPES = ('text/event-stream', 'image/', 'video/', 'audio/', 'application/zip')
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with brotli when the client accepts it and the
+    brotli package is installed, with gzip otherwise.
+
+    Event streams are never compressed, since buffering inside the
+    compressor would hold events back; neither are media files, which are
+    already compressed, or partial (206) responses, whose byte ranges refer
+    to the uncompressed body.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if response.status_code == 206 or content_type.startswith(SKIP_CONTENT_TYPES):
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or response.streaming or not re_accepts_brotli.search(ae):
+            return super().process_response(request, response)
+
+        if len(response.content) < 200 or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(response.content))
+
+        # Same as GZipMiddleware: the encoded body is no longer byte-identical
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
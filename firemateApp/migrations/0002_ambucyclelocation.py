@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AmbucycleLocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('recorded_at', models.DateTimeField()),
+                ('ambucycle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='track', to='firemateApp.ambucycle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ambucycle', 'recorded_at'], name='firemateApp_ambucyc_fa4834_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0002_ambucyclelocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fireincident',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
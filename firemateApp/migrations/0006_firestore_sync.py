@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0005_firebaseidentity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentresponse',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='FirestoreSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=50, unique=True)),
+                ('pushed_through', models.BigIntegerField(default=0)),
+                ('pulled_through', models.DateTimeField(null=True)),
+                ('pulled_document', models.CharField(blank=True, max_length=128)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FirestoreDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=50)),
+                ('document_id', models.CharField(max_length=128)),
+                ('object_id', models.BigIntegerField()),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('collection', 'document_id'), name='unique_firestore_document'),
+                    models.UniqueConstraint(fields=('collection', 'object_id'), name='unique_firestore_object'),
+                ],
+            },
+        ),
+    ]
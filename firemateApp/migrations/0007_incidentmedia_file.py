@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0006_firestore_sync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='incidentmedia',
+            name='file_url',
+            field=models.URLField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='file',
+            field=models.FileField(blank=True, upload_to='incident_media/'),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='size',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
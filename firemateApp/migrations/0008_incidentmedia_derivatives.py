@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0007_incidentmedia_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='analysis_input',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='thumbnails',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0008_incidentmedia_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='duration',
+            field=models.FloatField(null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0009_incidentmedia_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='upload_length',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='upload_offset',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0010_incidentmedia_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentmedia',
+            name='voice_features',
+            field=models.JSONField(null=True),
+        ),
+    ]
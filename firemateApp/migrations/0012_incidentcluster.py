@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0011_incidentmedia_voice_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell', models.CharField(max_length=32)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('size', models.PositiveIntegerField(default=1)),
+                ('first_reported_at', models.DateTimeField()),
+                ('last_reported_at', models.DateTimeField()),
+                ('lead', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='firemateApp.fireincident')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cell', 'last_reported_at'], name='firemateApp_cell_33795a_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='fireincident',
+            name='cluster',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incidents', to='firemateApp.incidentcluster'),
+        ),
+    ]
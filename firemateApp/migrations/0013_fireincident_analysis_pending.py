@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0012_incidentcluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fireincident',
+            name='analysis_pending',
+            field=models.BooleanField(default=False),
+        ),
+    ]
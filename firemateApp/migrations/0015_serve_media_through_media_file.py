@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def serve_through_media_file(apps, schema_editor):
+    # Stored uploads and their thumbnails pointed straight at MEDIA_URL,
+    # bypassing the access check in views.media_file
+    from firemateApp.media_serving import media_url
+
+    IncidentMedia = apps.get_model('firemateApp', 'IncidentMedia')
+    for media in IncidentMedia.objects.exclude(file='').iterator():
+        media.file_url = media_url(media)
+        if media.thumbnails:
+            media.thumbnails = {
+                size: {extension: media_url(media, f'{size}.{extension}') for extension in formats}
+                for size, formats in media.thumbnails.items()
+            }
+        media.save(update_fields=['file_url', 'thumbnails'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0014_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.RunPython(serve_through_media_file, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-20 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firemateApp', '0017_create_coordination_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fireincident',
+            name='manually_triaged',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
 
 class Citizen(AbstractUser):
     GENDER_CHOICES = (
@@ -49,6 +51,29 @@ class Ambucycle(models.Model):
     last_location_update = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+class AmbucycleLocation(models.Model):
+    # Append-only GPS track; the latest point is mirrored onto Ambucycle
+    ambucycle = models.ForeignKey(Ambucycle, on_delete=models.CASCADE, related_name='track')
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['ambucycle', 'recorded_at'])]
+
+class IncidentCluster(models.Model):
+    # Reports of one event: close together in space and time
+    cell = models.CharField(max_length=32)  # Grid cell of the centroid, see clustering.grid_cell
+    latitude = models.FloatField()  # Centroid of the member reports
+    longitude = models.FloatField()
+    size = models.PositiveIntegerField(default=1)
+    lead = models.ForeignKey('FireIncident', on_delete=models.SET_NULL, null=True, related_name='+')  # Report whose analysis stands for the cluster
+    first_reported_at = models.DateTimeField()
+    last_reported_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['cell', 'last_reported_at'])]
+
 class FireIncident(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending Verification'),
@@ -70,7 +95,11 @@ class FireIncident(models.Model):
         null=True
     )
     assigned_ambucycle = models.ForeignKey(Ambucycle, on_delete=models.SET_NULL, null=True)
+    cluster = models.ForeignKey(IncidentCluster, on_delete=models.SET_NULL, null=True, related_name='incidents')
+    analysis_pending = models.BooleanField(default=False)  # Analysis deferred or cut short under load
+    manually_triaged = models.BooleanField(default=False)  # Status decided by an admin, which analyses keep
     reported_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     verified_at = models.DateTimeField(null=True)
     resolved_at = models.DateTimeField(null=True)
 
@@ -83,7 +112,17 @@ class IncidentMedia(models.Model):
     
     incident = models.ForeignKey(FireIncident, on_delete=models.CASCADE, related_name='media')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPES)
-    file_url = models.URLField()
+    file_url = models.URLField(blank=True)  # Where clients fetch the media; set from file for uploads
+    file = models.FileField(upload_to='incident_media/', blank=True)  # Stored upload, named by content hash
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the stored file
+    size = models.BigIntegerField(null=True)
+    content_type = models.CharField(max_length=100, blank=True)  # Detected from magic bytes
+    analysis_input = models.CharField(max_length=200, blank=True)  # Storage name of the preprocessed model input
+    thumbnails = models.JSONField(null=True)  # {size: {extension: url}} for images
+    duration = models.FloatField(null=True)  # Seconds, for audio
+    upload_length = models.BigIntegerField(null=True)  # Size of the original still to come; the stored file is its proxy
+    upload_offset = models.BigIntegerField(default=0)  # Bytes of that original received so far
+    voice_features = models.JSONField(null=True)  # Client-computed, see serializers.VoiceFeaturesSerializer
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
 class IncidentResponse(models.Model):
@@ -93,3 +132,57 @@ class IncidentResponse(models.Model):
     arrived_at = models.DateTimeField(null=True)
     estimated_arrival_time = models.DateTimeField(null=True)
     route_data = models.JSONField(null=True)  # For storing navigation route information
+    updated_at = models.DateTimeField(auto_now=True)
+
+class ChangeLogEntry(models.Model):
+    OPERATIONS = (
+        ('UPSERT', 'Created or Updated'),
+        ('DELETE', 'Deleted'),
+    )
+
+    # The auto-incrementing id doubles as the sync sequence number
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=10, choices=OPERATIONS)
+    owner_id = models.BigIntegerField(null=True)  # Reporter or operator the row belongs to
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+class IdempotencyKey(models.Model):
+    # A client's Idempotency-Key for a create, and the response its first request got
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of the request's method, path and payload
+    response_status = models.PositiveSmallIntegerField(null=True)  # None while the first request is running
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key'),
+        ]
+
+class FirebaseIdentity(models.Model):
+    # Firebase UID of a user; unlike the email it never changes
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='firebase_identity')
+    firebase_uid = models.CharField(max_length=128, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+class FirestoreSyncState(models.Model):
+    # High-water marks of the Firestore sync for one collection
+    collection = models.CharField(max_length=50, unique=True)
+    pushed_through = models.BigIntegerField(default=0)  # Last ChangeLogEntry id pushed
+    pulled_through = models.DateTimeField(null=True)  # updated_at of the last document pulled
+    pulled_document = models.CharField(max_length=128, blank=True)  # Its id, to break timestamp ties
+    updated_at = models.DateTimeField(auto_now=True)
+
+class FirestoreDocument(models.Model):
+    # Which Firestore document mirrors which row
+    collection = models.CharField(max_length=50)
+    document_id = models.CharField(max_length=128)
+    object_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'document_id'], name='unique_firestore_document'),
+            models.UniqueConstraint(fields=['collection', 'object_id'], name='unique_firestore_object'),
+        ]
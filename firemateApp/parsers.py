@@ -0,0 +1,18 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+import msgpack
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies sent as ``application/msgpack``.
+
+    Container and string size limits default to the size of the body, so a
+    small document cannot declare huge arrays or maps.
+    """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+            raise ParseError(f'MessagePack parse error - {str(e)}')
@@ -0,0 +1,231 @@
+from collections import namedtuple
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+from .models import Ambucycle, AmbucycleLocation
+from .events import event_hub, ambucycle_position_event
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+Position = namedtuple('Position', ['latitude', 'longitude', 'recorded_at', 'received_at'])
+
+# Sent after a flush wrote positions with queryset updates, which bypass
+# the model save signals
+positions_flushed = Signal()
+
+def write_position(ambucycle_id, latitude, longitude, recorded_at):
+    """
+    Write the latest position columns of one ambucycle.
+
+    Only the position columns are touched, and only when the stored position
+    is older, so late or out-of-order writes never move a vehicle backwards.
+    queryset.update() also keeps the device timestamp instead of letting
+    auto_now on last_location_update overwrite it.
+
+    Returns:
+        bool: True if the row was updated
+    """
+    return Ambucycle.objects.filter(
+        Q(last_location_update__isnull=True) | Q(last_location_update__lt=recorded_at),
+        pk=ambucycle_id,
+    ).update(
+        current_latitude=latitude,
+        current_longitude=longitude,
+        last_location_update=recorded_at,
+    ) > 0
+
+class LatestPositionStore:
+    """
+    In-process write-behind store for the latest ambucycle positions.
+
+    Location updates only touch memory; dirty positions are coalesced and
+    flushed to the Ambucycle rows every ``flush_interval`` seconds by a
+    background thread and once more at interpreter shutdown. Track points
+    are buffered the same way and written with bulk_create.
+
+    Every accepted update is also pushed to event stream subscribers.
+
+    Reads overlay the in-memory position onto Ambucycle instances loaded from
+    the database. A position is only served from memory while it is younger
+    than ``max_staleness`` seconds, so a worker that stopped receiving pings
+    for a vehicle falls back to whatever another worker flushed.
+
+    A ``flush_interval`` of 0 turns the store into a write-through cache.
+    """
+
+    def __init__(self, flush_interval=5.0, max_staleness=30.0):
+        self.flush_interval = flush_interval
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._dirty = set()
+        self._track = []
+        self._flusher = None
+        self._stop = threading.Event()
+        self.stats = {'updates': 0, 'row_writes': 0, 'flushes': 0}
+
+    def update(self, ambucycle_id, latitude, longitude, recorded_at=None, track=True):
+        """
+        Record a new position for an ambucycle.
+
+        Args:
+            ambucycle_id (int): Ambucycle primary key
+            latitude (float): Latitude in degrees
+            longitude (float): Longitude in degrees
+            recorded_at (datetime): Device timestamp, defaults to now
+            track (bool): Also buffer the point for the AmbucycleLocation track
+
+        Returns:
+            Position: The position now held for the ambucycle
+
+        Raises:
+            ValueError: If the coordinates are not numbers within range
+        """
+        recorded_at = recorded_at or timezone.now()
+        position = Position(float(latitude), float(longitude), recorded_at, time.monotonic())
+        # Also false for NaN
+        if not (-90 <= position.latitude <= 90 and -180 <= position.longitude <= 180):
+            raise ValueError(f'Coordinates out of range: {position.latitude}, {position.longitude}')
+        with self._lock:
+            self.stats['updates'] += 1
+            if track:
+                self._track.append(AmbucycleLocation(
+                    ambucycle_id=ambucycle_id,
+                    latitude=position.latitude,
+                    longitude=position.longitude,
+                    recorded_at=recorded_at,
+                ))
+            current = self._positions.get(ambucycle_id)
+            moved = current is None or recorded_at >= current.recorded_at
+            if moved:
+                self._positions[ambucycle_id] = position
+                self._dirty.add(ambucycle_id)
+            else:
+                position = current
+
+        if moved:
+            event_hub.publish(ambucycle_position_event(ambucycle_id, position))
+
+        if self.flush_interval <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return position
+
+    def get(self, ambucycle_id):
+        """
+        Return the in-memory position of an ambucycle, or None if unknown or stale.
+        """
+        with self._lock:
+            position = self._positions.get(ambucycle_id)
+        if position is None or time.monotonic() - position.received_at > self.max_staleness:
+            return None
+        return position
+
+    def overlay(self, ambucycle):
+        """
+        Apply a fresher in-memory position onto an Ambucycle instance.
+        """
+        position = self.get(ambucycle.id)
+        if position is not None and (
+            ambucycle.last_location_update is None or position.recorded_at > ambucycle.last_location_update
+        ):
+            ambucycle.current_latitude = position.latitude
+            ambucycle.current_longitude = position.longitude
+            ambucycle.last_location_update = position.recorded_at
+        return ambucycle
+
+    def overlay_many(self, ambucycles):
+        """
+        Apply in-memory positions onto an iterable of Ambucycle instances.
+        """
+        return [self.overlay(ambucycle) for ambucycle in ambucycles]
+
+    def flush(self):
+        """
+        Write coalesced dirty positions and buffered track points to the database.
+
+        Returns:
+            int: Number of Ambucycle rows written
+        """
+        with self._lock:
+            dirty = {ambucycle_id: self._positions[ambucycle_id] for ambucycle_id in self._dirty}
+            track = self._track
+            self._dirty = set()
+            self._track = []
+
+        if not dirty and not track:
+            return 0
+
+        try:
+            # A savepoint when flushing through inside a caller's transaction,
+            # which the error below must not leave broken
+            with transaction.atomic():
+                if track:
+                    AmbucycleLocation.objects.bulk_create(track, batch_size=500)
+                written = [
+                    ambucycle_id for ambucycle_id, position in dirty.items()
+                    if write_position(ambucycle_id, position.latitude, position.longitude, position.recorded_at)
+                ]
+        except Exception as e:
+            logger.error(f"Error flushing ambucycle positions: {str(e)}")
+            # Put the positions back so the next flush retries them
+            with self._lock:
+                for ambucycle_id in dirty:
+                    if self._positions.get(ambucycle_id) is dirty[ambucycle_id]:
+                        self._dirty.add(ambucycle_id)
+                self._track = track + self._track
+            return 0
+
+        with self._lock:
+            self.stats['row_writes'] += len(written)
+            self.stats['flushes'] += 1
+        if written:
+            positions_flushed.send(sender=self.__class__, ambucycle_ids=written)
+        return len(written)
+
+    def clear(self):
+        """
+        Drop all in-memory state without flushing.
+        """
+        with self._lock:
+            self._positions.clear()
+            self._dirty.clear()
+            self._track = []
+
+    def stop(self):
+        """
+        Stop the background flusher and flush what is left.
+        """
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval + 1)
+            self._flusher = None
+        self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, name='position-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            close_old_connections()
+            self.flush()
+
+position_store = LatestPositionStore(
+    flush_interval=settings.POSITION_STORE_FLUSH_INTERVAL,
+    max_staleness=settings.POSITION_STORE_MAX_STALENESS,
+)
+atexit.register(position_store.stop)
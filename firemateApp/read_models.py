@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+import threading
+import time
+
+class ReadModel:
+    """
+    A cached, pre-serialized response body shared by every caller of a view.
+
+    Entries live under versioned keys (``readmodel:<name>:<role>:v<version>``)
+    and are never updated in place: ``invalidate`` bumps the version, so the
+    next read misses and rebuilds while stale entries simply expire.
+
+    Rebuilds are guarded against stampedes twice over: threads of one process
+    queue on a lock and reuse the first thread's result, and processes sharing
+    the cache race for a short-lived ``cache.add`` lock; losers poll for the
+    winner's entry instead of rebuilding too.
+    """
+
+    def __init__(self, name, timeout=300, lock_timeout=10, wait_timeout=5, poll_interval=0.05):
+        self.name = name
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0}
+
+    @property
+    def _version_key(self):
+        return f'readmodel:{self.name}:version'
+
+    def version(self):
+        version = cache.get(self._version_key)
+        if version is None:
+            # Seed from the clock so an evicted version key never comes back
+            # as a number that still has entries cached under it
+            cache.add(self._version_key, int(time.time() * 1000), None)
+            version = cache.get(self._version_key)
+        return version
+
+    def invalidate(self):
+        """
+        Make every cached entry of this read model stale.
+        """
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.set(self._version_key, int(time.time() * 1000), None)
+
+    def cached(self, role):
+        """
+        Return the cached data for a role, or None on a miss, without building it.
+        """
+        data = cache.get(f'readmodel:{self.name}:{role}:v{self.version()}')
+        if data is not None:
+            self._count('hits')
+        return data
+
+    def get(self, role, build):
+        """
+        Return the cached data for a role, building it with ``build()`` on a miss.
+        """
+        key = f'readmodel:{self.name}:{role}:v{self.version()}'
+        data = cache.get(key)
+        if data is not None:
+            self._count('hits')
+            return data
+
+        with self._lock_for(role):
+            data = cache.get(key)
+            if data is not None:
+                self._count('hits')
+                return data
+
+            lock_key = f'{key}:lock'
+            if cache.add(lock_key, 1, self.lock_timeout):
+                try:
+                    data = build()
+                    cache.set(key, data, self.timeout)
+                finally:
+                    cache.delete(lock_key)
+                self._count('misses')
+                return data
+
+            # Another process is rebuilding this entry
+            self._count('waits')
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                data = cache.get(key)
+                if data is not None:
+                    return data
+
+        self._count('misses')
+        return build()
+
+    def hit_rate(self):
+        with self._stats_lock:
+            total = self.stats['hits'] + self.stats['misses']
+            return self.stats['hits'] / total if total else 0.0
+
+    def _count(self, stat):
+        # Request threads share the counters
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _lock_for(self, role):
+        with self._locks_guard:
+            return self._locks.setdefault(role, threading.Lock())
+
+active_incidents = ReadModel('incident_active', timeout=settings.READ_MODEL_TIMEOUT)
+available_ambucycles = ReadModel('ambucycle_available', timeout=settings.READ_MODEL_TIMEOUT)
@@ -0,0 +1,79 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+import json
+import msgpack
+import orjson
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views answer clients that only accept ``text/event-stream``.
+
+    The stream itself is a StreamingHttpResponse and bypasses rendering;
+    this renderer only encodes the JSON error bodies returned before the
+    stream starts (authentication or permission failures).
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data).encode(self.charset)
+
+class MediaFileRenderer(BaseRenderer):
+    """
+    Lets the media file view answer clients that only accept the file's own
+    type (``image/*``, ``audio/*``, ...), as players and image loaders do.
+
+    Files are plain HttpResponses and bypass rendering; like
+    EventStreamRenderer, this only encodes JSON error bodies, which are
+    labelled as JSON rather than with the negotiated type (``image/*`` is
+    not even a valid Content-Type).
+    """
+    media_type = '*/*'
+    format = 'file'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return json.dumps(data).encode(self.charset)
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson for large list responses.
+
+    Output is compact UTF-8 like the default JSONRenderer; types orjson does
+    not handle natively (Decimal, lazy translation strings, ...) fall back to
+    DRF's encoder, as do datetimes so they keep DRF's formatting.
+    """
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders responses as MessagePack for clients sending
+    ``Accept: application/msgpack``.
+
+    Serializer output is already made of plain types; anything else
+    (datetimes from values() rows, Decimal, UUID, ...) is converted the same
+    way the JSON renderers convert it, so both encodings carry the same data.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self._default, use_bin_type=True)
@@ -1,9 +1,27 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import User, Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+from .models import User, Ambucycle, FireIncident, IncidentCluster, IncidentMedia, IncidentResponse
+from .fast_serializers import ValuesSerializer
+from .media_derivatives import AUDIO_SAMPLE_RATE
+from .voice_features import FEATURES_VERSION
 
 User = get_user_model()
 
+class SparseFieldsMixin:
+    """
+    Accepts a ``fields`` argument restricting which fields are serialized.
+
+    Dropped nested fields are never accessed, so their related objects are
+    never loaded either.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for key in set(self.fields) - set(fields):
+                self.fields.pop(key)
+
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
     confirm_password = serializers.CharField(write_only=True, required=False)
@@ -38,7 +56,7 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
         return user
 
-class AmbucycleSerializer(serializers.ModelSerializer):
+class AmbucycleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     operator_details = UserSerializer(source='operator', read_only=True)
 
     class Meta:
@@ -50,10 +68,18 @@ class AmbucycleSerializer(serializers.ModelSerializer):
 class IncidentMediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = IncidentMedia
-        fields = ['id', 'incident', 'file_url', 'media_type', 'uploaded_at']
-        read_only_fields = ['id', 'uploaded_at']
+        fields = ['id', 'incident', 'file_url', 'thumbnails', 'duration', 'media_type', 'content_type', 'size',
+                  'content_hash', 'upload_length', 'upload_offset', 'voice_features', 'uploaded_at']
+        read_only_fields = ['id', 'thumbnails', 'duration', 'content_type', 'size', 'content_hash', 'upload_length',
+                            'upload_offset', 'voice_features', 'uploaded_at']
 
-class FireIncidentSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        # Uploaded files are stored by media_ingest; this path only links existing URLs
+        if not attrs.get('file_url', getattr(self.instance, 'file_url', '')):
+            raise serializers.ValidationError({'file_url': 'Provide a file_url or upload a file.'})
+        return attrs
+
+class FireIncidentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     reporter_details = UserSerializer(source='reporter', read_only=True)
     assigned_ambucycle_details = AmbucycleSerializer(source='assigned_ambucycle', read_only=True)
     media = IncidentMediaSerializer(many=True, read_only=True)
@@ -62,13 +88,21 @@ class FireIncidentSerializer(serializers.ModelSerializer):
         model = FireIncident
         fields = ['id', 'reporter', 'reporter_details', 'title', 'description', 'latitude', 'longitude', 
                   'status', 'ai_confidence_score', 'voice_stress_score', 'voice_analysis_details',
-                  'assigned_ambucycle', 'assigned_ambucycle_details', 'media', 'created_at', 
-                  'updated_at', 'verified_at', 'resolved_at']
+                  'assigned_ambucycle', 'assigned_ambucycle_details', 'media', 'cluster', 'analysis_pending',
+                  'created_at', 'updated_at', 'verified_at', 'resolved_at']
         read_only_fields = ['id', 'reporter', 'status', 'ai_confidence_score', 'voice_stress_score', 
-                           'voice_analysis_details', 'created_at', 'updated_at', 'verified_at', 
-                           'resolved_at']
+                           'voice_analysis_details', 'cluster', 'analysis_pending', 'created_at', 'updated_at',
+                           'verified_at', 'resolved_at']
+
+class IncidentClusterSerializer(serializers.ModelSerializer):
+    incidents = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = IncidentCluster
+        fields = ['id', 'latitude', 'longitude', 'size', 'lead', 'incidents', 'first_reported_at', 'last_reported_at']
+        read_only_fields = fields
 
-class IncidentResponseSerializer(serializers.ModelSerializer):
+class IncidentResponseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     incident_details = FireIncidentSerializer(source='incident', read_only=True)
     ambucycle_details = AmbucycleSerializer(source='ambucycle', read_only=True)
 
@@ -76,4 +110,41 @@ class IncidentResponseSerializer(serializers.ModelSerializer):
         model = IncidentResponse
         fields = ['id', 'incident', 'incident_details', 'ambucycle', 'ambucycle_details', 
                   'estimated_arrival_time', 'route_data', 'arrived_at', 'created_at']
-        read_only_fields = ['id', 'created_at', 'arrived_at'] 
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'arrived_at'] 
+
+class TelemetryPointSerializer(serializers.Serializer):
+    ambucycle = serializers.IntegerField()
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    recorded_at = serializers.DateTimeField()
+
+class VoiceFeaturesSerializer(serializers.Serializer):
+    """
+    Voice stress features a client computed from its own recording.
+
+    The fields are those of VoiceStressAnalyzer.extract_audio_features, run
+    as FEATURES_VERSION defines. Bounds are what that computation can
+    produce for a recording of ``duration`` seconds; values outside them
+    did not come from it.
+    """
+    version = serializers.ChoiceField(choices=[FEATURES_VERSION])
+    duration = serializers.FloatField(min_value=0.1, max_value=3600)  # Seconds
+    pitch_mean = serializers.FloatField(min_value=0, max_value=4000)  # Hz, piptrack's default fmax
+    pitch_std = serializers.FloatField(min_value=0, max_value=4000)
+    energy = serializers.FloatField(min_value=0, max_value=1)  # RMS of samples in [-1, 1)
+    energy_variance = serializers.FloatField(min_value=0, max_value=1)
+    speech_rate = serializers.FloatField(min_value=0)  # Zero crossings, at most one per sample
+    jitter = serializers.FloatField(min_value=0, max_value=4000)
+    shimmer = serializers.FloatField(min_value=0, max_value=1000)  # MFCC 0 spans 80 dB, about 900
+    spectral_centroid = serializers.FloatField(min_value=0, max_value=AUDIO_SAMPLE_RATE / 2)
+
+    def validate(self, attrs):
+        if attrs['speech_rate'] > attrs['duration'] * AUDIO_SAMPLE_RATE:
+            raise serializers.ValidationError({'speech_rate': 'More zero crossings than samples.'})
+        if attrs['pitch_mean'] == 0 and (attrs['pitch_std'] or attrs['jitter']):
+            raise serializers.ValidationError({'pitch_mean': 'Pitch spread without any pitch.'})
+        return attrs
+
+# values()-backed equivalents used by the high-volume list endpoints
+fast_incident_serializer = ValuesSerializer(FireIncidentSerializer)
+fast_response_serializer = ValuesSerializer(IncidentResponseSerializer)
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Ambucycle, FireIncident, IncidentMedia, IncidentResponse, FirebaseIdentity
+from .events import event_hub, incident_status_event, incident_assigned_event
+from .positions import positions_flushed
+from .read_models import active_incidents, available_ambucycles
+from .sync import SYNC_MODELS, record_change, record_user_change, record_ambucycle_upserts, record_incident_children
+from .firebase_users import firebase_users
+
+ACTIVE_STATUSES = {'VERIFIED', 'IN_PROGRESS'}
+
+def _invalidate(*read_models):
+    # Only after commit, or a concurrent rebuild could cache the old rows
+    # under the new version
+    def invalidate():
+        for read_model in read_models:
+            read_model.invalidate()
+    transaction.on_commit(invalidate)
+
+@receiver(post_init, sender=FireIncident)
+def remember_incident_status(sender, instance, **kwargs):
+    # Read through __dict__ so a deferred status field is not loaded
+    instance._loaded_status = instance.__dict__.get('status')
+
+@receiver(post_save, sender=FireIncident)
+def incident_saved(sender, instance, created, **kwargs):
+    previous_status = None if created else instance._loaded_status
+    if created or instance.status != previous_status:
+        event = incident_status_event(instance, previous_status)
+        transaction.on_commit(lambda: event_hub.publish(event))
+    if instance.status in ACTIVE_STATUSES or previous_status in ACTIVE_STATUSES:
+        _invalidate(active_incidents)
+    if not created and (instance.status in ACTIVE_STATUSES) != (previous_status in ACTIVE_STATUSES):
+        # Operators see an incident's media only while it is active, so the
+        # sync feed must revisit them when it becomes or stops being active
+        record_incident_children(instance)
+    instance._loaded_status = instance.status
+
+@receiver(post_delete, sender=FireIncident)
+def incident_deleted(sender, instance, **kwargs):
+    if instance._loaded_status in ACTIVE_STATUSES:
+        _invalidate(active_incidents)
+
+@receiver(post_save, sender=IncidentResponse)
+def publish_incident_assigned(sender, instance, created, **kwargs):
+    if created:
+        event = incident_assigned_event(instance)
+        transaction.on_commit(lambda: event_hub.publish(event))
+
+@receiver(post_save, sender=IncidentMedia)
+@receiver(post_delete, sender=IncidentMedia)
+def media_changed(sender, instance, **kwargs):
+    # Media is nested into the incident payload, so it versions the incident
+    FireIncident.objects.filter(pk=instance.incident_id).update(updated_at=timezone.now())
+    _invalidate(active_incidents)
+
+@receiver(post_save, sender=Ambucycle)
+@receiver(post_delete, sender=Ambucycle)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def fleet_changed(sender, instance, **kwargs):
+    # Ambucycles and users are nested into both read models
+    _invalidate(active_incidents, available_ambucycles)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    # The resolver caches whole rows: drop them now, and again after commit
+    # in case a concurrent request cached the old row in between
+    firebase_users.forget(instance.pk)
+    transaction.on_commit(lambda: firebase_users.forget(instance.pk))
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def log_user_upsert(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which is not synced
+    if update_fields != frozenset({'last_login'}):
+        record_user_change(instance, 'UPSERT')
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def log_user_delete(sender, instance, **kwargs):
+    record_user_change(instance, 'DELETE')
+
+@receiver(post_delete, sender=FirebaseIdentity)
+def firebase_identity_deleted(sender, instance, **kwargs):
+    firebase_users.forget(instance.user_id)
+
+@receiver(positions_flushed)
+def positions_written(sender, ambucycle_ids, **kwargs):
+    record_ambucycle_upserts(ambucycle_ids)
+    _invalidate(active_incidents, available_ambucycles)
+
+# Change log for the sync feed, written in the same transaction as the change
+def log_upsert(sender, instance, **kwargs):
+    record_change(instance, 'UPSERT')
+
+def log_delete(sender, instance, **kwargs):
+    record_change(instance, 'DELETE')
+
+for sync_model in SYNC_MODELS:
+    post_save.connect(log_upsert, sender=sync_model.model, dispatch_uid=f'sync-upsert-{sync_model.label}')
+    post_delete.connect(log_delete, sender=sync_model.model, dispatch_uid=f'sync-delete-{sync_model.label}')
@@ -0,0 +1,95 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+import threading
+import time
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Runs an expensive call once for all concurrent callers with the same key.
+
+    Threads of one process join the call already in flight and get its
+    result (or exception) when it finishes. Processes race for a
+    ``cache.add`` lock on the key in the ``cache_alias`` cache; the winner
+    stores its result under ``singleflight:<name>:<key>``, and losers poll
+    for that instead of running the call too. A loser whose wait runs out,
+    or whose winner died without a result, runs the call itself.
+
+    Only processes sharing that cache are deduplicated: a per-process backend
+    such as LocMemCache leaves each process running its own call.
+
+    Only calls in flight are shared: once one finishes, the next caller with
+    the same key starts a new one. Results must be picklable and not None.
+    """
+
+    def __init__(self, name, lock_timeout=120, poll_interval=0.05, cache_alias=DEFAULT_CACHE_ALIAS):
+        self.name = name
+        self.cache_alias = cache_alias
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._calls_guard = threading.Lock()
+        self.stats = {'runs': 0, 'shared': 0, 'waits': 0}
+
+    def do(self, key, fn):
+        """
+        Return ``fn()``, or the result of the call already in flight for ``key``.
+        """
+        with self._calls_guard:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            self.stats['shared'] += 1
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._calls_guard:
+                del self._calls[key]
+            call.done.set()
+
+    def _run(self, key, fn):
+        cache = caches[self.cache_alias]
+        result_key = f'singleflight:{self.name}:{key}'
+        lock_key = f'{result_key}:lock'
+        if cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                # A result left by an earlier flight is not this one's
+                cache.delete(result_key)
+                result = fn()
+                cache.set(result_key, result, self.lock_timeout)
+            finally:
+                cache.delete(lock_key)
+            self.stats['runs'] += 1
+            return result
+
+        # Another process is running this call
+        self.stats['waits'] += 1
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            # Read the lock first: the winner stores its result before releasing it
+            locked = cache.get(lock_key) is not None
+            result = cache.get(result_key)
+            if result is not None:
+                return result
+            if not locked:
+                # Its winner failed, or finished and its result was evicted
+                break
+
+        self.stats['runs'] += 1
+        return fn()
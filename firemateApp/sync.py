@@ -0,0 +1,209 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from .models import Ambucycle, ChangeLogEntry, FireIncident, IncidentMedia, IncidentResponse
+from .visibility import incidents_for, media_for, responses_for, ambucycles_for
+
+class SyncModel:
+    """
+    How one model appears in the changes feed.
+
+    Args:
+        label (str): Key of the model in feed payloads
+        model: Django model class
+        fields (list): Flat columns sent for upserts
+        queryset_for (callable): Role-scoped queryset shared with the list view
+        owner (callable): Returns the reporter/operator id owning an instance
+        shared_with_operators (bool): Whether every operator may learn about
+            deletions, rather than only the owning user
+    """
+
+    def __init__(self, label, model, fields, queryset_for, owner, shared_with_operators):
+        self.label = label
+        self.model = model
+        self.fields = fields
+        self.queryset_for = queryset_for
+        self.owner = owner
+        self.shared_with_operators = shared_with_operators
+
+    def may_see_tombstone(self, user, owner_id):
+        if user.role == 'ADMIN':
+            return True
+        if self.queryset_for(user) is None:
+            return False
+        if user.role == 'AMBUCYCLE_OPERATOR' and self.shared_with_operators:
+            return True
+        return owner_id is not None and owner_id == user.id
+
+def _incident_reporter(incident_id):
+    return FireIncident.objects.filter(pk=incident_id).values_list('reporter_id', flat=True).first()
+
+def _ambucycle_operator(ambucycle_id):
+    return Ambucycle.objects.filter(pk=ambucycle_id).values_list('operator_id', flat=True).first()
+
+SYNC_MODELS = [
+    SyncModel(
+        'incidents', FireIncident,
+        ['id', 'reporter', 'latitude', 'longitude', 'description', 'status', 'ai_confidence_score',
+         'voice_stress_score', 'assigned_ambucycle', 'reported_at', 'updated_at', 'verified_at', 'resolved_at'],
+        incidents_for,
+        lambda incident: incident.reporter_id,
+        shared_with_operators=True,
+    ),
+    SyncModel(
+        'media', IncidentMedia,
+        ['id', 'incident', 'media_type', 'file_url', 'uploaded_at'],
+        media_for,
+        lambda media: _incident_reporter(media.incident_id),
+        shared_with_operators=True,
+    ),
+    SyncModel(
+        'responses', IncidentResponse,
+        ['id', 'incident', 'ambucycle', 'dispatched_at', 'arrived_at', 'estimated_arrival_time', 'route_data'],
+        responses_for,
+        lambda response: _ambucycle_operator(response.ambucycle_id),
+        shared_with_operators=False,
+    ),
+    SyncModel(
+        'ambucycles', Ambucycle,
+        ['id', 'vehicle_number', 'operator', 'is_available', 'current_latitude', 'current_longitude',
+         'last_location_update'],
+        ambucycles_for,
+        lambda ambucycle: ambucycle.operator_id,
+        shared_with_operators=False,
+    ),
+]
+
+SYNC_MODELS_BY_LABEL = {sync_model.label: sync_model for sync_model in SYNC_MODELS}
+SYNC_MODELS_BY_CLASS = {sync_model.model: sync_model for sync_model in SYNC_MODELS}
+
+def record_change(instance, operation):
+    """
+    Append a change log entry for a saved or deleted instance.
+    """
+    sync_model = SYNC_MODELS_BY_CLASS[type(instance)]
+    ChangeLogEntry.objects.create(
+        model=sync_model.label,
+        object_id=instance.pk,
+        operation=operation,
+        owner_id=sync_model.owner(instance),
+    )
+
+def record_user_change(user, operation):
+    """
+    Append a change log entry for a user; only the Firestore sync reads these.
+    """
+    ChangeLogEntry.objects.create(model='users', object_id=user.pk, operation=operation, owner_id=user.pk)
+
+def record_ambucycle_upserts(ambucycle_ids):
+    """
+    Append change log entries for ambucycles written with queryset updates.
+    """
+    operators = dict(Ambucycle.objects.filter(pk__in=ambucycle_ids).values_list('id', 'operator_id'))
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(model='ambucycles', object_id=ambucycle_id, operation='UPSERT', owner_id=operator_id)
+        for ambucycle_id, operator_id in operators.items()
+    ])
+
+def record_incident_children(incident):
+    """
+    Append upserts for an incident's media and responses, whose visibility
+    follows the incident's status.
+    """
+    entries = [
+        ChangeLogEntry(model='media', object_id=media_id, operation='UPSERT', owner_id=incident.reporter_id)
+        for media_id in IncidentMedia.objects.filter(incident=incident).values_list('id', flat=True)
+    ]
+    entries += [
+        ChangeLogEntry(model='responses', object_id=response_id, operation='UPSERT', owner_id=operator_id)
+        for response_id, operator_id in IncidentResponse.objects.filter(incident=incident)
+        .values_list('id', 'ambucycle__operator_id')
+    ]
+    ChangeLogEntry.objects.bulk_create(entries)
+
+def committed_through(now=None):
+    """
+    Return the highest change log id below which no entry can still appear.
+
+    Ids are handed out when an entry is inserted but become visible when its
+    transaction commits, so a long transaction can commit an id below ones
+    already read. A hole in the sequence is therefore waited on until it
+    fills, unless it sits below an entry older than SYNC_SETTLE_SECONDS: no
+    transaction runs that long, so its id was rolled back.
+
+    Args:
+        now (datetime): Current time, for callers with their own clock
+    """
+    settled = (now or timezone.now()) - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    recent = list(ChangeLogEntry.objects.filter(created_at__gt=settled).order_by('id').values_list('id', flat=True))
+    if not recent:
+        return ChangeLogEntry.objects.aggregate(latest=Max('id'))['latest'] or 0
+    through = ChangeLogEntry.objects.filter(id__lt=recent[0]).aggregate(latest=Max('id'))['latest'] or 0
+    for entry_id in recent:
+        if entry_id != through + 1:
+            break
+        through = entry_id
+    return through
+
+def snapshot(user):
+    """
+    Return everything visible to a user plus the token to sync from next.
+    """
+    token = committed_through()
+    changes = {}
+    for sync_model in SYNC_MODELS:
+        queryset = sync_model.queryset_for(user)
+        if queryset is not None:
+            changes[sync_model.label] = {'upserts': list(queryset.values(*sync_model.fields)), 'deletes': []}
+    return {'changes': changes, 'next': str(token), 'has_more': False}
+
+def changes_since(user, since, limit):
+    """
+    Return the compacted changes visible to a user after a sync token.
+
+    Multiple entries for the same row collapse to the latest one. Upserts are
+    re-read through the role-scoped list querysets, so rows that changed but
+    are no longer visible to the user (e.g. an incident an operator saw
+    while active that has since been resolved) come back as tombstones.
+
+    Args:
+        user: The requesting user
+        since (int): Sequence number from a previous response's ``next``
+        limit (int): Maximum change log entries to consume
+
+    Returns:
+        dict: ``changes`` per model label with ``upserts`` and ``deletes``,
+            the ``next`` token and whether more entries are pending
+    """
+    entries = list(
+        ChangeLogEntry.objects.filter(id__gt=since, id__lte=committed_through(), model__in=list(SYNC_MODELS_BY_LABEL))
+        .order_by('id')
+        .values_list('id', 'model', 'object_id', 'operation', 'owner_id')[:limit]
+    )
+
+    touched = {}
+    for _, label, object_id, operation, owner_id in entries:
+        touched.setdefault(label, {})[object_id] = (operation, owner_id)
+
+    changes = {}
+    for label, objects in touched.items():
+        sync_model = SYNC_MODELS_BY_LABEL[label]
+        queryset = sync_model.queryset_for(user)
+        upsert_ids = [object_id for object_id, (operation, _) in objects.items() if operation == 'UPSERT']
+        upserts = []
+        if queryset is not None and upsert_ids:
+            upserts = list(queryset.filter(id__in=upsert_ids).values(*sync_model.fields))
+        visible = {row['id'] for row in upserts}
+        deletes = sorted(
+            object_id for object_id, (_, owner_id) in objects.items()
+            if object_id not in visible and sync_model.may_see_tombstone(user, owner_id)
+        )
+        if upserts or deletes:
+            changes[label] = {'upserts': upserts, 'deletes': deletes}
+
+    return {
+        'changes': changes,
+        'next': str(entries[-1][0] if entries else since),
+        'has_more': len(entries) == limit,
+    }
@@ -0,0 +1,63 @@
+from django.db import transaction
+from .models import AmbucycleLocation
+from .positions import position_store
+
+def latest_points(points):
+    """
+    Reduce a batch of telemetry points to the newest point per ambucycle.
+    """
+    latest = {}
+    for point in points:
+        current = latest.get(point['ambucycle'])
+        if current is None or point['recorded_at'] > current['recorded_at']:
+            latest[point['ambucycle']] = point
+    return latest
+
+def ingest_points(points, batch_size=500):
+    """
+    Store a validated batch of telemetry points.
+
+    Every point is appended to the AmbucycleLocation track with bulk_create,
+    in one transaction, so a batch that fails part way leaves no track points
+    behind. Once that commits, the newest point per ambucycle goes to the
+    latest-position store, which publishes it and coalesces it with other
+    updates; its flusher writes the Ambucycle position columns later, in a
+    transaction of its own.
+
+    Args:
+        points (list): Dicts with ambucycle, latitude, longitude and recorded_at
+        batch_size (int): Rows per INSERT statement
+
+    Returns:
+        int: Number of points stored
+    """
+    latest = latest_points(points)
+
+    def update_positions():
+        for ambucycle_id, point in latest.items():
+            position_store.update(
+                ambucycle_id,
+                point['latitude'],
+                point['longitude'],
+                recorded_at=point['recorded_at'],
+                track=False,
+            )
+
+    with transaction.atomic():
+        AmbucycleLocation.objects.bulk_create(
+            [
+                AmbucycleLocation(
+                    ambucycle_id=point['ambucycle'],
+                    latitude=point['latitude'],
+                    longitude=point['longitude'],
+                    recorded_at=point['recorded_at'],
+                )
+                for point in points
+            ],
+            batch_size=batch_size,
+        )
+        # The store serves and streams positions straight away, so a batch
+        # that rolls back must never reach it
+        transaction.on_commit(update_positions)
+
+    return len(points)
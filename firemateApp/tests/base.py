@@ -0,0 +1,13 @@
+from django.core.cache import cache
+
+class ClearCacheMixin:
+    """
+    Starts each test with an empty cache.
+
+    Rate limit buckets and read models are kept in the default cache, which
+    outlives each test's database.
+    """
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
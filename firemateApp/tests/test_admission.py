@@ -0,0 +1,78 @@
+from unittest import mock
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..admission import CHEAP, DEFER, FULL, AnalysisAdmission, TokenBucket
+from ..models import FireIncident, IncidentMedia
+from ..views import media_create, analysis_admission, _analyze_incident
+
+class TokenBucketTests(ClearCacheMixin, SimpleTestCase):
+    def test_bursts_then_refills_at_the_rate(self):
+        bucket = TokenBucket('test', 3, 60)
+        with mock.patch('firemateApp.admission.time.time', return_value=1000.0) as now:
+            self.assertEqual([bucket.take('a') for _ in range(3)], [0, 0, 0])
+            self.assertAlmostEqual(bucket.take('a'), 20.0)
+            self.assertEqual(bucket.take('b'), 0)
+            now.return_value = 1020.0
+            self.assertEqual(bucket.take('a'), 0)
+            self.assertGreater(bucket.take('a'), 0)
+
+class AnalysisAdmissionTests(SimpleTestCase):
+    def test_levels_follow_work_in_flight(self):
+        admission = AnalysisAdmission(full_limit=1, defer_limit=2)
+        with admission.admit() as first, admission.admit() as second, admission.admit() as third:
+            self.assertEqual((first, second, third), (FULL, CHEAP, DEFER))
+        self.assertEqual(admission.in_flight, 0)
+        with admission.admit(cheap_only=True) as level:
+            self.assertEqual(level, CHEAP)
+
+class ReportSurgeTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.factory = APIRequestFactory()
+
+    def link(self, user):
+        request = self.factory.post('/', {
+            'incident': self.incident.pk, 'media_type': 'IMAGE', 'file_url': 'https://example.com/fire.jpg',
+        }, format='json')
+        force_authenticate(request, user=user)
+        with mock.patch('firemateApp.views._analyze_incident'):
+            response = media_create(request)
+        response.render()
+        return response
+
+    def test_reporters_are_rate_limited(self):
+        statuses = [self.link(self.reporter).status_code for _ in range(6)]
+        self.assertEqual(statuses, [201] * 5 + [429])
+        self.assertIn('Retry-After', self.link(self.reporter))
+        self.assertEqual(self.link(self.admin).status_code, 201)
+
+    def test_analysis_is_shed_under_load_and_finished_later(self):
+        IncidentMedia.objects.create(incident=self.incident, media_type='IMAGE', file='incident_media/fire.jpg')
+        analysis_input = np.zeros((224, 224, 3), dtype=np.uint8)
+        with mock.patch('firemateApp.views.load_analysis_input', return_value=analysis_input), \
+                mock.patch('firemateApp.views.analyze_image', return_value=(95.0, 'Success')) as analyze_image:
+            with mock.patch.object(analysis_admission, 'in_flight', analysis_admission.defer_limit):
+                _analyze_incident(self.incident, shed=True)
+            self.incident.refresh_from_db()
+            self.assertEqual((self.incident.analysis_pending, self.incident.ai_confidence_score), (True, None))
+
+            _analyze_incident(self.incident, shed=True, cheap_only=True)
+            self.incident.refresh_from_db()
+            # No evidence was looked at, so the report is not rejected for its zero score
+            self.assertEqual((self.incident.analysis_pending, self.incident.status), (True, 'PENDING'))
+            analyze_image.assert_not_called()
+
+            call_command('run_deferred_analyses', once=True, stdout=mock.Mock())
+        analyze_image.assert_called_once()
+        self.incident.refresh_from_db()
+        self.assertEqual((self.incident.analysis_pending, self.incident.ai_confidence_score), (False, 28.5))
@@ -0,0 +1,131 @@
+import math
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..clustering import (
+    METERS_PER_DEGREE, assign_cluster, cell_key, distance, grid_cell, neighbouring_cells, share_verification,
+)
+from ..models import FireIncident, IncidentCluster, IncidentMedia
+from ..views import cluster_list, incident_reject, incident_verify, _analyze_incident, voice_analyzer
+
+# Kejetia market, Kumasi
+LATITUDE, LONGITUDE = 6.6885, -1.6244
+
+def offset(meters_north, meters_east, latitude=LATITUDE, longitude=LONGITUDE):
+    return (latitude + meters_north / METERS_PER_DEGREE,
+            longitude + meters_east / (METERS_PER_DEGREE * math.cos(math.radians(latitude))))
+
+class GridTests(SimpleTestCase):
+    def test_neighbouring_cells_cover_the_radius(self):
+        rng = np.random.default_rng(0)
+        for latitude in (0.0, 6.7, -33.9, 59.9, 78.2):
+            for _ in range(200):
+                bearing, meters = rng.uniform(0, 2 * math.pi), rng.uniform(0, 300)
+                longitude = rng.uniform(-179, 179)
+                other = offset(meters * math.cos(bearing), meters * math.sin(bearing), latitude, longitude)
+                if distance(latitude, longitude, *other) > 300:
+                    continue
+                self.assertIn(cell_key(*grid_cell(*other, 300)), neighbouring_cells(latitude, longitude, 300))
+
+@override_settings(INCIDENT_CLUSTER_RADIUS=300, INCIDENT_CLUSTER_WINDOW=1800)
+class ClusteringTests(TestCase):
+    def report(self, meters_north=0, meters_east=0, minutes_ago=0):
+        latitude, longitude = offset(meters_north, meters_east)
+        incident = FireIncident.objects.create(latitude=latitude, longitude=longitude, description='Smoke')
+        if minutes_ago:
+            FireIncident.objects.filter(pk=incident.pk).update(
+                reported_at=timezone.now() - timedelta(minutes=minutes_ago),
+            )
+            incident.refresh_from_db()
+        assign_cluster(incident)
+        return incident
+
+    def test_nearby_reports_join_one_cluster(self):
+        first = self.report(minutes_ago=20)
+        second = self.report(meters_north=150)
+        third = self.report(meters_east=-200)
+        self.assertEqual(first.cluster_id, second.cluster_id)
+        self.assertEqual(first.cluster_id, third.cluster_id)
+
+        cluster = IncidentCluster.objects.get()
+        self.assertEqual((cluster.size, cluster.lead_id), (3, first.pk))
+        self.assertLess(distance(cluster.latitude, cluster.longitude, LATITUDE, LONGITUDE), 100)
+
+    def test_distant_or_late_reports_start_new_clusters(self):
+        old = self.report(minutes_ago=90)
+        recent = self.report(meters_north=50)
+        far = self.report(meters_east=2000)
+        self.assertEqual(len({old.cluster_id, recent.cluster_id, far.cluster_id}), 3)
+
+    def test_duplicates_take_the_clusters_analysis(self):
+        lead = self.report(minutes_ago=5)
+        FireIncident.objects.filter(pk=lead.pk).update(ai_confidence_score=88.0, status='VERIFIED',
+                                                         verified_at=timezone.now())
+        duplicate = self.report(meters_north=40)
+        with mock.patch('firemateApp.views.analyze_image') as analyze_image:
+            _analyze_incident(duplicate)
+        analyze_image.assert_not_called()
+        duplicate.refresh_from_db()
+        self.assertEqual((duplicate.ai_confidence_score, duplicate.status), (88.0, 'VERIFIED'))
+
+    def test_verification_covers_the_cluster(self):
+        lead = self.report(minutes_ago=5)
+        duplicate = self.report(meters_north=40)
+        dispatched = self.report(meters_east=40)
+        FireIncident.objects.filter(pk=dispatched.pk).update(status='IN_PROGRESS')
+
+        lead.status, lead.verified_at = 'VERIFIED', timezone.now()
+        lead.save()
+        self.assertEqual([member.pk for member in share_verification(lead)], [duplicate.pk])
+        self.assertEqual(
+            dict(FireIncident.objects.values_list('pk', 'status')),
+            {lead.pk: 'VERIFIED', duplicate.pk: 'VERIFIED', dispatched.pk: 'IN_PROGRESS'},
+        )
+
+    @override_settings(VOICE_FEATURES_SPOT_CHECK_RATE=0)
+    def test_admin_decisions_survive_shared_results(self):
+        User = get_user_model()
+        admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        lead = self.report(minutes_ago=5)
+        rejected = self.report(meters_north=40)
+        duplicate = self.report(meters_east=40)
+        request = APIRequestFactory().post('/')
+        force_authenticate(request, user=admin)
+        self.assertEqual(incident_reject(request, pk=rejected.pk).status_code, 200)
+
+        # A confident analysis of another report of the event
+        IncidentMedia.objects.create(incident=lead, media_type='IMAGE', file='incident_media/fire.jpg')
+        IncidentMedia.objects.create(incident=lead, media_type='AUDIO', file='incident_media/call.wav',
+                                     voice_features={'duration': 12.0})
+        with mock.patch('firemateApp.views.load_analysis_input', return_value=np.zeros((224, 224, 3), np.uint8)), \
+                mock.patch('firemateApp.views.analyze_image', return_value=(100.0, 'Success')), \
+                mock.patch.object(voice_analyzer, 'score_features', return_value=(100.0, {})):
+            _analyze_incident(lead)
+        self.assertEqual(
+            dict(FireIncident.objects.values_list('pk', 'status')),
+            {lead.pk: 'VERIFIED', rejected.pk: 'REJECTED', duplicate.pk: 'VERIFIED'},
+        )
+        self.assertEqual(FireIncident.objects.get(pk=rejected.pk).ai_confidence_score, 100.0)
+
+        # Nor does an admin verifying the event overturn it
+        self.assertEqual(incident_verify(request, pk=lead.pk).status_code, 200)
+        self.assertEqual(FireIncident.objects.get(pk=rejected.pk).status, 'REJECTED')
+
+    def test_cluster_list(self):
+        User = get_user_model()
+        admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        lead = self.report(minutes_ago=5)
+        duplicate = self.report(meters_north=40)
+        rejected = self.report(meters_east=5000)
+        FireIncident.objects.filter(pk=rejected.pk).update(status='REJECTED')
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=admin)
+        response = cluster_list(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(cluster['lead'], sorted(cluster['incidents'])) for cluster in response.data],
+                         [(lead.pk, [lead.pk, duplicate.pk])])
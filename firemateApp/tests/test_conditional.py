@@ -0,0 +1,146 @@
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..models import Ambucycle, FireIncident, IncidentMedia
+from ..positions import position_store
+from ..serializers import FireIncidentSerializer
+from ..views import incident_detail, incident_list, ambucycle_detail
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.other_reporter = User.objects.create_user(username='other', password='testpass123', role='REPORTER')
+
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter,
+            latitude=6.6885,
+            longitude=-1.6244,
+            description="Smoke and flames spotted at market square",
+            status='PENDING',
+        )
+        self.factory = APIRequestFactory()
+
+        # Write through so no background flusher runs during the test
+        patcher = mock.patch.object(position_store, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        position_store.clear()
+
+    def get(self, view, user, etag=None, query=None, **kwargs):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = self.factory.get('/', query, **headers)
+        force_authenticate(request, user=user)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_incident_detail_not_modified(self):
+        """Test repeated incident_detail polls return 304 without serializing"""
+        first = self.get(incident_detail, self.admin, pk=self.incident.pk)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        with mock.patch.object(FireIncidentSerializer, 'to_representation') as to_representation:
+            second = self.get(incident_detail, self.admin, etag=first['ETag'], pk=self.incident.pk)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+        to_representation.assert_not_called()
+
+    def test_incident_detail_changes_etag(self):
+        """Test status changes and new media produce a new ETag"""
+        etag = self.get(incident_detail, self.admin, pk=self.incident.pk)['ETag']
+
+        self.incident.status = 'VERIFIED'
+        self.incident.save()
+        response = self.get(incident_detail, self.admin, etag=etag, pk=self.incident.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        IncidentMedia.objects.create(incident=self.incident, media_type='IMAGE', file_url='https://example.com/fire.jpg')
+        response = self.get(incident_detail, self.admin, etag=etag, pk=self.incident.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unauthorized_user_does_not_get_304(self):
+        """Test a matching ETag never bypasses the permission check"""
+        etag = self.get(incident_detail, self.admin, pk=self.incident.pk)['ETag']
+        response = self.get(incident_detail, self.other_reporter, etag=etag, pk=self.incident.pk)
+        self.assertEqual(response.status_code, 403)
+
+    def test_incident_list_etag_is_per_user(self):
+        """Test incident_list ETags differ between users and track new incidents"""
+        admin_etag = self.get(incident_list, self.admin)['ETag']
+        reporter_etag = self.get(incident_list, self.reporter)['ETag']
+        self.assertNotEqual(admin_etag, reporter_etag)
+
+        self.assertEqual(self.get(incident_list, self.admin, etag=admin_etag).status_code, 304)
+
+        FireIncident.objects.create(
+            reporter=self.other_reporter,
+            latitude=6.6745,
+            longitude=-1.5716,
+            description="Gas cylinder explosion behind hostel",
+        )
+        self.assertEqual(self.get(incident_list, self.admin, etag=admin_etag).status_code, 200)
+        self.assertEqual(self.get(incident_list, self.reporter, etag=reporter_etag).status_code, 304)
+
+    def test_incident_list_tracks_nested_deletions(self):
+        """Test deleting an ambucycle nested in the list changes its ETag though no incident was saved"""
+        # A newer ambucycle and operator on another incident keep the list's timestamps where they are
+        User = get_user_model()
+        newer_operator = User.objects.create_user(username='newer', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        newer = Ambucycle.objects.create(vehicle_number='AMB-002', operator=newer_operator)
+        FireIncident.objects.create(reporter=self.reporter, latitude=6.69, longitude=-1.62, description='Smoke',
+                                    assigned_ambucycle=newer)
+        self.incident.assigned_ambucycle = self.ambucycle
+        self.incident.save()
+        etag = self.get(incident_list, self.admin)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ambucycle.delete()
+        self.assertEqual(FireIncident.objects.get(pk=self.incident.pk).updated_at, self.incident.updated_at)
+        response = self.get(incident_list, self.admin, etag=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_ambucycle_detail_tracks_position(self):
+        """Test ambucycle_detail revalidates once the vehicle moves"""
+        etag = self.get(ambucycle_detail, self.operator, pk=self.ambucycle.pk)['ETag']
+        self.assertEqual(self.get(ambucycle_detail, self.operator, etag=etag, pk=self.ambucycle.pk).status_code, 304)
+
+        position_store.update(self.ambucycle.pk, 6.70, -1.61)
+        self.assertEqual(self.get(ambucycle_detail, self.operator, etag=etag, pk=self.ambucycle.pk).status_code, 200)
+
+    def test_field_selection_changes_etag(self):
+        """Test each ?fields= selection is its own representation, whatever order it is listed in"""
+        for name, view, kwargs in (('incident_detail', incident_detail, {'pk': self.incident.pk}),
+                                   ('incident_list', incident_list, {}),
+                                   ('ambucycle_detail', ambucycle_detail, {'pk': self.ambucycle.pk})):
+            user = self.operator if view is ambucycle_detail else self.admin
+            with self.subTest(view=name):
+                full = self.get(view, user, **kwargs)['ETag']
+                narrow = self.get(view, user, query={'fields': 'id,current_latitude' if view is ambucycle_detail
+                                                     else 'id,status'}, **kwargs)
+                self.assertEqual(narrow.status_code, 200)
+                self.assertNotEqual(narrow['ETag'], full)
+                response = self.get(view, user, etag=full, query={'fields': 'id'}, **kwargs)
+                self.assertEqual(response.status_code, 200)
+
+        etag = self.get(incident_detail, self.admin, query={'fields': 'id,status'}, pk=self.incident.pk)['ETag']
+        response = self.get(incident_detail, self.admin, etag=etag, query={'fields': 'status,id'}, pk=self.incident.pk)
+        self.assertEqual(response.status_code, 304)
+
+    def test_varies_on_negotiated_representation(self):
+        """Test responses name every request header their ETag depends on"""
+        response = self.get(incident_detail, self.admin, pk=self.incident.pk)
+        vary = {header.strip() for header in response['Vary'].split(',')}
+        self.assertTrue({'Authorization', 'Accept', 'Accept-Encoding'} <= vary)
+
+    def tearDown(self):
+        position_store.clear()
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from django.test import SimpleTestCase
+from ..events import Event, EventHub, incident_status_event, stream_events
+
+def incident(status, reporter_id=7):
+    return SimpleNamespace(id=1, status=status, ai_confidence_score=None, reporter_id=reporter_id)
+
+def payload(event):
+    return json.loads(event.encoded.decode().split('data: ', 1)[1])
+
+class EventHubTests(SimpleTestCase):
+    async def drain(self, subscriber):
+        # Deliveries are scheduled with call_soon_threadsafe; let them run
+        await asyncio.sleep(0)
+        events = []
+        while not subscriber.queue.empty():
+            events.append(subscriber.queue.get_nowait())
+        return events
+
+    async def test_publish_reaches_subscribers(self):
+        """Test published events are handed to subscribers, from any thread, as encoded SSE frames"""
+        hub = EventHub(max_queue=10)
+        subscriber = hub.subscribe(1, 'ADMIN')
+        event = Event('incident.status', {'id': 1}, roles={'ADMIN'})
+        self.assertEqual(hub.publish(event), 1)
+        self.assertEqual(await self.drain(subscriber), [event])
+        self.assertEqual(event.encoded, f'id: {event.id}\nevent: incident.status\ndata: {{"id":1}}\n\n'.encode())
+
+        thread = threading.Thread(target=hub.publish, args=(Event('ambucycle.position', {'id': 2}, roles={'ADMIN'}),))
+        thread.start()
+        thread.join()
+        received = await asyncio.wait_for(subscriber.queue.get(), timeout=1)
+        self.assertEqual(received.type, 'ambucycle.position')
+
+        hub.unsubscribe(subscriber)
+        self.assertEqual(hub.publish(event), 0)
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_delivery_filtered_by_role_and_user(self):
+        """Test incident events reach admins, the reporter, and operators only while the incident is active to them"""
+        hub = EventHub(max_queue=10)
+        admin = hub.subscribe(1, 'ADMIN')
+        operator = hub.subscribe(2, 'AMBUCYCLE_OPERATOR')
+        reporter = hub.subscribe(7, 'REPORTER')
+        other = hub.subscribe(8, 'REPORTER')
+
+        for status, previous, operators_told in (
+            ('PENDING', None, False),
+            ('VERIFIED', 'PENDING', True),
+            ('RESOLVED', 'IN_PROGRESS', True),
+            ('REJECTED', 'PENDING', False),
+        ):
+            with self.subTest(status=status, previous=previous):
+                hub.publish(incident_status_event(incident(status), previous))
+                self.assertEqual(len(await self.drain(admin)), 1)
+                self.assertEqual(len(await self.drain(reporter)), 1)
+                self.assertEqual(len(await self.drain(operator)), int(operators_told))
+                self.assertEqual(await self.drain(other), [])
+
+    async def test_overflow_replaced_by_resync(self):
+        """Test a full queue drops its backlog for one resync event and keeps delivering after it"""
+        hub = EventHub(max_queue=3)
+        subscriber = hub.subscribe(1, 'ADMIN')
+        for i in range(5):
+            hub.publish(Event('ambucycle.position', {'id': i}, roles={'ADMIN'}))
+        events = await self.drain(subscriber)
+        self.assertEqual([event.type for event in events], ['resync', 'ambucycle.position'])
+        self.assertEqual(payload(events[0]), {'dropped': 4})
+        self.assertEqual(payload(events[1]), {'id': 4})
+
+    def test_subscribers_of_closed_loops_dropped(self):
+        """Test publishing forgets subscribers whose event loop has shut down"""
+        hub = EventHub(max_queue=10)
+
+        async def connect():
+            hub.subscribe(1, 'ADMIN')
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(connect())
+        loop.close()
+        self.assertEqual(hub.publish(Event('resync', {}, roles={'ADMIN'})), 1)
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_stream_events(self):
+        """Test the SSE stream sends the retry hint, keepalives and events, and unsubscribes when closed"""
+        hub = EventHub(max_queue=10)
+        stream = stream_events(hub, 7, 'REPORTER', keepalive=0.05)
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+        self.assertEqual(hub.subscriber_count(), 1)
+        self.assertEqual(await stream.__anext__(), b': keepalive\n\n')
+
+        hidden = Event('ambucycle.position', {'id': 2}, roles={'ADMIN'})
+        shown = incident_status_event(incident('PENDING'), None)
+        hub.publish(hidden)
+        hub.publish(shown)
+        self.assertEqual(await asyncio.wait_for(stream.__anext__(), timeout=1), shown.encoded)
+
+        await stream.aclose()
+        self.assertEqual(hub.subscriber_count(), 0)
@@ -0,0 +1,88 @@
+import json
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..models import Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+from ..serializers import (
+    FireIncidentSerializer, IncidentResponseSerializer,
+    fast_incident_serializer, fast_response_serializer
+)
+from ..views import incident_list, response_list
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.unassigned_ambucycle = Ambucycle.objects.create(vehicle_number='AMB-002')
+
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter,
+            latitude=6.6885,
+            longitude=-1.6244,
+            description="Smoke and flames spotted at market square",
+            status='IN_PROGRESS',
+            voice_analysis_details={'stress_level': 'high', 'features': [0.4, 0.7]},
+            assigned_ambucycle=self.ambucycle,
+        )
+        self.anonymous_incident = FireIncident.objects.create(
+            reporter=None,
+            latitude=6.6745,
+            longitude=-1.5716,
+            description="Gas cylinder explosion behind hostel",
+        )
+        IncidentMedia.objects.create(incident=self.incident, media_type='IMAGE', file_url='https://example.com/fire.jpg')
+        IncidentMedia.objects.create(incident=self.incident, media_type='AUDIO', file_url='https://example.com/call.wav')
+
+        IncidentResponse.objects.create(
+            incident=self.incident,
+            ambucycle=self.ambucycle,
+            route_data={'points': [[6.6885, -1.6244], [6.6901, -1.6203]]},
+        )
+        IncidentResponse.objects.create(incident=self.anonymous_incident, ambucycle=self.unassigned_ambucycle)
+        self.factory = APIRequestFactory()
+
+    def rendered(self, data):
+        return json.loads(JSONRenderer().render(data))
+
+    def test_incidents_match_model_serializer(self):
+        """Test the values() path matches FireIncidentSerializer field for field"""
+        incidents = FireIncident.objects.order_by('id')
+        expected = self.rendered(FireIncidentSerializer(incidents, many=True).data)
+        actual = self.rendered(fast_incident_serializer.serialize(incidents))
+        self.assertEqual(actual, expected)
+        self.assertEqual([list(row) for row in actual], [list(row) for row in expected])
+
+    def test_responses_match_model_serializer(self):
+        """Test the values() path matches IncidentResponseSerializer including nested incidents"""
+        responses = IncidentResponse.objects.order_by('id')
+        expected = self.rendered(IncidentResponseSerializer(responses, many=True).data)
+        actual = self.rendered(fast_response_serializer.serialize(responses))
+        self.assertEqual(actual, expected)
+
+    def test_query_count_is_constant(self):
+        """Test nested media costs one extra query regardless of row count"""
+        with self.assertNumQueries(2):
+            fast_incident_serializer.serialize(FireIncident.objects.all())
+        with self.assertNumQueries(2):
+            fast_response_serializer.serialize(IncidentResponse.objects.all())
+
+    def test_list_views_use_fast_path(self):
+        """Test incident_list and response_list return the serializer output"""
+        for view, serializer_class, queryset in (
+            (incident_list, FireIncidentSerializer, FireIncident.objects.all()),
+            (response_list, IncidentResponseSerializer, IncidentResponse.objects.all()),
+        ):
+            request = self.factory.get('/')
+            force_authenticate(request, user=self.admin)
+            response = view(request)
+            response.render()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                json.loads(response.content),
+                self.rendered(serializer_class(queryset, many=True).data),
+            )
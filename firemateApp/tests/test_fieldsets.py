@@ -0,0 +1,98 @@
+import json
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..middleware import CompressionMiddleware
+from ..models import Ambucycle, FireIncident, IncidentMedia
+from ..serializers import fast_incident_serializer
+from ..views import incident_list, incident_detail, ambucycle_list
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter,
+            latitude=6.6885,
+            longitude=-1.6244,
+            description="Smoke and flames spotted at market square",
+            status='VERIFIED',
+            assigned_ambucycle=self.ambucycle,
+        )
+        IncidentMedia.objects.create(incident=self.incident, media_type='IMAGE', file_url='https://example.com/fire.jpg')
+        self.factory = APIRequestFactory()
+
+    def get(self, view, user, query='', **kwargs):
+        request = self.factory.get(f'/{query}')
+        force_authenticate(request, user=user)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    def test_fields_restricts_payload(self):
+        """Test ?fields= returns only the requested fields"""
+        response = self.get(incident_list, self.admin, '?fields=id,status,latitude,longitude')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), [{
+            'id': self.incident.id,
+            'latitude': 6.6885,
+            'longitude': -1.6244,
+            'status': 'VERIFIED',
+        }])
+
+    def test_unrequested_relations_not_queried(self):
+        """Test skipped nested fields cost no related-object queries"""
+        with self.assertNumQueries(1):
+            fast_incident_serializer.serialize(FireIncident.objects.all(), ['id', 'status'])
+        with self.assertNumQueries(2):
+            fast_incident_serializer.serialize(FireIncident.objects.all(), ['id', 'media'])
+
+    def test_expand_adds_nested_fields(self):
+        """Test ?expand= adds nested representations to the flat fields"""
+        response = self.get(incident_detail, self.admin, '?expand=media', pk=self.incident.pk)
+        data = json.loads(response.content)
+        self.assertIn('media', data)
+        self.assertIn('description', data)
+        self.assertNotIn('reporter_details', data)
+        self.assertNotIn('assigned_ambucycle_details', data)
+
+    def test_default_is_full_representation(self):
+        """Test requests without fieldset parameters are unchanged"""
+        data = json.loads(self.get(ambucycle_list, self.admin).content)
+        self.assertIn('operator_details', data[0])
+
+        data = json.loads(self.get(ambucycle_list, self.admin, '?expand=').content)
+        self.assertNotIn('operator_details', data[0])
+
+    def test_unknown_field_rejected(self):
+        """Test unknown fields are rejected with 400"""
+        response = self.get(incident_list, self.admin, '?fields=id,password')
+        self.assertEqual(response.status_code, 400)
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept_encoding):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip_negotiated(self):
+        """Test JSON responses are compressed for clients accepting gzip"""
+        body = json.dumps([{'id': i, 'status': 'VERIFIED'} for i in range(100)]).encode()
+        response = self.process(HttpResponse(body, content_type='application/json'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.content), len(body))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_event_stream_not_compressed(self):
+        """Test event streams pass through uncompressed"""
+        stream = StreamingHttpResponse(iter([b'data: {}\n\n'] * 100), content_type='text/event-stream')
+        response = self.process(stream, 'gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
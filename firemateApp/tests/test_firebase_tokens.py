@@ -0,0 +1,108 @@
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+from ..firebase_tokens import GoogleCertSource, StaticCertSource, TokenVerifier, VerifiedTokenCache
+
+PROJECT_ID = 'firemate-test'
+
+def make_key(key_id):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return crypt.RSASigner.from_string(private_pem, key_id=key_id), public_pem.decode()
+
+def make_token(signer, lifetime=3600, **claims):
+    now = int(time.time())
+    payload = {
+        'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+        'aud': PROJECT_ID,
+        'sub': 'firebase-uid-1',
+        'email': 'reporter@firemate.test',
+        'iat': now,
+        'exp': now + lifetime,
+    }
+    payload.update(claims)
+    return jwt.encode(signer, payload).decode()
+
+class FakeResponse:
+    def __init__(self, data, max_age=3600):
+        self.status = 200
+        self.data = data.encode()
+        self.headers = {'cache-control': f'public, max-age={max_age}'}
+
+class TokenVerifierTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signer, cls.public_pem = make_key('key-1')
+
+    def setUp(self):
+        self.cache = VerifiedTokenCache(max_entries=2, ttl=300)
+        self.verifier = TokenVerifier(PROJECT_ID, StaticCertSource({'key-1': self.public_pem}), cache=self.cache)
+
+    def test_valid_token_verified_once(self):
+        """Test repeated tokens are served from the cache without re-verifying"""
+        token = make_token(self.signer)
+        with mock.patch('firemateApp.firebase_tokens.jwt.decode', wraps=jwt.decode) as decode:
+            first = self.verifier.verify(token)
+            second = self.verifier.verify(token)
+        self.assertEqual(first['uid'], 'firebase-uid-1')
+        self.assertEqual(second, first)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 1})
+
+    def test_cache_capped_at_token_expiry(self):
+        """Test cached tokens stop being accepted once they expire"""
+        token = make_token(self.signer, lifetime=60)
+        claims = self.verifier.verify(token)
+        with mock.patch('firemateApp.firebase_tokens.time.time', return_value=claims['exp'] + 1):
+            self.assertIsNone(self.cache.get(token))
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used token is evicted past max_entries"""
+        tokens = [make_token(self.signer, sub=f'uid-{i}') for i in range(3)]
+        for token in tokens:
+            self.verifier.verify(token)
+        self.assertIsNone(self.cache.get(tokens[0]))
+        self.assertIsNotNone(self.cache.get(tokens[2]))
+
+    def test_invalid_tokens_rejected(self):
+        """Test wrong issuer, wrong audience, expired and foreign-key tokens are rejected"""
+        other_signer, _ = make_key('key-1')
+        for token in (
+            make_token(self.signer, iss='https://securetoken.google.com/other-project'),
+            make_token(self.signer, aud='other-project'),
+            make_token(self.signer, lifetime=-60, iat=int(time.time()) - 120),
+            make_token(other_signer),
+        ):
+            with self.assertRaises(ValueError):
+                self.verifier.verify(token)
+        self.assertEqual(len(self.cache._entries), 0)
+
+    def test_unknown_key_refreshes_certs(self):
+        """Test a token signed with a rotated key triggers one cert refresh"""
+        new_signer, new_pem = make_key('key-2')
+        source = StaticCertSource({'key-1': self.public_pem})
+        source.refresh = mock.Mock(return_value={'key-1': self.public_pem, 'key-2': new_pem})
+        verifier = TokenVerifier(PROJECT_ID, source)
+        self.assertEqual(verifier.verify(make_token(new_signer))['uid'], 'firebase-uid-1')
+        source.refresh.assert_called_once()
+
+class GoogleCertSourceTests(SimpleTestCase):
+    def test_certs_fetched_once_and_refresh_rate_limited(self):
+        """Test certs are fetched once and forced refreshes are rate limited"""
+        request = mock.Mock(return_value=FakeResponse('{"key-1": "pem"}'))
+        source = GoogleCertSource(request=request, retry_interval=60)
+        with mock.patch.object(source, '_ensure_refresher'):
+            self.assertEqual(source.get_certs(), {'key-1': 'pem'})
+            source.get_certs()
+            source.refresh()
+        self.assertEqual(request.call_count, 1)
+        self.assertGreater(source._expires_at, time.time() + 3000)
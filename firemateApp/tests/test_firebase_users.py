@@ -0,0 +1,82 @@
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..firebase_users import firebase_users
+from ..models import FirebaseIdentity
+
+User = get_user_model()
+
+def claims(uid, email, email_verified=True):
+    return {'uid': uid, 'sub': uid, 'email': email, 'email_verified': email_verified}
+
+class FirebaseUserResolverTests(TestCase):
+    def setUp(self):
+        firebase_users.clear()
+        self.addCleanup(firebase_users.clear)
+
+    def test_new_uid_creates_user_once(self):
+        """Test the first request creates the user and later ones reuse it"""
+        user = firebase_users.resolve(claims('uid-new', 'new@firemate.test'))
+        self.assertEqual(user.email, 'new@firemate.test')
+        self.assertEqual(user.firebase_identity.firebase_uid, 'uid-new')
+
+        with self.assertNumQueries(0):
+            again = firebase_users.resolve(claims('uid-new', 'new@firemate.test'))
+        self.assertEqual(again.pk, user.pk)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_saved_user_reloaded(self):
+        """Test a saved user's cached row is dropped, and callers never share the cached instance"""
+        user = firebase_users.resolve(claims('uid-role', 'role@firemate.test'))
+        first = firebase_users.resolve(claims('uid-role', 'role@firemate.test'))
+        first.role = 'ADMIN'
+        self.assertNotEqual(firebase_users.resolve(claims('uid-role', 'role@firemate.test')).role, 'ADMIN')
+
+        user.role = 'AMBUCYCLE_OPERATOR'
+        user.save()
+        with self.assertNumQueries(1):
+            reloaded = firebase_users.resolve(claims('uid-role', 'role@firemate.test'))
+        self.assertEqual(reloaded.role, 'AMBUCYCLE_OPERATOR')
+
+    def test_existing_account_linked_by_verified_email(self):
+        """Test accounts created before UIDs were stored are linked, not duplicated"""
+        existing = User.objects.create_user(username='reporter', email='Reporter@firemate.test', role='REPORTER')
+        user = firebase_users.resolve(claims('uid-reporter', 'reporter@firemate.test'))
+        self.assertEqual(user.pk, existing.pk)
+        self.assertTrue(FirebaseIdentity.objects.filter(user=existing, firebase_uid='uid-reporter').exists())
+
+    def test_unverified_email_not_linked(self):
+        """Test an unverified email never grants access to an existing account"""
+        existing = User.objects.create_user(username='admin', email='admin@firemate.test', role='ADMIN')
+        user = firebase_users.resolve(claims('uid-attacker', 'admin@firemate.test', email_verified=False))
+        self.assertNotEqual(user.pk, existing.pk)
+
+    def test_email_change_keeps_identity(self):
+        """Test a changed email still resolves to the same user"""
+        user = firebase_users.resolve(claims('uid-stable', 'old@firemate.test'))
+        firebase_users.clear()
+        self.assertEqual(firebase_users.resolve(claims('uid-stable', 'new@firemate.test')).pk, user.pk)
+
+    def test_concurrent_creation_reads_winner(self):
+        """Test losing a creation race returns the identity created by the winner"""
+        winner = User.objects.create_user(username='winner', email='race@firemate.test')
+        FirebaseIdentity.objects.create(user=winner, firebase_uid='uid-race')
+        select_related = FirebaseIdentity.objects.select_related
+        not_yet_visible = mock.Mock()
+        not_yet_visible.filter.return_value.first.return_value = None
+
+        # The first lookup runs before the winner commits
+        with mock.patch.object(
+            FirebaseIdentity.objects, 'select_related',
+            side_effect=[not_yet_visible, select_related('user')],
+        ):
+            user = firebase_users.resolve(claims('uid-race', 'race@firemate.test', email_verified=False))
+        self.assertEqual(user.pk, winner.pk)
+        self.assertFalse(User.objects.filter(username='uid-race').exists())
+
+    def test_deleted_user_evicted(self):
+        """Test deleting a user drops its cached mapping"""
+        user = firebase_users.resolve(claims('uid-gone', 'gone@firemate.test'))
+        user.delete()
+        replacement = firebase_users.resolve(claims('uid-gone', 'gone@firemate.test'))
+        self.assertNotEqual(replacement.pk, user.pk)
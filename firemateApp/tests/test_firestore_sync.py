@@ -0,0 +1,137 @@
+import sys
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ..firestore_sync import FirestoreSync
+from ..models import Ambucycle, FireIncident, FirestoreDocument, IncidentResponse
+
+sys.path.insert(0, str(settings.BASE_DIR / 'Firebase'))
+
+from firestore_fake import FakeFirestore  # noqa: E402
+
+User = get_user_model()
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class FirestoreSyncTests(TestCase):
+    def setUp(self):
+        self.db = FakeFirestore()
+        self.sync = FirestoreSync(self.db, batch_size=50)
+        self.reporter = User.objects.create_user(username='reporter', email='reporter@firemate.test', role='REPORTER')
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001')
+
+    def incident(self, **kwargs):
+        return FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.69, longitude=-1.62, description='Smoke at Kejetia', **kwargs
+        )
+
+    def document(self, collection, object_id):
+        link = FirestoreDocument.objects.get(collection=collection, object_id=object_id)
+        return self.db.collections[collection][link.document_id]
+
+    def remote(self, collection, document_id, **fields):
+        fields.setdefault('updated_at', timezone.now())
+        self.db.collection(collection).document(document_id).set(fields, merge=True)
+
+    def test_push_sends_only_changes(self):
+        """Test rows are pushed in batches and unchanged rows are not sent again"""
+        incidents = [self.incident() for _ in range(120)]
+        stats = self.sync.sync_once(pull=False)
+        self.assertEqual(stats['emergencies']['pushed'], 120)
+        self.assertEqual(stats['emergencies']['push_lag'], 0)
+        doc = self.document('emergencies', incidents[0].pk)
+        self.assertEqual(doc['reporter_email'], 'reporter@firemate.test')
+        self.assertEqual(doc['status'], 'pending')
+
+        incidents[5].status = 'VERIFIED'
+        incidents[5].save()
+        commits = self.db.commits
+        stats = self.sync.sync_once(pull=False)
+        self.assertEqual(stats['emergencies']['pushed'], 1)
+        self.assertEqual(self.db.commits, commits + 1)
+        self.assertEqual(self.document('emergencies', incidents[5].pk)['status'], 'verified')
+
+    def test_pull_creates_rows_without_echo(self):
+        """Test remote documents become rows, and are not written back by the next push"""
+        self.remote('emergencies', 'remote-1', description='Gas explosion', latitude=6.67, longitude=-1.57,
+                    status='verified', reporter_email='reporter@firemate.test')
+        self.remote('responses', 'remote-r1', emergency_id='remote-1', vehicle_number='AMB-001')
+        stats = self.sync.sync_once()
+
+        incident = FireIncident.objects.get(description='Gas explosion')
+        self.assertEqual(incident.status, 'PENDING')
+        self.assertEqual(incident.reporter_id, self.reporter.pk)
+        self.assertTrue(IncidentResponse.objects.filter(incident=incident, ambucycle=self.ambucycle).exists())
+        self.assertEqual(stats['emergencies']['pulled'], 1)
+        self.assertEqual(stats['emergencies']['pushed'], 0)
+        self.assertEqual(stats['responses']['pushed'], 0)
+
+        # Nothing new on either side
+        stats = self.sync.sync_once()
+        self.assertEqual(stats['emergencies']['pulled'] + stats['emergencies']['pushed'], 0)
+
+    def test_conflicts_resolved_by_timestamp(self):
+        """Test whichever side changed last wins"""
+        incident = self.incident()
+        self.sync.sync_once()
+        document_id = FirestoreDocument.objects.get(collection='emergencies', object_id=incident.pk).document_id
+
+        # A remote change older than the local one loses
+        incident.description = 'Local edit'
+        incident.save()
+        self.remote('emergencies', document_id, description='Stale remote edit',
+                    updated_at=incident.updated_at - timedelta(seconds=5))
+        self.sync.sync_once()
+        incident.refresh_from_db()
+        self.assertEqual(incident.description, 'Local edit')
+        self.assertEqual(self.db.collections['emergencies'][document_id]['description'], 'Local edit')
+
+        # A newer remote change wins
+        self.remote('emergencies', document_id, description='Remote edit',
+                    updated_at=timezone.now() + timedelta(seconds=5))
+        self.sync.sync_once()
+        incident.refresh_from_db()
+        self.assertEqual(incident.description, 'Remote edit')
+
+    def test_deletes_travel_as_tombstones(self):
+        """Test local deletes push tombstones and remote tombstones delete rows"""
+        kept, removed = self.incident(), self.incident()
+        self.sync.sync_once()
+        removed_id = FirestoreDocument.objects.get(collection='emergencies', object_id=removed.pk).document_id
+        removed.delete()
+        self.sync.sync_once()
+        self.assertTrue(self.db.collections['emergencies'][removed_id]['deleted'])
+
+        kept_id = FirestoreDocument.objects.get(collection='emergencies', object_id=kept.pk).document_id
+        self.remote('emergencies', kept_id, deleted=True, updated_at=timezone.now() + timedelta(seconds=5))
+        self.sync.sync_once()
+        self.assertFalse(FireIncident.objects.filter(pk=kept.pk).exists())
+
+    def test_pulled_incidents_never_change_status(self):
+        """Test a document cannot verify, reject or resolve an incident"""
+        incident = self.incident()
+        self.sync.sync_once()
+        document_id = FirestoreDocument.objects.get(collection='emergencies', object_id=incident.pk).document_id
+        self.remote('emergencies', document_id, description='Remote edit', status='verified',
+                    verified_at=timezone.now(), updated_at=timezone.now() + timedelta(seconds=5))
+        self.sync.sync_once()
+
+        incident.refresh_from_db()
+        self.assertEqual((incident.description, incident.status, incident.verified_at),
+                         ('Remote edit', 'PENDING', None))
+
+    def test_pulled_users_never_gain_roles(self):
+        """Test a user document cannot grant a role or change an existing one"""
+        self.sync.sync_once()
+        document_id = FirestoreDocument.objects.get(collection='users', object_id=self.reporter.pk).document_id
+        self.remote('users', document_id, role='admin', full_name='Bonse Nzakame',
+                    updated_at=timezone.now() + timedelta(seconds=5))
+        self.remote('users', 'firebase-uid-1', email='new@firemate.test', role='admin')
+        self.sync.sync_once()
+
+        self.reporter.refresh_from_db()
+        self.assertEqual((self.reporter.role, self.reporter.first_name), ('REPORTER', 'Bonse'))
+        created = User.objects.get(username='firebase-uid-1')
+        self.assertEqual(created.role, 'REPORTER')
+        self.assertFalse(created.has_usable_password())
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..models import FireIncident, IdempotencyKey, IncidentMedia
+from ..views import media_create
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 2048
+
+class IdempotencyTestMixin:
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = mock.patch('firemateApp.views._analyze_incident')
+        self.analyze = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.factory = APIRequestFactory()
+
+    def upload(self, key, content=PNG):
+        request = self.factory.post('/', {
+            'incident': self.incident.pk, 'media_type': 'IMAGE',
+            'file': SimpleUploadedFile('fire.png', content, content_type='image/png'),
+        }, format='multipart', headers={'Idempotency-Key': key})
+        force_authenticate(request, user=self.reporter)
+        response = media_create(request)
+        response.render()
+        return response
+
+class IdempotencyTests(IdempotencyTestMixin, TestCase):
+    def test_retries_replay_the_first_response(self):
+        first = self.upload('upload-1')
+        self.assertEqual(first.status_code, 201)
+        # More retries than the reporter's rate limit allows requests
+        retries = [self.upload('upload-1') for _ in range(6)]
+        self.assertEqual({(retry.status_code, retry.data['id']) for retry in retries}, {(201, first.data['id'])})
+        self.assertEqual(retries[0]['Idempotent-Replayed'], 'true')
+        self.assertEqual(IncidentMedia.objects.count(), 1)
+        self.analyze.assert_called_once()
+
+    def test_key_reused_for_another_request_is_refused(self):
+        self.assertEqual(self.upload('upload-1').status_code, 201)
+        self.assertEqual(self.upload('upload-1', content=PNG + b'\x01').status_code, 422)
+        self.assertEqual(self.upload('upload-2', content=PNG + b'\x01').status_code, 201)
+
+    @override_settings(IDEMPOTENCY_WAIT=0, IDEMPOTENCY_LOCK_TIMEOUT=120)
+    def test_keys_in_flight_conflict_until_their_request_is_presumed_dead(self):
+        self.upload('upload-1')
+        IdempotencyKey.objects.update(response_status=None, response_body=None)
+        response = self.upload('upload-1')
+        self.assertEqual((response.status_code, response['Retry-After']), (409, '1'))
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self.upload('upload-1').status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 201)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=3600)
+    def test_expired_keys_are_swept(self):
+        self.upload('upload-1')
+        self.upload('upload-2', content=PNG + b'\x01')
+        IdempotencyKey.objects.filter(key='upload-1').update(created_at=timezone.now() - timedelta(hours=2))
+        call_command('sweep_idempotency_keys', once=True, stdout=mock.Mock())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['upload-2'])
+
+class ConcurrentRetryTests(IdempotencyTestMixin, TransactionTestCase):
+    def test_concurrent_duplicates_create_once(self):
+        def slow_analysis(*args, **kwargs):
+            time.sleep(0.2)
+        self.analyze.side_effect = slow_analysis
+
+        def retry(_):
+            try:
+                return self.upload('upload-1')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(pool.map(retry, range(4)))
+        self.assertEqual({(response.status_code, response.data['id']) for response in responses},
+                         {(201, IncidentMedia.objects.get().pk)})
+        self.analyze.assert_called_once()
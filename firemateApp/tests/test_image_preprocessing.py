@@ -0,0 +1,49 @@
+import io
+import unittest
+import numpy as np
+from PIL import Image
+from ..image_preprocessing import decode_batch, model_input, open_image
+
+def photo(size=(1600, 1200), orientation=None):
+    buffer = io.BytesIO()
+    image = Image.new('RGB', size, color='red')
+    # Left half blue, so orientation is visible after decoding
+    image.paste((0, 0, 255), (0, 0, size[0] // 2, size[1]))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+class ImagePreprocessingTests(unittest.TestCase):
+    def test_jpeg_decoded_at_reduced_scale(self):
+        """Test a large JPEG is decoded at the smallest DCT scale covering the target"""
+        image = open_image(photo((4032, 3024)), (224, 224))
+        self.assertEqual(image.size, (504, 378))
+        self.assertEqual(image.mode, 'RGB')
+
+    def test_exif_orientation_applied(self):
+        """Test a photo taken rotated comes out upright"""
+        pixels = model_input(photo(orientation=6))
+        # Orientation 6 is a clockwise quarter turn: the blue left half ends up on top
+        self.assertGreater(pixels[10, 112, 2], 200)
+        self.assertGreater(pixels[-10, 112, 0], 200)
+
+    def test_writes_into_batch(self):
+        """Test pixels land in the given batch row as float32, and stored inputs are copied in"""
+        stored = model_input(photo())
+        batch = decode_batch([photo(), stored, Image.new('L', (300, 300), 128)])
+        self.assertEqual((batch.shape, batch.dtype), ((3, 224, 224, 3), np.float32))
+        np.testing.assert_array_equal(batch[0], stored)
+        np.testing.assert_array_equal(batch[1], stored)
+        self.assertTrue((batch[2] == 128).all())
+
+    def test_threads_match_sequential(self):
+        """Test decoding in a thread pool gives the same batch as one thread"""
+        photos = [photo(size, orientation) for size in ((1600, 1200), (900, 1600)) for orientation in (None, 3, 8)]
+        np.testing.assert_array_equal(decode_batch(photos, max_workers=4), decode_batch(photos, max_workers=1))
+
+    def test_undecodable_raises(self):
+        """Test bytes that are not an image raise OSError"""
+        with self.assertRaises(OSError):
+            model_input(b'not an image')
@@ -0,0 +1,107 @@
+import io
+import shutil
+import tempfile
+import wave
+from unittest import mock
+import numpy as np
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from ..image_preprocessing import model_input
+from ..media_derivatives import load_analysis_input, load_audio_input
+from ..media_ingest import ingest
+from ..models import FireIncident
+from ..serializers import IncidentMediaSerializer
+
+def photo(size=(1600, 1200), image_format='JPEG'):
+    buffer = io.BytesIO()
+    gradient = np.linspace(0, 255, size[0] * size[1] * 3, dtype=np.uint8).reshape(size[1], size[0], 3)
+    Image.fromarray(gradient).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+def voice_note(seconds=1.5, rate=44100, channels=2):
+    buffer = io.BytesIO()
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (np.sin(2 * np.pi * 220 * t) * 12000).astype('<i2')
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.repeat(tone, channels).tobytes())
+    return buffer.getvalue()
+
+class MediaDerivativeTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.incident = FireIncident.objects.create(latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia')
+
+    def test_analysis_input_matches_original(self):
+        """Test the stored model input equals preprocessing the original"""
+        content = photo()
+        media = ingest(SimpleUploadedFile('fire.jpg', content), self.incident)
+        array = load_analysis_input(media)
+        self.assertIsInstance(array, np.memmap)
+        self.assertEqual((array.shape, array.dtype), ((224, 224, 3), np.uint8))
+        np.testing.assert_array_equal(array, model_input(content))
+
+    def test_thumbnails_exposed(self):
+        """Test small and medium thumbnails exist in both formats and are listed by the serializer"""
+        media = ingest(SimpleUploadedFile('fire.png', photo(image_format='PNG')), self.incident)
+        thumbnails = IncidentMediaSerializer(media).data['thumbnails']
+        self.assertEqual(set(thumbnails), {'small', 'medium'})
+        for size, edge in (('small', 160), ('medium', 640)):
+            self.assertEqual(set(thumbnails[size]), {'webp', 'jpg'})
+            name = media.analysis_input.replace('analysis.npy', f'{size}.webp')
+            with default_storage.open(name) as stored:
+                self.assertEqual(max(Image.open(stored).size), edge)
+
+    def test_derivatives_shared_by_identical_uploads(self):
+        """Test re-uploading the same photo reuses its derivatives"""
+        content = photo()
+        first = ingest(SimpleUploadedFile('a.jpg', content), self.incident)
+        with mock.patch('firemateApp.media_derivatives._save_image') as save_image:
+            second = ingest(SimpleUploadedFile('b.jpg', content), self.incident)
+        save_image.assert_not_called()
+        self.assertEqual(first.analysis_input, second.analysis_input)
+        # Each media's thumbnails are served through its own access-checked URL
+        self.assertEqual(set(first.thumbnails), set(second.thumbnails))
+
+    def test_audio_transcoded_to_canonical_pcm(self):
+        """Test a stereo 44.1 kHz voice note is stored as mono 16 kHz PCM with its duration"""
+        media = ingest(SimpleUploadedFile('call.wav', voice_note()), self.incident)
+        self.assertAlmostEqual(media.duration, 1.5, places=2)
+        samples = load_audio_input(media)
+        self.assertIsInstance(samples, np.memmap)
+        self.assertEqual((samples.dtype, len(samples)), (np.dtype('<i2'), 24000))
+        # A 220 Hz tone at 16 kHz crosses zero 2 * 220 times a second
+        crossings = np.count_nonzero(np.diff(np.signbit(samples[:16000])))
+        self.assertAlmostEqual(crossings, 440, delta=2)
+        with default_storage.open(media.analysis_input) as stored, wave.open(stored) as wav:
+            self.assertEqual((wav.getnchannels(), wav.getframerate(), wav.getnframes()), (1, 16000, 24000))
+
+    def test_audio_derivative_shared_by_identical_uploads(self):
+        """Test re-uploading the same voice note reuses its transcode and duration"""
+        content = voice_note()
+        first = ingest(SimpleUploadedFile('a.wav', content), self.incident)
+        second = ingest(SimpleUploadedFile('b.wav', content), self.incident)
+        self.assertEqual(second.analysis_input, first.analysis_input)
+        self.assertEqual(second.duration, first.duration)
+        self.assertIsNone(load_analysis_input(second))
+
+    def test_undecodable_audio_has_no_derivative(self):
+        """Test audio that cannot be decoded is stored without a transcode"""
+        media = ingest(SimpleUploadedFile('call.wav', b'RIFF\x00\x00\x00\x00WAVEfmt ' + b'\x00' * 64), self.incident)
+        self.assertEqual(media.analysis_input, '')
+        self.assertIsNone(load_audio_input(media))
+
+    def test_video_has_no_derivatives(self):
+        """Test video uploads are stored without derivatives"""
+        media = ingest(SimpleUploadedFile('clip.mp4', b'\x00\x00\x00\x18ftypisom' + b'\x00' * 64), self.incident)
+        self.assertIsNone(media.thumbnails)
+        self.assertIsNone(media.duration)
+        self.assertIsNone(load_analysis_input(media))
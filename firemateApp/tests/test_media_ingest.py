@@ -0,0 +1,101 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..media_ingest import sniff
+from ..models import FireIncident, IncidentMedia
+from ..views import media_create
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 2048
+MP4 = b'\x00\x00\x00\x18ftypisom' + b'\x00' * 4096
+
+class MediaIngestTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_MAX_UPLOAD_SIZE=1024 * 1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # Analysis needs the AI models; ingestion is what is under test
+        patcher = mock.patch('firemateApp.views._analyze_incident')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.factory = APIRequestFactory()
+
+    def upload(self, content, name='upload.bin', **data):
+        request = self.factory.post('/', {
+            'incident': self.incident.pk,
+            'file': SimpleUploadedFile(name, content),
+            **data,
+        }, format='multipart')
+        force_authenticate(request, user=self.reporter)
+        response = media_create(request)
+        response.render()
+        return response
+
+    def test_sniff(self):
+        """Test types are detected from magic bytes, not names"""
+        self.assertEqual(sniff(PNG[:64]), ('IMAGE', 'image/png', 'png'))
+        self.assertEqual(sniff(MP4[:64]), ('VIDEO', 'video/mp4', 'mp4'))
+        self.assertEqual(sniff(b'RIFF\x00\x00\x00\x00WAVEfmt '), ('AUDIO', 'audio/wav', 'wav'))
+        self.assertEqual(sniff(b'\x00\x00\x00\x20ftypM4A '), ('AUDIO', 'audio/mp4', 'm4a'))
+        self.assertIsNone(sniff(b'<?php echo 1; ?>'))
+
+    def test_upload_stored_with_hash(self):
+        """Test an upload is stored under its hash with size and detected type"""
+        response = self.upload(MP4, name='fire.jpg', media_type='VIDEO')
+        self.assertEqual(response.status_code, 201)
+        media = IncidentMedia.objects.get(pk=response.data['id'])
+        digest = hashlib.sha256(MP4).hexdigest()
+        self.assertEqual((media.content_hash, media.size, media.content_type), (digest, len(MP4), 'video/mp4'))
+        self.assertTrue(media.file.name.endswith(f'{digest}.mp4'))
+        with media.file.open('rb') as stored:
+            self.assertEqual(stored.read(), MP4)
+        self.assertEqual(response.data['file_url'], reverse('media-file', args=[media.pk]))
+
+    def test_identical_uploads_stored_once(self):
+        """Test the same content uploaded twice shares one stored file"""
+        first = IncidentMedia.objects.get(pk=self.upload(PNG).data['id'])
+        second = IncidentMedia.objects.get(pk=self.upload(PNG).data['id'])
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(first.file.name, second.file.name)
+
+    def test_concurrent_identical_uploads_stored_once(self):
+        """Test an upload racing another of the same content reuses its file instead of saving a renamed copy"""
+        first = IncidentMedia.objects.get(pk=self.upload(PNG).data['id'])
+        # The other upload lands just after this one looks for the file
+        missed, exists = [False], default_storage.exists
+        with mock.patch.object(default_storage, 'exists', lambda name: missed.pop() if missed else exists(name)):
+            second = IncidentMedia.objects.get(pk=self.upload(PNG).data['id'])
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(os.listdir(os.path.dirname(first.file.path)), [os.path.basename(first.file.name)])
+
+    def test_rejects_mislabelled_and_unknown_files(self):
+        """Test uploads whose content does not match a supported type are refused"""
+        self.assertEqual(self.upload(PNG, media_type='AUDIO').status_code, 400)
+        self.assertEqual(self.upload(b'#!/bin/sh\nrm -rf /\n').status_code, 400)
+        self.assertFalse(IncidentMedia.objects.exists())
+
+    def test_url_media_still_accepted(self):
+        """Test media hosted elsewhere can still be linked by URL"""
+        request = self.factory.post('/', {
+            'incident': self.incident.pk, 'media_type': 'IMAGE', 'file_url': 'https://example.com/fire.jpg',
+        }, format='json')
+        force_authenticate(request, user=self.reporter)
+        self.assertEqual(media_create(request).status_code, 201)
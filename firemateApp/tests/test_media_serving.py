@@ -0,0 +1,157 @@
+import io
+import json
+import shutil
+import tempfile
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..media_ingest import ingest
+from ..models import FireIncident
+from ..serializers import IncidentMediaSerializer
+from ..views import media_file
+
+MP4 = b'\x00\x00\x00\x18ftypisom' + bytes(range(256)) * 400
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_SENDFILE=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='REPORTER')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.media = ingest(SimpleUploadedFile('clip.mp4', MP4), self.incident)
+        self.factory = APIRequestFactory()
+
+    def get(self, user=None, method='get', **headers):
+        request = getattr(self.factory, method)('/', **headers)
+        force_authenticate(request, user=user or self.reporter)
+        response = media_file(request, pk=self.media.pk)
+        if hasattr(response, 'render'):
+            response.render()
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_whole_file(self):
+        """Test a plain GET streams the whole file with its validators"""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), MP4)
+        self.assertEqual(response['Content-Length'], str(len(MP4)))
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{self.media.content_hash}"')
+
+    def test_head(self):
+        """Test HEAD returns the headers of the file without reading it"""
+        response = self.get(method='head')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(MP4)))
+        self.assertEqual(self.body(response), b'')
+
+    def test_ranges(self):
+        """Test bounded, open-ended and suffix byte ranges return 206 with the right bytes"""
+        size = len(MP4)
+        for header, first, last in (
+            ('bytes=100-199', 100, 199),
+            (f'bytes={size - 10}-', size - 10, size - 1),
+            ('bytes=-64', size - 64, size - 1),
+            (f'bytes=0-{size * 2}', 0, size - 1),
+        ):
+            with self.subTest(header=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(self.body(response), MP4[first:last + 1])
+                self.assertEqual(response['Content-Range'], f'bytes {first}-{last}/{size}')
+                self.assertEqual(response['Content-Length'], str(last - first + 1))
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        """Test ranges past the end are refused and ones the view does not handle send the whole file"""
+        response = self.get(HTTP_RANGE=f'bytes={len(MP4)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(MP4)}')
+        for header in ('bytes=0-9,20-29', 'items=0-9', 'bytes=9-0'):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(HTTP_RANGE=header).status_code, 200)
+
+    def test_conditional(self):
+        """Test a matching ETag returns 304 and a stale If-Range the whole file"""
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+
+    def test_offloaded_to_front_end(self):
+        """Test X-Accel-Redirect and X-Sendfile name the file and leave the transfer to the server"""
+        with override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.get(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.media.file.name}')
+        self.assertEqual(response.content, b'')
+
+        with override_settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.get()
+        self.assertEqual(response['X-Sendfile'], self.media.file.path)
+
+    def test_access_follows_media_detail(self):
+        """Test other reporters are refused until the incident is active, and accept-only-video clients served"""
+        self.assertEqual(self.get(user=self.other).status_code, 403)
+        self.assertEqual(self.get(user=self.operator).status_code, 403)
+        self.incident.status = 'VERIFIED'
+        self.incident.save()
+        self.assertEqual(self.get(user=self.operator, HTTP_ACCEPT='video/*').status_code, 200)
+
+    def test_errors_sent_as_json(self):
+        """Test error bodies for clients accepting only media types are labelled as the JSON they are"""
+        request = self.factory.get('/', HTTP_ACCEPT='image/*')
+        force_authenticate(request, user=self.reporter)
+        response = media_file(request, pk=self.media.pk + 1000)
+        response.render()
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', json.loads(response.content))
+        self.assertEqual(self.get(user=self.other, HTTP_ACCEPT='image/*')['Content-Type'], 'application/json')
+
+    def test_serialized_urls_are_checked(self):
+        """Test the file and thumbnail URLs clients are given go through the access check"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (320, 240), (200, 80, 20)).save(buffer, 'PNG')
+        photo = ingest(SimpleUploadedFile('fire.png', buffer.getvalue()), self.incident)
+        data = IncidentMediaSerializer(photo).data
+        urls = [data['file_url']] + [url for formats in data['thumbnails'].values() for url in formats.values()]
+        self.assertEqual(len(urls), 5)
+        for url in urls:
+            match = resolve(url.split('?')[0])
+            self.assertIs(match.func, media_file)
+            for user, expected in ((self.reporter, 200), (self.other, 403)):
+                with self.subTest(url=url, user=user.username):
+                    request = self.factory.get(url)
+                    force_authenticate(request, user=user)
+                    response = media_file(request, **match.kwargs)
+                    self.addCleanup(response.close)
+                    self.assertEqual(response.status_code, expected)
+
+        request = self.factory.get(data['thumbnails']['small']['webp'])
+        force_authenticate(request, user=self.reporter)
+        response = media_file(request, pk=photo.pk)
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(max(Image.open(io.BytesIO(self.body(response))).size), 160)
@@ -0,0 +1,140 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..media_ingest import ingest, partial_path, receive_original
+from ..models import FireIncident, IncidentMedia
+from ..views import media_create, media_original
+
+def photo(size):
+    buffer = io.BytesIO()
+    gradient = np.linspace(0, 255, size[0] * size[1] * 3, dtype=np.uint8).reshape(size[1], size[0], 3)
+    Image.fromarray(gradient).save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+ORIGINAL = photo((2000, 1500))
+PROXY = photo((400, 300))
+
+class TwoPhaseUploadTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_UPLOAD_SPOOL=os.path.join(media_root, 'spool'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = mock.patch('firemateApp.views._analyze_incident')
+        self.analyze = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='REPORTER')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.factory = APIRequestFactory()
+
+    def upload_proxy(self, **data):
+        request = self.factory.post('/', {
+            'incident': self.incident.pk,
+            'proxy': SimpleUploadedFile('proxy.jpg', PROXY),
+            **data,
+        }, format='multipart')
+        force_authenticate(request, user=self.reporter)
+        response = media_create(request)
+        response.render()
+        return response
+
+    def patch(self, media, offset, chunk, user=None):
+        request = self.factory.patch(
+            '/', chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+        force_authenticate(request, user=user or self.reporter)
+        response = media_original(request, pk=media.pk)
+        response.render()
+        return response
+
+    def test_proxy_analyzed_before_original(self):
+        """Test the proxy is stored as the media and analysis runs without waiting for the original"""
+        response = self.upload_proxy(original_size=len(ORIGINAL))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['upload_length'], response.data['upload_offset']), (len(ORIGINAL), 0))
+        self.assertEqual(response.data['size'], len(PROXY))
+        self.assertIsNotNone(response.data['thumbnails'])
+        self.analyze.assert_called_once_with(self.incident, shed=True, cheap_only=False)
+
+    def test_original_size_required(self):
+        """Test a proxy without a valid original size is refused"""
+        self.assertEqual(self.upload_proxy().status_code, 400)
+        self.assertEqual(self.upload_proxy(original_size=10 ** 12).status_code, 400)
+        self.assertFalse(IncidentMedia.objects.exists())
+
+    def test_resumable_original(self):
+        """Test the original arrives in chunks, resumes from the stored offset, then replaces the proxy"""
+        media = IncidentMedia.objects.get(pk=self.upload_proxy(original_size=len(ORIGINAL)).data['id'])
+        half = len(ORIGINAL) // 2
+
+        response = self.patch(media, 0, ORIGINAL[:half])
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Upload-Offset'], str(half))
+
+        # A client that lost track asks where to resume
+        request = self.factory.head('/')
+        force_authenticate(request, user=self.reporter)
+        self.assertEqual(media_original(request, pk=media.pk)['Upload-Offset'], str(half))
+        response = self.patch(media, 0, ORIGINAL[:half])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], str(half))
+
+        response = self.patch(media, half, ORIGINAL[half:])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['size'], len(ORIGINAL))
+        self.assertIsNone(response.data['upload_length'])
+        media.refresh_from_db()
+        with media.file.open('rb') as stored:
+            self.assertEqual(stored.read(), ORIGINAL)
+        with default_storage.open(media.analysis_input.replace('analysis.npy', 'medium.webp')) as thumbnail:
+            self.assertEqual(max(Image.open(thumbnail).size), 640)
+        self.assertFalse(os.path.exists(partial_path(media)))
+        self.assertEqual(self.patch(media, len(ORIGINAL), b'').status_code, 409)
+
+    def test_interrupted_chunk(self):
+        """Test bytes received before a connection drops are kept"""
+        media = ingest(SimpleUploadedFile('proxy.jpg', PROXY), self.incident, original_size=len(ORIGINAL))
+        self.assertFalse(receive_original(media, 0, io.BytesIO(ORIGINAL[:1000]), 4096))
+        self.assertEqual(IncidentMedia.objects.get(pk=media.pk).upload_offset, 1000)
+        self.assertTrue(receive_original(media, 1000, io.BytesIO(ORIGINAL[1000:]), len(ORIGINAL) - 1000))
+
+    def test_original_without_local_storage_paths(self):
+        """Test chunks are spooled locally when the media storage has no paths, as remote ones do not"""
+        with override_settings(STORAGES={**settings.STORAGES, 'default': {
+            'BACKEND': 'django.core.files.storage.InMemoryStorage',
+        }}):
+            media = ingest(SimpleUploadedFile('proxy.jpg', PROXY), self.incident, original_size=len(ORIGINAL))
+            self.assertEqual(self.patch(media, 0, ORIGINAL).status_code, 200)
+        media.refresh_from_db()
+        self.assertEqual((media.size, media.upload_length), (len(ORIGINAL), None))
+
+    def test_rejected_originals(self):
+        """Test overruns, other users and originals of another type are refused"""
+        media = ingest(SimpleUploadedFile('proxy.jpg', PROXY), self.incident, original_size=2048)
+        self.assertEqual(self.patch(media, 0, b'\x00' * 4096).status_code, 400)
+        self.assertEqual(self.patch(media, 0, b'\x00' * 2048, user=self.other).status_code, 403)
+
+        # A video is not the original of a photo: the upload starts over
+        response = self.patch(media, 0, b'\x00\x00\x00\x18ftypisom' + b'\x00' * 2036)
+        self.assertEqual(response.status_code, 400)
+        media.refresh_from_db()
+        self.assertEqual((media.upload_offset, media.upload_length, media.size), (0, 2048, len(PROXY)))
@@ -0,0 +1,89 @@
+import json
+import msgpack
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..models import Ambucycle, AmbucycleLocation, FireIncident, IncidentResponse
+from ..positions import position_store
+from ..views import incident_detail, incident_list, response_list, ambucycle_telemetry
+
+class MessagePackTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter,
+            latitude=6.6885,
+            longitude=-1.6244,
+            description="Smoke and flames spotted at market square",
+            status='IN_PROGRESS',
+            voice_analysis_details={'stress_level': 'high', 'features': [0.4, 0.7]},
+            assigned_ambucycle=self.ambucycle,
+        )
+        IncidentResponse.objects.create(
+            incident=self.incident,
+            ambucycle=self.ambucycle,
+            route_data={'points': [[6.6885, -1.6244], [6.6901, -1.6203]]},
+        )
+        self.factory = APIRequestFactory()
+
+        patcher = mock.patch.object(position_store, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        position_store.clear()
+
+    def get(self, view, accept, etag=None, **kwargs):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = self.factory.get('/', HTTP_ACCEPT=accept, **headers)
+        force_authenticate(request, user=self.admin)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_msgpack_matches_json(self):
+        """Test msgpack responses carry the same data as JSON responses"""
+        for view, kwargs in ((incident_detail, {'pk': self.incident.pk}), (response_list, {})):
+            as_json = self.get(view, 'application/json', **kwargs)
+            as_msgpack = self.get(view, 'application/msgpack', **kwargs)
+            self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+            self.assertEqual(msgpack.unpackb(as_msgpack.content), json.loads(as_json.content))
+
+    def test_msgpack_and_json_validated_separately(self):
+        """Test msgpack and JSON responses get different ETags and vary on Accept"""
+        for name, view, kwargs in (('incident_detail', incident_detail, {'pk': self.incident.pk}),
+                                   ('incident_list', incident_list, {})):
+            with self.subTest(view=name):
+                as_json = self.get(view, 'application/json', **kwargs)
+                as_msgpack = self.get(view, 'application/msgpack', **kwargs)
+                self.assertNotEqual(as_json['ETag'], as_msgpack['ETag'])
+                for response in (as_json, as_msgpack):
+                    self.assertIn('Accept', {header.strip() for header in response['Vary'].split(',')})
+                # A cached JSON body is not a valid msgpack one
+                self.assertEqual(self.get(view, 'application/msgpack', etag=as_json['ETag'], **kwargs).status_code, 200)
+                self.assertEqual(self.get(view, 'application/msgpack', etag=as_msgpack['ETag'], **kwargs).status_code, 304)
+
+    def test_msgpack_request_body(self):
+        """Test endpoints accept msgpack request bodies"""
+        body = msgpack.packb({'points': [
+            {'ambucycle': self.ambucycle.id, 'latitude': 6.70, 'longitude': -1.61, 'recorded_at': '2024-05-01T10:00:00Z'},
+        ]})
+        request = self.factory.post('/', body, content_type='application/msgpack')
+        force_authenticate(request, user=self.operator)
+        response = ambucycle_telemetry(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 1)
+
+    def test_malformed_msgpack_rejected(self):
+        """Test malformed msgpack bodies return 400"""
+        request = self.factory.post('/', b'\xc1', content_type='application/msgpack')
+        force_authenticate(request, user=self.operator)
+        self.assertEqual(ambucycle_telemetry(request).status_code, 400)
+
+    def tearDown(self):
+        position_store.clear()
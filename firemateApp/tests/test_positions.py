@@ -0,0 +1,136 @@
+import time
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..models import Ambucycle, AmbucycleLocation
+from ..positions import LatestPositionStore, position_store
+from ..views import ambucycle_available, ambucycle_detail
+
+class PositionStoreMixin:
+    def setUp(self):
+        super().setUp()
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001')
+        # After the row's own last_location_update, so updates move it
+        self.start = timezone.now() + timedelta(minutes=1)
+
+    def store(self, **kwargs):
+        store = LatestPositionStore(**{'flush_interval': 60, 'max_staleness': 30, **kwargs})
+        self.addCleanup(store.stop)
+        return store
+
+    def row(self):
+        self.ambucycle.refresh_from_db()
+        return self.ambucycle.current_latitude, self.ambucycle.last_location_update
+
+class LatestPositionStoreTests(PositionStoreMixin, TestCase):
+    def test_updates_coalesced_until_flush(self):
+        """Test many pings write the row once, with the newest position, and keep every track point"""
+        store = self.store()
+        for i in range(10):
+            store.update(self.ambucycle.pk, 6.70 + i, -1.61, recorded_at=self.start + timedelta(seconds=i))
+        self.assertIsNone(self.row()[0])
+        self.assertEqual(store.flush(), 1)
+        self.assertEqual(self.row(), (15.70, self.start + timedelta(seconds=9)))
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 10)
+        self.assertEqual((store.stats['updates'], store.stats['row_writes']), (10, 1))
+        self.assertEqual(store.flush(), 0)
+
+    def test_late_update_keeps_newer_position(self):
+        """Test an out-of-order ping is tracked but does not replace the newer position"""
+        store = self.store()
+        store.update(self.ambucycle.pk, 6.75, -1.61, recorded_at=self.start + timedelta(seconds=60))
+        position = store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=self.start)
+        self.assertEqual(position.latitude, 6.75)
+        store.flush()
+        self.assertEqual(self.row()[0], 6.75)
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 2)
+
+    def test_out_of_range_coordinates_rejected(self):
+        """Test impossible coordinates are refused before reaching memory or the track"""
+        store = self.store()
+        for latitude, longitude in ((91, 0), (0, -181), (float('nan'), 0), ('north', 0)):
+            with self.subTest(latitude=latitude, longitude=longitude):
+                with self.assertRaises(ValueError):
+                    store.update(self.ambucycle.pk, latitude, longitude)
+        self.assertIsNone(store.get(self.ambucycle.pk))
+        self.assertEqual(store.flush(), 0)
+        self.assertFalse(AmbucycleLocation.objects.exists())
+
+    def test_stale_positions_not_served(self):
+        """Test a position older than max_staleness falls back to what the database holds"""
+        store = self.store(max_staleness=30)
+        store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=self.start)
+        self.assertIsNotNone(store.get(self.ambucycle.pk))
+        later = time.monotonic() + 31
+        with mock.patch('firemateApp.positions.time.monotonic', return_value=later):
+            self.assertIsNone(store.get(self.ambucycle.pk))
+            self.assertIsNone(store.overlay(self.ambucycle).current_latitude)
+
+class PositionFlusherTests(PositionStoreMixin, TransactionTestCase):
+    # The flusher thread writes on its own connection, so rows must be committed
+
+    def test_flushed_on_interval(self):
+        """Test the background flusher writes dirty positions without being asked"""
+        store = self.store(flush_interval=0.05)
+        store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=self.start)
+        deadline = time.monotonic() + 5
+        while self.row()[0] is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.row(), (6.70, self.start))
+
+    def test_flushed_on_shutdown(self):
+        """Test stopping the store writes what the flusher had not got to yet"""
+        store = self.store(flush_interval=60)
+        store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=self.start)
+        self.assertIsNone(self.row()[0])
+        store.stop()
+        self.assertEqual(self.row(), (6.70, self.start))
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 1)
+
+class AmbucycleReadTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.factory = APIRequestFactory()
+
+        patcher = mock.patch.object(position_store, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        position_store.clear()
+        self.addCleanup(position_store.clear)
+
+    def get(self, view, user, **kwargs):
+        request = self.factory.get('/')
+        force_authenticate(request, user=user)
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    def test_detail_served_from_read_model(self):
+        """Test ambucycle_detail reuses the available ambucycles read model and reads the row only on a miss"""
+        from_database = self.get(ambucycle_detail, self.operator, pk=self.ambucycle.pk)
+        self.assertEqual(from_database.status_code, 200)
+        self.get(ambucycle_available, self.operator)
+
+        # Only the conditional state lookup is left
+        with self.assertNumQueries(1):
+            cached = self.get(ambucycle_detail, self.operator, pk=self.ambucycle.pk)
+        self.assertEqual(cached.data, from_database.data)
+        self.assertEqual(self.get(ambucycle_detail, self.other, pk=self.ambucycle.pk).status_code, 403)
+
+    def test_cached_rows_carry_newer_positions(self):
+        """Test cached ambucycle reads show a position newer than the one they were built with"""
+        self.get(ambucycle_available, self.admin)
+        position_store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=timezone.now() + timedelta(minutes=1))
+        for response in (self.get(ambucycle_detail, self.admin, pk=self.ambucycle.pk),
+                         self.get(ambucycle_available, self.admin)):
+            data = response.data[0] if isinstance(response.data, list) else response.data
+            self.assertEqual((data['current_latitude'], data['current_longitude']), (6.70, -1.61))
@@ -0,0 +1,114 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..models import Ambucycle, FireIncident
+from ..positions import position_store
+from ..read_models import ReadModel, active_incidents, available_ambucycles
+from ..views import ambucycle_available
+
+class ReadModelTests(ClearCacheMixin, TestCase):
+    def test_versioned_keys(self):
+        """Test entries are cached per role under the current version and invalidation moves to a new one"""
+        read_model = ReadModel('test')
+        build = mock.Mock(side_effect=lambda: ['built'])
+        self.assertEqual(read_model.get('ADMIN', build), ['built'])
+        self.assertEqual(read_model.get('ADMIN', build), ['built'])
+        self.assertEqual(build.call_count, 1)
+        version = read_model.version()
+        self.assertEqual(cache.get(f'readmodel:test:ADMIN:v{version}'), ['built'])
+
+        read_model.get('AMBUCYCLE_OPERATOR', build)
+        self.assertEqual(build.call_count, 2)
+
+        read_model.invalidate()
+        self.assertEqual(read_model.version(), version + 1)
+        self.assertIsNone(read_model.cached('ADMIN'))
+        read_model.get('ADMIN', build)
+        self.assertEqual(build.call_count, 3)
+        self.assertEqual((read_model.stats['hits'], read_model.stats['misses']), (1, 3))
+
+    def test_concurrent_misses_build_once(self):
+        """Test threads missing together wait for one rebuild and share it"""
+        read_model = ReadModel('test')
+
+        def build():
+            time.sleep(0.1)
+            return ['built']
+        build = mock.Mock(side_effect=build)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: read_model.get('ADMIN', build), range(8)))
+        self.assertEqual(results, [['built']] * 8)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual((read_model.stats['hits'], read_model.stats['misses']), (7, 1))
+
+    def test_waits_for_rebuild_in_another_process(self):
+        """Test a miss while another process holds the rebuild lock polls for its entry instead of building"""
+        read_model = ReadModel('test', wait_timeout=2, poll_interval=0.01)
+        key = f'readmodel:test:ADMIN:v{read_model.version()}'
+        cache.add(f'{key}:lock', 1)
+        build = mock.Mock(return_value=['ours'])
+        finish = threading.Timer(0.1, cache.set, args=(key, ['theirs']))
+        finish.start()
+        self.addCleanup(finish.cancel)
+        self.assertEqual(read_model.get('ADMIN', build), ['theirs'])
+        build.assert_not_called()
+        self.assertEqual(read_model.stats['waits'], 1)
+
+        # A rebuild that never lands is given up on
+        read_model = ReadModel('stuck', wait_timeout=0.05, poll_interval=0.01)
+        cache.add(f'readmodel:stuck:ADMIN:v{read_model.version()}:lock', 1)
+        self.assertEqual(read_model.get('ADMIN', build), ['ours'])
+
+    def test_invalidated_on_save_and_delete(self):
+        """Test saving or deleting the rows a read model holds makes its next read rebuild"""
+        User = get_user_model()
+        reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        incident = FireIncident.objects.create(
+            reporter=reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia', status='VERIFIED',
+        )
+        ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001')
+        for read_model, change in (
+            (available_ambucycles, lambda: ambucycle.save()),
+            (active_incidents, lambda: FireIncident.objects.get(pk=incident.pk).save()),
+            (active_incidents, lambda: FireIncident.objects.get(pk=incident.pk).delete()),
+            (available_ambucycles, lambda: ambucycle.delete()),
+        ):
+            with self.subTest(read_model=read_model.name, change=change):
+                read_model.get('ADMIN', lambda: ['cached'])
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+                self.assertIsNone(read_model.cached('ADMIN'))
+
+class PositionOverlayTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001')
+
+        patcher = mock.patch.object(position_store, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        position_store.clear()
+        self.addCleanup(position_store.clear)
+
+    def test_older_position_not_overlaid(self):
+        """Test a position older than the cached row's does not replace it"""
+        now = timezone.now()
+        Ambucycle.objects.filter(pk=self.ambucycle.pk).update(
+            current_latitude=6.80, current_longitude=-1.60, last_location_update=now + timedelta(minutes=5),
+        )
+        position_store.update(self.ambucycle.pk, 6.70, -1.61, recorded_at=now + timedelta(minutes=1))
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.admin)
+        data = ambucycle_available(request).data
+        self.assertEqual((data[0]['current_latitude'], data[0]['current_longitude']), (6.80, -1.60))
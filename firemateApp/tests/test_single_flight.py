@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TransactionTestCase
+from ..models import FireIncident, IncidentMedia
+from ..single_flight import SingleFlight
+from ..views import _analyze_incident, analysis_flight
+
+def slow(result, seconds=0.2):
+    def call(*args):
+        time.sleep(seconds)
+        return result
+    return mock.Mock(side_effect=call)
+
+def in_thread(fn, *args):
+    # Threads open their own connections to the database cache
+    try:
+        return fn(*args)
+    finally:
+        connection.close()
+
+class SingleFlightTests(TransactionTestCase):
+    def setUp(self):
+        # The database cache's table is not flushed between tests
+        caches[settings.ANALYSIS_FLIGHT_CACHE].clear()
+
+    def flight(self, **kwargs):
+        return SingleFlight('test', cache_alias=settings.ANALYSIS_FLIGHT_CACHE, **kwargs)
+
+    def test_analysis_coordinated_across_processes(self):
+        # A per-process cache would leave every worker running its own analysis
+        self.assertEqual(analysis_flight.cache_alias, settings.ANALYSIS_FLIGHT_CACHE)
+        self.assertNotIsInstance(caches[settings.ANALYSIS_FLIGHT_CACHE], LocMemCache)
+
+    def test_concurrent_threads_share_one_call(self):
+        flight = self.flight()
+        fn = slow({'score': 42})
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: in_thread(flight.do, 'incident:1', fn), range(8)))
+        self.assertEqual(fn.call_count, 1)
+        self.assertEqual(results, [{'score': 42}] * 8)
+        self.assertEqual(flight.stats, {'runs': 1, 'shared': 7, 'waits': 0})
+
+    def test_other_processes_wait_for_the_winners_result(self):
+        # Separate instances share nothing but the cache, as processes would
+        winner, loser = self.flight(), self.flight(poll_interval=0.01)
+        fn, other = slow('winner'), mock.Mock(return_value='loser')
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(in_thread, winner.do, 'incident:1', fn)
+            time.sleep(0.05)
+            second = pool.submit(in_thread, loser.do, 'incident:1', other)
+            self.assertEqual((first.result(), second.result()), ('winner', 'winner'))
+        other.assert_not_called()
+        self.assertEqual(loser.stats['waits'], 1)
+
+    def test_errors_reach_every_caller_and_release_the_key(self):
+        flight = self.flight()
+        started = threading.Event()
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('model unavailable')
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(in_thread, flight.do, 'incident:1', fail)
+            started.wait()
+            second = pool.submit(in_thread, flight.do, 'incident:1', fail)
+            for future in (first, second):
+                with self.assertRaises(ValueError):
+                    future.result()
+        self.assertEqual(flight.do('incident:1', lambda: 'retried'), 'retried')
+
+class ConcurrentAnalysisTests(TransactionTestCase):
+    def setUp(self):
+        caches[settings.ANALYSIS_FLIGHT_CACHE].clear()
+        self.incident = FireIncident.objects.create(
+            latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia', analysis_pending=True,
+        )
+        IncidentMedia.objects.create(incident=self.incident, media_type='IMAGE', file='incident_media/fire.jpg')
+
+    def trigger(self, _):
+        # Each request loads its own copy of the incident
+        try:
+            incident = FireIncident.objects.get(pk=self.incident.pk)
+            _analyze_incident(incident)
+            return incident
+        finally:
+            connection.close()
+
+    def test_concurrent_triggers_run_one_inference(self):
+        analysis_input = np.zeros((224, 224, 3), dtype=np.uint8)
+        with mock.patch('firemateApp.views.load_analysis_input', return_value=analysis_input), \
+                mock.patch('firemateApp.views.analyze_image', slow((90.0, 'Success'), seconds=0.5)) as analyze:
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                incidents = list(pool.map(self.trigger, range(6)))
+
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual({incident.ai_confidence_score for incident in incidents}, {27.0})
+        # Callers that joined the flight learn it finished, as run_deferred_analyses checks
+        self.assertEqual({incident.analysis_pending for incident in incidents}, {False})
+        self.incident.refresh_from_db()
+        self.assertEqual(self.incident.ai_confidence_score, 27.0)
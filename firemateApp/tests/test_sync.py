@@ -0,0 +1,144 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ..models import Ambucycle, ChangeLogEntry, FireIncident, IncidentMedia, IncidentResponse
+from ..sync import changes_since, committed_through, snapshot
+
+@override_settings(SYNC_SETTLE_SECONDS=60)
+class SyncFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='REPORTER')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        # Settle the fixtures' entries, whatever ids earlier tests' rollbacks used up
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+    def incident(self, reporter=None, **kwargs):
+        return FireIncident.objects.create(
+            reporter=reporter or self.reporter, latitude=6.6885, longitude=-1.6244,
+            description='Smoke at Kejetia', **kwargs
+        )
+
+    def token(self, user):
+        return int(snapshot(user)['next'])
+
+    def test_upserts_compacted(self):
+        """Test several changes to a row come back as one upsert with its latest values"""
+        since = self.token(self.reporter)
+        incident = self.incident()
+        for status in ('VERIFIED', 'IN_PROGRESS'):
+            incident.status = status
+            incident.save()
+        feed = changes_since(self.reporter, since, 500)
+        self.assertEqual(feed['changes']['incidents']['deletes'], [])
+        self.assertEqual([(row['id'], row['status']) for row in feed['changes']['incidents']['upserts']],
+                         [(incident.pk, 'IN_PROGRESS')])
+        self.assertFalse(feed['has_more'])
+        self.assertEqual(changes_since(self.reporter, int(feed['next']), 500)['changes'], {})
+
+    def test_tombstones(self):
+        """Test deleted rows, and rows a user can no longer see, come back as deletes"""
+        deleted = self.incident(status='VERIFIED')
+        resolved = self.incident(status='IN_PROGRESS')
+        since = self.token(self.operator)
+        deleted_id = deleted.pk
+        deleted.delete()
+        resolved.status = 'RESOLVED'
+        resolved.save()
+
+        feed = changes_since(self.operator, since, 500)
+        self.assertEqual(feed['changes']['incidents'], {'upserts': [], 'deletes': sorted([deleted_id, resolved.pk])})
+        # The reporter still sees their resolved incident
+        feed = changes_since(self.reporter, since, 500)
+        self.assertEqual(feed['changes']['incidents']['deletes'], [deleted_id])
+        self.assertEqual([row['id'] for row in feed['changes']['incidents']['upserts']], [resolved.pk])
+
+    def test_role_filtering(self):
+        """Test users only learn about the rows, and deletions, their role lets them see"""
+        since = self.token(self.admin)
+        mine = self.incident()
+        theirs = self.incident(reporter=self.other)
+        theirs_id = theirs.pk
+        theirs.delete()
+        other_ambucycle = Ambucycle.objects.create(vehicle_number='AMB-002')
+        IncidentResponse.objects.create(incident=mine, ambucycle=self.ambucycle)
+        IncidentResponse.objects.create(incident=mine, ambucycle=other_ambucycle)
+
+        feed = changes_since(self.reporter, since, 500)['changes']
+        self.assertEqual(set(feed), {'incidents'})
+        self.assertEqual([row['id'] for row in feed['incidents']['upserts']], [mine.pk])
+        self.assertEqual(feed['incidents']['deletes'], [])
+
+        feed = changes_since(self.operator, since, 500)['changes']
+        # Pending incidents are not the operators' yet, so any change to one reads as a delete
+        self.assertEqual(feed['incidents'], {'upserts': [], 'deletes': sorted([mine.pk, theirs_id])})
+        self.assertEqual([row['ambucycle'] for row in feed['responses']['upserts']], [self.ambucycle.pk])
+        self.assertEqual(feed['responses']['deletes'], [])
+
+        feed = changes_since(self.admin, since, 500)['changes']
+        self.assertEqual(feed['incidents']['deletes'], [theirs_id])
+        self.assertEqual(len(feed['responses']['upserts']), 2)
+
+    def test_children_follow_incident_visibility(self):
+        """Test media and responses reach operators when their incident becomes active and leave when it stops"""
+        incident = self.incident()
+        media = IncidentMedia.objects.create(
+            incident=incident, media_type='IMAGE', file_url='https://example.com/fire.jpg',
+        )
+        response = IncidentResponse.objects.create(incident=incident, ambucycle=self.ambucycle)
+        since = self.token(self.operator)
+        self.assertNotIn(media.pk, [row['id'] for row in snapshot(self.operator)['changes']['media']['upserts']])
+
+        incident.status = 'VERIFIED'
+        incident.save()
+        feed = changes_since(self.operator, since, 500)
+        self.assertEqual([row['id'] for row in feed['changes']['media']['upserts']], [media.pk])
+        self.assertEqual([row['id'] for row in feed['changes']['responses']['upserts']], [response.pk])
+        self.assertEqual(feed['changes']['media']['upserts'], snapshot(self.operator)['changes']['media']['upserts'])
+
+        incident.status = 'RESOLVED'
+        incident.save()
+        feed = changes_since(self.operator, int(feed['next']), 500)
+        self.assertEqual(feed['changes']['media'], {'upserts': [], 'deletes': [media.pk]})
+
+    def test_paging(self):
+        """Test a page limit returns every change exactly once across pages"""
+        since = self.token(self.admin)
+        incidents = [self.incident() for _ in range(5)]
+        seen, pages = [], 0
+        while True:
+            feed = changes_since(self.admin, since, 2)
+            seen += [row['id'] for row in feed['changes'].get('incidents', {}).get('upserts', [])]
+            since, pages = int(feed['next']), pages + 1
+            if not feed['has_more']:
+                break
+        self.assertEqual(seen, [incident.pk for incident in incidents])
+        self.assertEqual(pages, 3)
+
+    def test_uncommitted_entries_are_waited_for(self):
+        """Test a hole in the change log holds tokens back until it fills or is old enough to be a rollback"""
+        since = self.token(self.admin)
+        first, in_flight, last = (self.incident() for _ in range(3))
+        # The middle entry's transaction has not committed yet
+        hole = ChangeLogEntry.objects.get(model='incidents', object_id=in_flight.pk)
+        ChangeLogEntry.objects.filter(pk=hole.pk).delete()
+
+        self.assertEqual(committed_through(), hole.pk - 1)
+        feed = changes_since(self.admin, since, 500)
+        self.assertEqual([row['id'] for row in feed['changes']['incidents']['upserts']], [first.pk])
+        self.assertEqual(int(feed['next']), hole.pk - 1)
+        self.assertEqual(self.token(self.admin), hole.pk - 1)
+
+        # It commits: nothing handed out so far skipped it
+        hole.save(force_insert=True)
+        feed = changes_since(self.admin, int(feed['next']), 500)
+        self.assertEqual([row['id'] for row in feed['changes']['incidents']['upserts']], [in_flight.pk, last.pk])
+
+        # A hole below entries older than any transaction was rolled back
+        ChangeLogEntry.objects.filter(pk=hole.pk).delete()
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(committed_through(), ChangeLogEntry.objects.latest('id').pk)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ..models import Ambucycle, AmbucycleLocation
+from ..positions import position_store
+from ..telemetry import ingest_points
+from ..views import ambucycle_telemetry
+
+class TelemetryTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_user(username='admin', password='testpass123', role='ADMIN')
+        self.operator = User.objects.create_user(username='operator', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.other_operator = User.objects.create_user(username='other', password='testpass123', role='AMBUCYCLE_OPERATOR')
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.ambucycle = Ambucycle.objects.create(vehicle_number='AMB-001', operator=self.operator)
+        self.other_ambucycle = Ambucycle.objects.create(vehicle_number='AMB-002', operator=self.other_operator)
+        self.factory = APIRequestFactory()
+        # After the rows' own last_location_update, so the first point moves them
+        self.start = timezone.now().replace(microsecond=0) + timedelta(minutes=1)
+
+        # Write through so the Ambucycle rows can be checked straight away
+        patcher = mock.patch.object(position_store, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        position_store.clear()
+        self.addCleanup(position_store.clear)
+
+    def point(self, seconds, latitude=6.70, longitude=-1.61, ambucycle=None):
+        return {
+            'ambucycle': (ambucycle or self.ambucycle).pk,
+            'latitude': latitude,
+            'longitude': longitude,
+            'recorded_at': (self.start + timedelta(seconds=seconds)).isoformat(),
+        }
+
+    def post(self, points, user=None):
+        request = self.factory.post('/', {'points': points}, format='json')
+        force_authenticate(request, user=user or self.operator)
+        # Positions reach the store once the batch commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return ambucycle_telemetry(request)
+
+    def test_batch_keeps_track_and_newest_position(self):
+        """Test every point joins the track and the newest, not the last sent, becomes the position"""
+        response = self.post([self.point(0, 6.70), self.point(20, 6.72), self.point(10, 6.71)])
+        self.assertEqual((response.status_code, response.data), (201, {'accepted': 3}))
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 3)
+        self.ambucycle.refresh_from_db()
+        self.assertEqual((self.ambucycle.current_latitude, self.ambucycle.last_location_update),
+                         (6.72, self.start + timedelta(seconds=20)))
+
+    def test_late_batch_does_not_move_vehicle_back(self):
+        """Test points older than the stored position are tracked but leave the position alone"""
+        self.post([self.point(60, 6.75)])
+        self.assertEqual(self.post([self.point(30, 6.70)]).status_code, 201)
+        self.assertEqual(AmbucycleLocation.objects.filter(ambucycle=self.ambucycle).count(), 2)
+        self.ambucycle.refresh_from_db()
+        self.assertEqual((self.ambucycle.current_latitude, self.ambucycle.last_location_update),
+                         (6.75, self.start + timedelta(seconds=60)))
+
+    def test_invalid_batches_rejected(self):
+        """Test malformed batches and points are refused without storing anything"""
+        for points in ([], 'not a list', [self.point(0, latitude=91)], [{'ambucycle': self.ambucycle.pk}]):
+            with self.subTest(points=points):
+                self.assertEqual(self.post(points).status_code, 400)
+        self.assertFalse(AmbucycleLocation.objects.exists())
+
+    @override_settings(TELEMETRY_MAX_BATCH_SIZE=2)
+    def test_batch_size_limit(self):
+        """Test batches over TELEMETRY_MAX_BATCH_SIZE are refused whole"""
+        self.assertEqual(self.post([self.point(i) for i in range(3)]).status_code, 400)
+        self.assertFalse(AmbucycleLocation.objects.exists())
+        self.assertEqual(self.post([self.point(i) for i in range(2)]).status_code, 201)
+
+    def test_unknown_and_unauthorized_vehicles(self):
+        """Test batches naming unknown or someone else's ambucycles are refused whole"""
+        mixed = [self.point(0), self.point(0, ambucycle=self.other_ambucycle)]
+        self.assertEqual(self.post(mixed).status_code, 403)
+        self.assertEqual(self.post([self.point(0), {**self.point(0), 'ambucycle': 999999}]).status_code, 400)
+        self.assertEqual(self.post([self.point(0)], user=self.reporter).status_code, 403)
+        self.assertFalse(AmbucycleLocation.objects.exists())
+        self.assertEqual(self.post(mixed, user=self.admin).status_code, 201)
+
+    def test_position_write_touches_only_position_columns(self):
+        """Test the latest-position write leaves concurrently changed columns alone"""
+        Ambucycle.objects.filter(pk=self.ambucycle.pk).update(is_available=False)
+        with CaptureQueriesContext(connection) as queries:
+            self.post([self.point(0)])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')
+                   and Ambucycle._meta.db_table in query['sql'].split(' SET ')[0]]
+        self.assertEqual(len(updates), 1)
+        assignments = updates[0].split(' SET ')[1].split(' WHERE ')[0]
+        self.assertEqual(assignments.count('='), 3)
+        self.assertNotIn('is_available', assignments)
+        self.ambucycle.refresh_from_db()
+        self.assertFalse(self.ambucycle.is_available)
+
+    def test_batch_stored_atomically(self):
+        """Test a batch that is rolled back leaves no track points behind and no position served or streamed"""
+        points = [{**self.point(0), 'recorded_at': self.start},
+                  {**self.point(0, ambucycle=self.other_ambucycle), 'recorded_at': self.start}]
+        with mock.patch('firemateApp.positions.event_hub') as event_hub, self.assertRaises(DatabaseError):
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                ingest_points(points)
+                raise DatabaseError('connection lost')
+        self.assertFalse(AmbucycleLocation.objects.exists())
+        self.assertIsNone(position_store.get(self.ambucycle.pk))
+        event_hub.publish.assert_not_called()
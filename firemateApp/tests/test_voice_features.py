@@ -0,0 +1,128 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .base import ClearCacheMixin
+from ..models import FireIncident, IncidentMedia
+from ..serializers import VoiceFeaturesSerializer
+from ..views import media_create, _analyze_incident, voice_analyzer
+from ..voice_features import feature_mismatch
+
+FEATURES = {
+    'version': 1,
+    'duration': 12.0,
+    'pitch_mean': 1450.0,
+    'pitch_std': 1020.0,
+    'energy': 0.021,
+    'energy_variance': 0.012,
+    'speech_rate': 9800,
+    'jitter': 610.0,
+    'shimmer': 24.5,
+    'spectral_centroid': 1830.0,
+}
+
+class VoiceFeaturesSerializerTests(TestCase):
+    def errors(self, **changes):
+        serializer = VoiceFeaturesSerializer(data={**FEATURES, **changes})
+        serializer.is_valid()
+        return serializer.errors
+
+    def test_accepts_plausible_features(self):
+        self.assertEqual(self.errors(), {})
+
+    def test_rejects_implausible_features(self):
+        self.assertIn('version', self.errors(version=2))
+        self.assertIn('energy', self.errors(energy=3.0))
+        self.assertIn('spectral_centroid', self.errors(spectral_centroid=12000.0))
+        self.assertIn('speech_rate', self.errors(speech_rate=FEATURES['duration'] * 16000 + 1))
+        self.assertIn('pitch_mean', self.errors(pitch_mean=0.0))
+        self.assertIn('shimmer', self.errors(shimmer=float('nan')))
+
+    def test_mismatch_is_relative_per_feature(self):
+        self.assertEqual(feature_mismatch(FEATURES, {**FEATURES, 'pitch_mean': 1500.0}), {})
+        self.assertEqual(list(feature_mismatch(FEATURES, {**FEATURES, 'energy': 0.05})), ['energy'])
+
+@override_settings(VOICE_FEATURES_SPOT_CHECK_RATE=0)
+class ClientVoiceFeaturesTests(ClearCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        User = get_user_model()
+        self.reporter = User.objects.create_user(username='reporter', password='testpass123', role='REPORTER')
+        self.incident = FireIncident.objects.create(
+            reporter=self.reporter, latitude=6.6885, longitude=-1.6244, description='Smoke at Kejetia',
+        )
+        self.factory = APIRequestFactory()
+
+    def create(self, **data):
+        request = self.factory.post('/', {'incident': self.incident.pk, **data}, format='multipart')
+        force_authenticate(request, user=self.reporter)
+        response = media_create(request)
+        response.render()
+        return response
+
+    def test_features_alone_are_scored_without_audio(self):
+        with mock.patch.object(voice_analyzer, 'load_audio') as load_audio:
+            response = self.create(voice_features=json.dumps(FEATURES))
+        self.assertEqual(response.status_code, 201)
+        media = IncidentMedia.objects.get(pk=response.data['id'])
+        self.assertEqual((media.media_type, media.file.name, media.duration), ('AUDIO', '', 12.0))
+        load_audio.assert_not_called()
+
+        self.incident.refresh_from_db()
+        score, _ = voice_analyzer.score_features(FEATURES)
+        self.assertAlmostEqual(self.incident.voice_stress_score, score)
+        self.assertEqual(self.incident.voice_analysis_details['feature_source'], 'client')
+
+    def test_features_must_describe_audio(self):
+        response = self.create(voice_features=json.dumps(FEATURES), media_type='IMAGE')
+        self.assertEqual(response.status_code, 400)
+        response = self.create(voice_features=json.dumps({**FEATURES, 'energy': -1}))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('energy', response.data['voice_features'])
+        self.assertFalse(IncidentMedia.objects.exists())
+
+    @override_settings(VOICE_FEATURES_SPOT_CHECK_RATE=1)
+    def test_failed_spot_check_scores_server_features(self):
+        computed = {**FEATURES, 'energy': 0.0005, 'energy_variance': 0.0001}
+        media = IncidentMedia.objects.create(
+            incident=self.incident, media_type='AUDIO', voice_features=FEATURES,
+            file=SimpleUploadedFile('call.wav', b'RIFF'),
+        )
+        with mock.patch('firemateApp.views._server_voice_features', return_value=computed) as server_features:
+            _analyze_incident(self.incident)
+        server_features.assert_called_once_with(media)
+
+        self.incident.refresh_from_db()
+        details = self.incident.voice_analysis_details
+        self.assertEqual(details['feature_source'], 'server')
+        self.assertEqual(sorted(details['spot_check']['mismatched']), ['energy', 'energy_variance'])
+        self.assertAlmostEqual(self.incident.voice_stress_score, voice_analyzer.score_features(computed)[0])
+
+    def test_features_alone_never_verify(self):
+        IncidentMedia.objects.create(
+            incident=self.incident, media_type='IMAGE', file=SimpleUploadedFile('scene.jpg', b'JFIF'),
+        )
+        audio = IncidentMedia.objects.create(incident=self.incident, media_type='AUDIO', voice_features=FEATURES)
+        with mock.patch('firemateApp.views.analyze_image', return_value=(100.0, 'Fire detected')), \
+                mock.patch.object(voice_analyzer, 'score_features', side_effect=lambda features: (100.0, {})):
+            _analyze_incident(self.incident)
+            self.incident.refresh_from_db()
+            self.assertEqual((self.incident.ai_confidence_score, self.incident.status), (100.0, 'PENDING'))
+            self.assertFalse(self.incident.voice_analysis_details['verifiable'])
+
+            # The same features with the recording they describe can
+            audio.file = SimpleUploadedFile('call.wav', b'RIFF')
+            audio.save()
+            _analyze_incident(self.incident)
+            self.incident.refresh_from_db()
+            self.assertEqual(self.incident.status, 'VERIFIED')
@@ -11,6 +11,13 @@ router.register(r'incident-media', views.IncidentMediaViewSet)
 router.register(r'incident-responses', views.IncidentResponseViewSet)
 
 urlpatterns = [
+    path('ambucycles/telemetry/', views.ambucycle_telemetry, name='ambucycle-telemetry'),
+    path('events/', views.event_stream, name='event-stream'),
+    path('sync/changes/', views.sync_changes, name='sync-changes'),
+    path('incident-clusters/', views.cluster_list, name='incident-cluster-list'),
+    path('incident-media/upload/', views.media_create, name='media-upload'),
+    path('incident-media/<int:pk>/file/', views.media_file, name='media-file'),
+    path('incident-media/<int:pk>/original/', views.media_original, name='media-original'),
     path('', include(router.urls)),
     path('auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -1,17 +1,40 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework import status, permissions
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
+from rest_framework import status, permissions, serializers
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
-from .models import User, Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+from django.db.models import Count, Max, Q
+from django.conf import settings
+from .models import User, Ambucycle, FireIncident, IncidentCluster, IncidentMedia, IncidentResponse
 from .serializers import (
     UserSerializer, AmbucycleSerializer, FireIncidentSerializer,
-    IncidentMediaSerializer, IncidentResponseSerializer
+    IncidentMediaSerializer, IncidentResponseSerializer, TelemetryPointSerializer, VoiceFeaturesSerializer,
+    IncidentClusterSerializer,
+    fast_incident_serializer, fast_response_serializer
 )
+from .telemetry import ingest_points
+from .positions import position_store
+from .events import event_hub, stream_events
+from .renderers import EventStreamRenderer, FastJSONRenderer, MediaFileRenderer, MessagePackRenderer
+from .read_models import active_incidents, available_ambucycles
+from .visibility import incidents_for, media_for, responses_for, ambucycles_for, can_view_incident
+from .sync import snapshot, changes_since
+from .fieldsets import requested_fields, project
+from .conditional import conditional, incident_state, incident_list_state, ambucycle_state
 from .ai_analysis import analyze_image
+from .media_ingest import ingest, receive_original, UploadConflict
+from .media_derivatives import THUMBNAIL_CONTENT_TYPES, load_analysis_input, load_audio_input, thumbnail_name
+from .media_serving import serve_file
 from .audio_analysis import VoiceStressAnalyzer
+from .voice_features import spot_check_due, feature_mismatch
+from .single_flight import SingleFlight
+from .clustering import ANALYSIS_FIELDS, assign_cluster, cluster_result, share_analysis, share_verification
+from .admission import FULL, CHEAP, DEFER, AnalysisAdmission, ReporterRateThrottle, area_crowded
+from .idempotency import idempotent
+import json
 import logging
 import mimetypes
 
@@ -20,6 +43,14 @@ logger = logging.getLogger(__name__)
 # Initialize voice stress analyzer
 voice_analyzer = VoiceStressAnalyzer()
 
+# Concurrent triggers for one incident and media set share a single analysis
+analysis_flight = SingleFlight(
+    'incident_analysis', lock_timeout=settings.ANALYSIS_LOCK_TIMEOUT, cache_alias=settings.ANALYSIS_FLIGHT_CACHE,
+)
+
+# Sheds reporter-triggered analysis under load, see AnalysisAdmission
+analysis_admission = AnalysisAdmission(settings.ANALYSIS_FULL_LIMIT, settings.ANALYSIS_DEFER_LIMIT)
+
 # User API Endpoints
 @api_view(['POST'])
 @permission_classes([])  # Open for registration
@@ -81,23 +112,32 @@ def user_update_role(request, pk):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def ambucycle_list(request):
-    user = request.user
-    if user.role == 'ADMIN':
-        ambucycles = Ambucycle.objects.all()
-    elif user.role == 'AMBUCYCLE_OPERATOR':
-        ambucycles = Ambucycle.objects.filter(operator=user)
-    else:
+    ambucycles = ambucycles_for(request.user)
+    if ambucycles is None:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = AmbucycleSerializer(ambucycles, many=True)
+    fields = requested_fields(request, AmbucycleSerializer)
+    if fields is None or 'operator_details' in fields:
+        ambucycles = ambucycles.select_related('operator')
+    serializer = AmbucycleSerializer(ambucycles, many=True, fields=fields)
     return Response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@conditional(ambucycle_state, AmbucycleSerializer)
 def ambucycle_detail(request, pk):
+    fields = requested_fields(request, AmbucycleSerializer)
+    # Available ambucycles are already serialized in the read model; only
+    # a miss costs a database read
+    cached = available_ambucycles.cached(request.user.role) or []
+    item = next((item for item in cached if item['id'] == int(pk)), None)
+    if item is not None:
+        if request.user.role != 'ADMIN' and request.user.id != item['operator']:
+            return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(project(_overlay_positions([item])[0], fields))
     ambucycle = get_object_or_404(Ambucycle, pk=pk)
     if request.user.role != 'ADMIN' and request.user != ambucycle.operator:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = AmbucycleSerializer(ambucycle)
+    serializer = AmbucycleSerializer(position_store.overlay(ambucycle), fields=fields)
     return Response(serializer.data)
 
 @api_view(['POST'])
@@ -141,53 +181,79 @@ def ambucycle_update_location(request, pk):
     latitude = request.data.get('latitude')
     longitude = request.data.get('longitude')
     if latitude is not None and longitude is not None:
-        ambucycle.current_latitude = latitude
-        ambucycle.current_longitude = longitude
-        ambucycle.last_location_update = timezone.now()
-        ambucycle.save()
-        serializer = AmbucycleSerializer(ambucycle)
+        try:
+            position_store.update(ambucycle.id, latitude, longitude)
+        except (TypeError, ValueError):
+            return Response({'error': 'Latitude and longitude must be valid coordinates'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = AmbucycleSerializer(position_store.overlay(ambucycle))
         return Response(serializer.data)
     return Response({'error': 'Latitude and longitude are required'}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def ambucycle_telemetry(request):
+    if request.user.role not in ['ADMIN', 'AMBUCYCLE_OPERATOR']:
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+    points = request.data.get('points') if isinstance(request.data, dict) else request.data
+    if not isinstance(points, list) or not points:
+        return Response({'error': 'A non-empty list of points is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(points) > settings.TELEMETRY_MAX_BATCH_SIZE:
+        return Response({'error': f'At most {settings.TELEMETRY_MAX_BATCH_SIZE} points per batch'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    serializer = TelemetryPointSerializer(data=points, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    ambucycle_ids = {point['ambucycle'] for point in serializer.validated_data}
+    operators = dict(Ambucycle.objects.filter(id__in=ambucycle_ids).values_list('id', 'operator_id'))
+    if len(operators) != len(ambucycle_ids):
+        return Response({'error': 'Ambucycle not found'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.user.role != 'ADMIN' and any(operator_id != request.user.id for operator_id in operators.values()):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+    accepted = ingest_points(serializer.validated_data)
+    return Response({'accepted': accepted}, status=status.HTTP_201_CREATED)
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def ambucycle_available(request):
     if request.user.role not in ['ADMIN', 'AMBUCYCLE_OPERATOR']:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    available_ambucycles = Ambucycle.objects.filter(is_available=True)
-    serializer = AmbucycleSerializer(available_ambucycles, many=True)
-    return Response(serializer.data)
+    fields = requested_fields(request, AmbucycleSerializer)
+    data = available_ambucycles.get(request.user.role, _build_available_ambucycles)
+    return Response(project(_overlay_positions(data), fields))
 
 # FireIncident API Endpoints
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer])
 @permission_classes([permissions.IsAuthenticated])
+@conditional(incident_list_state, FireIncidentSerializer)
 def incident_list(request):
-    user = request.user
-    if user.role == 'ADMIN':
-        incidents = FireIncident.objects.all()
-    elif user.role == 'AMBUCYCLE_OPERATOR':
-        incidents = FireIncident.objects.filter(Q(status='VERIFIED') | Q(status='IN_PROGRESS'))
-    else:  # REPORTER
-        incidents = FireIncident.objects.filter(reporter=user)
-    serializer = FireIncidentSerializer(incidents, many=True)
-    return Response(serializer.data)
+    fields = requested_fields(request, FireIncidentSerializer)
+    incidents = incidents_for(request.user)
+    return Response(fast_incident_serializer.serialize(incidents, fields))
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@conditional(incident_state, FireIncidentSerializer)
 def incident_detail(request, pk):
     incident = get_object_or_404(FireIncident, pk=pk)
     if request.user.role != 'ADMIN' and request.user != incident.reporter and incident.status not in ['VERIFIED', 'IN_PROGRESS']:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = FireIncidentSerializer(incident)
+    fields = requested_fields(request, FireIncidentSerializer)
+    serializer = FireIncidentSerializer(incident, fields=fields)
     return Response(serializer.data)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([ReporterRateThrottle])
+@idempotent
 def incident_create(request):
     serializer = FireIncidentSerializer(data=request.data)
     if serializer.is_valid():
         incident = serializer.save(reporter=request.user)
-        _analyze_incident(incident)
+        assign_cluster(incident)
+        _analyze_incident(incident, shed=True,
+                          cheap_only=area_crowded(request.user, incident.latitude, incident.longitude))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -222,7 +288,10 @@ def incident_verify(request, pk):
         _analyze_incident(incident)
     incident.status = 'VERIFIED'
     incident.verified_at = timezone.now()
+    incident.manually_triaged = True
     incident.save()
+    # Duplicate reports of the same event are verified with it
+    share_verification(incident)
     serializer = FireIncidentSerializer(incident)
     return Response(serializer.data)
 
@@ -233,6 +302,7 @@ def incident_reject(request, pk):
     if request.user.role != 'ADMIN':
         return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
     incident.status = 'REJECTED'
+    incident.manually_triaged = True
     incident.save()
     serializer = FireIncidentSerializer(incident)
     return Response(serializer.data)
@@ -262,8 +332,9 @@ def incident_assign_ambucycle(request, pk):
 def incident_pending(request):
     if request.user.role != 'ADMIN':
         return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+    fields = requested_fields(request, FireIncidentSerializer)
     pending_incidents = FireIncident.objects.filter(status='PENDING')
-    serializer = FireIncidentSerializer(pending_incidents, many=True)
+    serializer = FireIncidentSerializer(pending_incidents, many=True, fields=fields)
     return Response(serializer.data)
 
 @api_view(['GET'])
@@ -271,21 +342,26 @@ def incident_pending(request):
 def incident_active(request):
     if request.user.role not in ['ADMIN', 'AMBUCYCLE_OPERATOR']:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    active_incidents = FireIncident.objects.filter(Q(status='VERIFIED') | Q(status='IN_PROGRESS'))
-    serializer = FireIncidentSerializer(active_incidents, many=True)
+    fields = requested_fields(request, FireIncidentSerializer)
+    return Response(project(active_incidents.get(request.user.role, _build_active_incidents), fields))
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def cluster_list(request):
+    # Events still open for triage or response, each with the reports of it
+    if request.user.role != 'ADMIN':
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+    clusters = IncidentCluster.objects.filter(
+        incidents__status__in=['PENDING', 'VERIFIED', 'IN_PROGRESS'],
+    ).distinct().prefetch_related('incidents').order_by('-last_reported_at')
+    serializer = IncidentClusterSerializer(clusters, many=True)
     return Response(serializer.data)
 
 # IncidentMedia API Endpoints
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def media_list(request):
-    user = request.user
-    if user.role == 'ADMIN':
-        media = IncidentMedia.objects.all()
-    elif user.role == 'AMBUCYCLE_OPERATOR':
-        media = IncidentMedia.objects.filter(incident__status__in=['VERIFIED', 'IN_PROGRESS'])
-    else:  # REPORTER
-        media = IncidentMedia.objects.filter(incident__reporter=user)
+    media = media_for(request.user)
     serializer = IncidentMediaSerializer(media, many=True)
     return Response(serializer.data)
 
@@ -298,24 +374,122 @@ def media_detail(request, pk):
     serializer = IncidentMediaSerializer(media)
     return Response(serializer.data)
 
+@api_view(['GET', 'HEAD'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([JSONRenderer, MediaFileRenderer])
+def media_file(request, pk):
+    media = get_object_or_404(IncidentMedia.objects.select_related('incident'), pk=pk)
+    if not can_view_incident(request.user, media.incident.status, media.incident.reporter_id):
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+    if not media.file:
+        # Linked by file_url only; there is nothing stored to serve
+        return Response({'error': 'Media has no stored file'}, status=status.HTTP_404_NOT_FOUND)
+    thumbnail = request.query_params.get('thumbnail')
+    if thumbnail is not None:
+        # 'small.webp': one of the derivatives listed in media.thumbnails
+        size, _, extension = thumbnail.partition('.')
+        if extension not in (media.thumbnails or {}).get(size, {}):
+            return Response({'error': 'No such thumbnail'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_file(request, thumbnail_name(media.content_hash, size, extension),
+                          THUMBNAIL_CONTENT_TYPES[extension], f'{media.content_hash}-{thumbnail}', media.uploaded_at)
+    content_type = media.content_type or 'application/octet-stream'
+    return serve_file(request, media.file.name, content_type, media.content_hash, media.uploaded_at)
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([ReporterRateThrottle])
+@idempotent
 def media_create(request):
     incident_id = request.data.get('incident')
     try:
         incident = FireIncident.objects.get(id=incident_id)
         if incident.reporter != request.user and request.user.role != 'ADMIN':
             return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-        serializer = IncidentMediaSerializer(data=request.data)
-        if serializer.is_valid():
+        upload = request.FILES.get('file')
+        proxy = request.FILES.get('proxy')
+        media_type = request.data.get('media_type')
+        voice_features = request.data.get('voice_features')
+        if voice_features is not None:
+            # The client's own analysis of its recording, alongside or instead of the audio
+            if media_type not in (None, '', 'AUDIO'):
+                return Response({'voice_features': 'Voice features come with audio media.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            media_type = 'AUDIO'
+            if isinstance(voice_features, str):
+                # A multipart field carries them as JSON
+                try:
+                    voice_features = json.loads(voice_features)
+                except ValueError:
+                    return Response({'voice_features': 'Invalid JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+            features_serializer = VoiceFeaturesSerializer(data=voice_features)
+            if not features_serializer.is_valid():
+                return Response({'voice_features': features_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            voice_features = features_serializer.validated_data
+        if proxy is not None:
+            # Phase one of a two-phase upload: analyze the proxy now, take the original via media_original
+            try:
+                original_size = int(request.data.get('original_size'))
+            except (TypeError, ValueError):
+                original_size = 0
+            if not 0 < original_size <= settings.MEDIA_MAX_UPLOAD_SIZE:
+                return Response(
+                    {'original_size': f'Give the original\'s size, at most {settings.MEDIA_MAX_UPLOAD_SIZE} bytes.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            media = ingest(proxy, incident, media_type, original_size=original_size, voice_features=voice_features)
+            serializer = IncidentMediaSerializer(media)
+        elif upload is not None:
+            # Already streamed to disk and hashed by HashingFileUploadHandler
+            serializer = IncidentMediaSerializer(ingest(upload, incident, media_type, voice_features=voice_features))
+        elif voice_features is not None:
+            # Features only: the score needs no recording, though with none to spot-check
+            # them against they cannot verify the report (see _run_analysis)
+            media = IncidentMedia.objects.create(
+                incident=incident, media_type='AUDIO', duration=voice_features['duration'], voice_features=voice_features
+            )
+            serializer = IncidentMediaSerializer(media)
+        else:
+            serializer = IncidentMediaSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             serializer.save()
-            if incident.media.count() <= 1:
-                _analyze_incident(incident)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if incident.media.count() <= 1:
+            _analyze_incident(incident, shed=True,
+                              cheap_only=area_crowded(request.user, incident.latitude, incident.longitude))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     except FireIncident.DoesNotExist:
         return Response({'error': 'Incident not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['HEAD', 'PATCH'])
+@permission_classes([permissions.IsAuthenticated])
+def media_original(request, pk):
+    media = get_object_or_404(IncidentMedia.objects.select_related('incident'), pk=pk)
+    if media.incident.reporter != request.user and request.user.role != 'ADMIN':
+        return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+    if media.upload_length is None:
+        return Response({'error': 'No original upload pending'}, status=status.HTTP_409_CONFLICT)
+    if request.method == 'PATCH':
+        # One chunk of the original, at the Upload-Offset the client got from HEAD or the last PATCH
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset header required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            completed = receive_original(media, offset, request.stream, length)
+        except UploadConflict as e:
+            response = Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        else:
+            if completed:
+                return Response(IncidentMediaSerializer(media).data)
+            response = Response(status=status.HTTP_204_NO_CONTENT)
+    else:
+        response = Response()
+    response['Upload-Offset'] = str(media.upload_offset)
+    response['Upload-Length'] = str(media.upload_length)
+    response['Cache-Control'] = 'no-store'
+    return response
+
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def media_delete(request, pk):
@@ -327,17 +501,14 @@ def media_delete(request, pk):
 
 # IncidentResponse API Endpoints
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer])
 @permission_classes([permissions.IsAuthenticated])
 def response_list(request):
-    user = request.user
-    if user.role == 'ADMIN':
-        responses = IncidentResponse.objects.all()
-    elif user.role == 'AMBUCYCLE_OPERATOR':
-        responses = IncidentResponse.objects.filter(ambucycle__operator=user)
-    else:
+    responses = responses_for(request.user)
+    if responses is None:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = IncidentResponseSerializer(responses, many=True)
-    return Response(serializer.data)
+    fields = requested_fields(request, IncidentResponseSerializer)
+    return Response(fast_response_serializer.serialize(responses, fields))
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -345,7 +516,8 @@ def response_detail(request, pk):
     response = get_object_or_404(IncidentResponse, pk=pk)
     if request.user.role != 'ADMIN' and request.user != response.ambucycle.operator:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
-    serializer = IncidentResponseSerializer(response)
+    fields = requested_fields(request, IncidentResponseSerializer)
+    serializer = IncidentResponseSerializer(response, fields=fields)
     return Response(serializer.data)
 
 @api_view(['POST'])
@@ -406,24 +578,134 @@ def response_mark_arrived(request, pk):
     serializer = IncidentResponseSerializer(response)
     return Response(serializer.data)
 
+# Sync API Endpoint
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_changes(request):
+    since = request.query_params.get('since')
+    if since is None:
+        return Response(snapshot(request.user))
+    try:
+        since = int(since)
+        limit = min(int(request.query_params.get('limit', settings.SYNC_PAGE_SIZE)), settings.SYNC_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid sync token or limit'}, status=status.HTTP_400_BAD_REQUEST)
+    if since < 0 or limit < 1:
+        return Response({'error': 'Invalid sync token or limit'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(changes_since(request.user, since, limit))
+
+# Event stream API Endpoint
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def event_stream(request):
+    if not isinstance(request._request, ASGIRequest):
+        return Response({'error': 'Event stream requires an ASGI server'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    response = StreamingHttpResponse(
+        stream_events(event_hub, request.user.id, request.user.role, keepalive=settings.EVENT_STREAM_KEEPALIVE),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# Helper functions for cached read models
+def _build_active_incidents():
+    incidents = FireIncident.objects.filter(Q(status='VERIFIED') | Q(status='IN_PROGRESS'))
+    return list(FireIncidentSerializer(incidents, many=True).data)
+
+def _build_available_ambucycles():
+    return list(AmbucycleSerializer(Ambucycle.objects.filter(is_available=True), many=True).data)
+
+def _overlay_positions(data):
+    # Cached rows only change on flush; apply positions this worker holds
+    # in memory on top, without mutating the cached entries. As in
+    # position_store.overlay, only positions newer than the row's win.
+    datetime_field = serializers.DateTimeField()
+    overlaid = []
+    for item in data:
+        position = position_store.get(item['id'])
+        stored_at = item['last_location_update'] and datetime_field.to_internal_value(item['last_location_update'])
+        if position is not None and (not stored_at or position.recorded_at > stored_at):
+            item = dict(
+                item,
+                current_latitude=position.latitude,
+                current_longitude=position.longitude,
+                last_location_update=datetime_field.to_representation(position.recorded_at),
+            )
+        overlaid.append(item)
+    return overlaid
+
 # Helper function for incident analysis
-def _analyze_incident(incident):
+def _analyze_incident(incident, shed=False, cheap_only=False):
+    # Reporter-triggered analyses are ``shed``: analysis_admission may cut them
+    # to their cheap stages (as ``cheap_only`` asks) or defer them
+    if cluster_result(incident) is not None and not incident.media.exists():
+        # A duplicate report with nothing of its own to analyze takes its event's result
+        share_analysis(incident)
+        if incident.analysis_pending:
+            incident.analysis_pending = False
+            incident.save(update_fields=['analysis_pending', 'updated_at'])
+        return
+    if not shed:
+        return _analyze_at(incident, FULL)
+    with analysis_admission.admit(cheap_only) as level:
+        if level == DEFER:
+            incident.analysis_pending = True
+            incident.save(update_fields=['analysis_pending', 'updated_at'])
+        else:
+            _analyze_at(incident, level)
+
+def _analyze_at(incident, level):
+    # Media added since a flight started makes a new one, rather than joining a stale result
+    media = incident.media.aggregate(count=Count('id'), last=Max('id'))
+    key = f"{incident.pk}:{media['count']}:{media['last']}:{level}"
+    result = analysis_flight.do(key, lambda: _run_analysis(incident, level))
+    for field, value in result.items():
+        setattr(incident, field, value)
+
+def _run_analysis(incident, level=FULL):
     try:
+        # Stages left out of a CHEAP analysis, for run_deferred_analyses to finish
+        skipped = False
         image_score = 0.0
         voice_stress_score = 0.0
         voice_analysis_details = None
-        image_media = incident.media.filter(media_type='IMAGE').first()
-        voice_media = incident.media.filter(media_type='AUDIO').first()
-        if image_media:
-            image_score, image_status = analyze_image(image_media.file_url)
+        # Only uploaded media has a stored file to analyze
+        stored = incident.media.exclude(file='')
+        image_media = stored.filter(media_type='IMAGE').first()
+        # Audio counts with a stored recording or the client's features of one
+        voice_media = incident.media.filter(media_type='AUDIO').exclude(file='', voice_features__isnull=True).first()
+        # Features without a recording behind them cannot be spot-checked, so
+        # they count towards the score but never auto-verify a report
+        unverifiable = voice_media is not None and voice_media.voice_features is not None and not voice_media.file
+        if image_media and level == CHEAP:
+            skipped = True
+        elif image_media:
+            analysis_input = load_analysis_input(image_media)
+            if analysis_input is not None:
+                image_score, image_status = analyze_image(analysis_input)
+            else:
+                with image_media.file.open('rb') as image_file:
+                    image_score, image_status = analyze_image(image_file)
             if 'Error' in image_status:
                 logger.error(f"Image analysis error for incident {incident.id}: {image_status}")
-        if voice_media:
-            file_ext = voice_media.file_url.name.split('.')[-1].lower()
-            voice_stress_score, analysis_details, voice_status = voice_analyzer.analyze_voice_stress(
-                voice_media.file_url.read(),
-                source_format=file_ext
-            )
+        if voice_media and voice_media.voice_features is not None:
+            voice_stress_score, analysis_details = _score_voice_features(voice_media, check=level == FULL)
+            voice_analysis_details = analysis_details
+        elif voice_media and level == CHEAP:
+            skipped = True
+        elif voice_media:
+            samples = load_audio_input(voice_media)
+            if samples is not None:
+                voice_stress_score, analysis_details, voice_status = voice_analyzer.analyze_voice_stress(samples)
+            else:
+                file_ext = voice_media.file.name.split('.')[-1].lower()
+                with voice_media.file.open('rb') as voice_file:
+                    voice_stress_score, analysis_details, voice_status = voice_analyzer.analyze_voice_stress(
+                        voice_file,
+                        source_format=file_ext
+                    )
             if 'Error' in voice_status:
                 logger.error(f"Voice analysis error for incident {incident.id}: {voice_status}")
             else:
@@ -432,11 +714,61 @@ def _analyze_incident(incident):
         incident.voice_stress_score = voice_stress_score
         incident.voice_analysis_details = voice_analysis_details
         incident.ai_confidence_score = confidence_score
-        if confidence_score >= 80:
-            incident.status = 'VERIFIED'
-            incident.verified_at = timezone.now()
-        elif confidence_score < 20:
-            incident.status = 'REJECTED'
+        incident.analysis_pending = skipped
+        # An admin's verification or rejection stands whatever the analysis finds
+        if not incident.manually_triaged:
+            if confidence_score >= 80 and not unverifiable:
+                incident.status = 'VERIFIED'
+                incident.verified_at = timezone.now()
+            elif confidence_score < 20 and not skipped:
+                # Missing evidence is no reason to reject a report
+                incident.status = 'REJECTED'
         incident.save()
+        if incident.cluster_id is not None:
+            share_analysis(incident)
     except Exception as e:
-        logger.error(f"Error analyzing incident {incident.id}: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error analyzing incident {incident.id}: {str(e)}")
+    # analysis_pending is this report's own, so it is not among the fields a cluster shares
+    return {field: getattr(incident, field) for field in ANALYSIS_FIELDS + ['analysis_pending']}
+
+def _score_voice_features(media, check=True):
+    """
+    Score a client's voice features without decoding its recording.
+
+    Unless ``check`` is off, a sample of submissions
+    (voice_features.spot_check_due) is recomputed from the stored recording;
+    if the client's features are off, the server's are scored instead and
+    the mismatch is kept in the details. Features submitted without a
+    recording are marked unverifiable there.
+
+    Returns:
+        tuple: (stress_score, analysis_details)
+    """
+    features = media.voice_features
+    source = 'client'
+    spot_check = None
+    if check and spot_check_due(media):
+        computed = _server_voice_features(media)
+        if computed is not None:
+            mismatched = feature_mismatch(features, computed)
+            spot_check = {'passed': not mismatched, 'mismatched': mismatched}
+            if mismatched:
+                logger.warning(f"Voice features for media {media.id} failed spot check: {mismatched}")
+                features = computed
+                source = 'server'
+    stress_score, analysis_details = voice_analyzer.score_features(features)
+    analysis_details['feature_source'] = source
+    analysis_details['verifiable'] = bool(media.file)
+    if spot_check is not None:
+        analysis_details['spot_check'] = spot_check
+    return stress_score, analysis_details
+
+def _server_voice_features(media):
+    # Decoded from the canonical PCM where there is one, as _analyze_incident would
+    samples = load_audio_input(media)
+    if samples is not None:
+        loaded = voice_analyzer.load_audio(samples)
+    else:
+        with media.file.open('rb') as voice_file:
+            loaded = voice_analyzer.load_audio(voice_file, media.file.name.split('.')[-1].lower())
+    return voice_analyzer.extract_audio_features(*loaded) if loaded is not None else None
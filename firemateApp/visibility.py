@@ -0,0 +1,52 @@
+from .models import Ambucycle, FireIncident, IncidentMedia, IncidentResponse
+
+# Incident statuses every ambucycle operator may see
+ACTIVE_STATUSES = ['VERIFIED', 'IN_PROGRESS']
+
+def incidents_for(user):
+    """
+    Return the FireIncident queryset a user sees in incident_list.
+    """
+    if user.role == 'ADMIN':
+        return FireIncident.objects.all()
+    if user.role == 'AMBUCYCLE_OPERATOR':
+        return FireIncident.objects.filter(status__in=ACTIVE_STATUSES)
+    return FireIncident.objects.filter(reporter=user)
+
+def media_for(user):
+    """
+    Return the IncidentMedia queryset a user sees in media_list.
+    """
+    if user.role == 'ADMIN':
+        return IncidentMedia.objects.all()
+    if user.role == 'AMBUCYCLE_OPERATOR':
+        return IncidentMedia.objects.filter(incident__status__in=ACTIVE_STATUSES)
+    return IncidentMedia.objects.filter(incident__reporter=user)
+
+def responses_for(user):
+    """
+    Return the IncidentResponse queryset a user sees in response_list,
+    or None if their role has no access.
+    """
+    if user.role == 'ADMIN':
+        return IncidentResponse.objects.all()
+    if user.role == 'AMBUCYCLE_OPERATOR':
+        return IncidentResponse.objects.filter(ambucycle__operator=user)
+    return None
+
+def ambucycles_for(user):
+    """
+    Return the Ambucycle queryset a user sees in ambucycle_list,
+    or None if their role has no access.
+    """
+    if user.role == 'ADMIN':
+        return Ambucycle.objects.all()
+    if user.role == 'AMBUCYCLE_OPERATOR':
+        return Ambucycle.objects.filter(operator=user)
+    return None
+
+def can_view_incident(user, status, reporter_id):
+    """
+    Whether a user may see a single incident, as in incident_detail.
+    """
+    return user.role == 'ADMIN' or user.id == reporter_id or status in ACTIVE_STATUSES
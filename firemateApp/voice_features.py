@@ -0,0 +1,37 @@
+from django.conf import settings
+import random
+
+# Version of the features clients compute: VoiceStressAnalyzer.extract_audio_features
+# run on the recording as mono 16 kHz samples scaled to [-1, 1)
+FEATURES_VERSION = 1
+
+# Features of a submission, as extract_audio_features names them
+FEATURE_FIELDS = (
+    'pitch_mean', 'pitch_std', 'energy', 'energy_variance', 'speech_rate', 'jitter', 'shimmer', 'spectral_centroid',
+)
+
+def spot_check_due(media):
+    """
+    Whether to recompute a media's client-computed features on the server.
+
+    A VOICE_FEATURES_SPOT_CHECK_RATE sample is, of those with a stored
+    recording to recompute them from.
+    """
+    return bool(media.file) and random.random() < settings.VOICE_FEATURES_SPOT_CHECK_RATE
+
+def feature_mismatch(submitted, computed):
+    """
+    Compare submitted features with the server's own for the same recording.
+
+    Returns:
+        dict: {field: relative difference} for the features that differ by
+            more than VOICE_FEATURES_TOLERANCE; empty if the submission holds up
+    """
+    mismatched = {}
+    for field in FEATURE_FIELDS:
+        submitted_value, computed_value = float(submitted[field]), float(computed[field])
+        scale = max(abs(submitted_value), abs(computed_value))
+        difference = abs(submitted_value - computed_value) / scale if scale else 0.0
+        if difference > settings.VOICE_FEATURES_TOLERANCE:
+            mismatched[field] = round(difference, 3)
+    return mismatched